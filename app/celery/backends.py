@@ -0,0 +1,190 @@
+"""
+Task backends the API submits background work to.
+
+`TASK_BACKEND=celery` (the default) publishes tasks to the Celery broker.
+`TASK_BACKEND=local` runs them in a process pool inside the API process, so
+reports can be generated without Redis or a worker. Both assign the task id
+when the task is submitted and report progress through app.celery.state.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from app.celery import dispatch
+from app.celery.reports import write_candidates_csv_file
+from app.celery.state import (
+    FAILURE,
+    PENDING,
+    read_task_state,
+    request_cancel,
+    run_tracked,
+    write_task_state,
+)
+from app.utils.workers import web_concurrency
+
+load_dotenv()
+
+TASK_BACKEND = os.getenv("TASK_BACKEND", "celery")
+# Processes of the local backend per API process. Every API worker started
+# by gunicorn (see gunicorn.conf.py) has its own pool, so by default the cores
+# are shared among the `WEB_CONCURRENCY` workers.
+LOCAL_TASK_WORKERS = int(
+    os.getenv("LOCAL_TASK_WORKERS", max(1, (os.cpu_count() or 1) // web_concurrency()))
+)
+
+REPORT_TASK = "candidates_report"
+
+logger = logging.getLogger(__name__)
+
+
+class TaskBackend(ABC):
+    """
+    Submits tasks by name and reports their state.
+    """
+
+    @abstractmethod
+    def submit(self, task: str, task_id: Optional[str] = None) -> str:
+        """
+        Submit a task for background execution.
+
+        Args:
+            task (str): The task name, e.g. REPORT_TASK.
+            task_id (Optional[str]): The id to submit the task with, a new one
+                                     when omitted.
+
+        Returns:
+            str: The id to look the task state up with.
+
+        Raises:
+            DispatchUnavailable: If the task cannot be accepted right now.
+        """
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the state of a submitted task.
+
+        Args:
+            task_id (str): The id returned by submit.
+
+        Returns:
+            Optional[Dict[str, Any]]: The state record, or None for unknown ids.
+        """
+        return read_task_state(task_id)
+
+    def cancel(self, task_id: str) -> None:
+        """
+        Ask a submitted task to stop.
+
+        A pending task ends as soon as it starts, a running one at its next
+        progress report. Either way its state becomes REVOKED.
+
+        Args:
+            task_id (str): The id returned by submit.
+        """
+        request_cancel(task_id)
+
+    def warm_up(self) -> None:
+        """
+        Prepare connections or processes ahead of the first submit.
+        """
+
+
+class CeleryBackend(TaskBackend):
+    """
+    Publishes tasks to the Celery broker, see app.celery.dispatch.
+    """
+
+    # Registered names of the tasks in app.celery.tasks.
+    task_names = {REPORT_TASK: "app.celery.tasks.generate_candidates_csv_file"}
+
+    def submit(self, task: str, task_id: Optional[str] = None) -> str:
+        # Recorded before publishing, a worker may start the task right away.
+        task_id = task_id or str(uuid4())
+        write_task_state(task_id, PENDING)
+        try:
+            dispatch.publish_task(self.task_names[task], task_id=task_id)
+        except dispatch.DispatchUnavailable as e:
+            write_task_state(task_id, FAILURE, error=repr(e))
+            raise
+        return task_id
+
+    def warm_up(self) -> None:
+        dispatch.warm_up()
+
+
+class LocalBackend(TaskBackend):
+    """
+    Runs tasks in a pool of `LOCAL_TASK_WORKERS` processes per API process.
+
+    Worker processes are spawned rather than forked, so they do not inherit
+    the server's threads, sockets or database connections.
+    """
+
+    functions: Dict[str, Callable] = {REPORT_TASK: write_candidates_csv_file}
+
+    def __init__(self, max_workers: int = LOCAL_TASK_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, task: str, task_id: Optional[str] = None) -> str:
+        task_id = task_id or str(uuid4())
+        write_task_state(task_id, PENDING)
+        future = self._get_executor().submit(run_tracked, task_id, self.functions[task])
+        future.add_done_callback(_log_failure)
+        return task_id
+
+    def warm_up(self) -> None:
+        self._get_executor()
+
+    def shutdown(self) -> None:
+        """
+        Wait for running tasks and stop the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def _log_failure(future: Future) -> None:
+    # run_tracked records task failures; this catches the pool itself failing.
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("local task failed: %r", future.exception())
+
+
+@lru_cache(maxsize=None)
+def get_task_backend() -> TaskBackend:
+    """
+    Return the backend selected by `TASK_BACKEND`.
+
+    Returns:
+        TaskBackend: The shared backend of this process.
+
+    Raises:
+        ValueError: If `TASK_BACKEND` names an unknown backend.
+    """
+    backends = {"celery": CeleryBackend, "local": LocalBackend}
+    if TASK_BACKEND not in backends:
+        raise ValueError(
+            f"unknown TASK_BACKEND {TASK_BACKEND!r}, expected one of {list(backends)}"
+        )
+    return backends[TASK_BACKEND]()
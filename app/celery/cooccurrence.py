@@ -0,0 +1,341 @@
+"""
+Skill co-occurrence counts and the related skills derived from them.
+
+A full computation reads the skills in chunks of candidates and sums the
+co-occurrence matrices X.T @ X of the chunks, X being the sparse candidate ×
+skill matrix of a chunk; the products run on a thread pool while the next
+chunk is read. Afterwards the counts are updated from the change log: for
+every candidate whose skills changed, the pairs of its previous skills are
+subtracted and those of its current skills added.
+"""
+
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import groupby, product
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy import sparse
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from app.db_queries.change_queries import (
+    get_changes,
+    get_oldest_change_sequence,
+    get_settled_change_sequence,
+)
+from app.db_queries.skill_queries import get_skills_of_candidates
+from app.models.change_log import DELETE, SKILL
+from app.models.skill_cooccurrence import (
+    SkillCooccurrenceCandidate,
+    SkillCooccurrenceState,
+    SkillNeighbor,
+    SkillPair,
+)
+from app.models.skills import Skill
+from app.services.change import CHANGE_FEED_SETTLE_SECONDS
+from app.utils.skill_matrix import normalize_skill
+
+load_dotenv()
+
+# Neighbors stored per skill.
+SKILL_NEIGHBORS_TOP_N = int(os.getenv("SKILL_NEIGHBORS_TOP_N", "20"))
+# Candidates per sparse product of a full computation.
+COOCCURRENCE_CHUNK_SIZE = int(os.getenv("COOCCURRENCE_CHUNK_SIZE", "50000"))
+COOCCURRENCE_WORKERS = int(os.getenv("COOCCURRENCE_WORKERS", str(os.cpu_count() or 1)))
+# Changes read per query, and changed candidates applied per query.
+CHANGE_PAGE_SIZE = 10_000
+CANDIDATE_BATCH_SIZE = 1000
+# Rows per INSERT statement, and skills per neighbor query.
+WRITE_BATCH_SIZE = 10_000
+NEIGHBOR_BATCH_SIZE = 500
+
+STATE_ID = 1
+
+
+def _chunk_product(rows: np.ndarray, columns: np.ndarray, height: int, width: int):
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+        shape=(height, width),
+    )
+    return (matrix.T @ matrix).tocoo()
+
+
+def _insert(db: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        db.execute(model.__table__.insert(), rows[start : start + WRITE_BATCH_SIZE])
+
+
+def rebuild_cooccurrence(db: Session) -> int:
+    """
+    Recompute the co-occurrence counts and neighbors of all skills.
+
+    Args:
+        db (Session): A session on the primary; the caller commits.
+
+    Returns:
+        int: The number of distinct skills.
+    """
+    # A change numbered below the latest one may still be uncommitted and
+    # missing from the counts, so the next update starts at the last settled
+    # change. Changes after it are applied again, which is harmless: updates
+    # apply differences to the stored skill sets.
+    settled_before = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    synced_seq = get_settled_change_sequence(db, settled_before)
+    for model in (SkillPair, SkillNeighbor, SkillCooccurrenceCandidate):
+        db.execute(delete(model))
+
+    columns: Dict[str, int] = {}
+    pending, snapshots = [], []
+    chunk_rows: List[int] = []
+    chunk_columns: List[int] = []
+    skill_rows = db.execute(
+        select(Skill.candidate_id, Skill.name)
+        .order_by(Skill.candidate_id)
+        .execution_options(yield_per=WRITE_BATCH_SIZE)
+    ).tuples()
+    with ThreadPoolExecutor(COOCCURRENCE_WORKERS) as executor:
+        candidates = groupby(skill_rows, key=lambda row: row[0])
+        for index, (candidate_id, rows) in enumerate(candidates):
+            names = sorted({normalize_skill(name) for _, name in rows} - {""})
+            snapshots.append({"candidate_id": candidate_id, "skills": names})
+            row = index % COOCCURRENCE_CHUNK_SIZE
+            for name in names:
+                chunk_rows.append(row)
+                chunk_columns.append(columns.setdefault(name, len(columns)))
+            if row == COOCCURRENCE_CHUNK_SIZE - 1:
+                # A chunk of candidates without named skills adds nothing.
+                if chunk_rows:
+                    pending.append(
+                        executor.submit(
+                            _chunk_product,
+                            np.array(chunk_rows),
+                            np.array(chunk_columns),
+                            COOCCURRENCE_CHUNK_SIZE,
+                            len(columns),
+                        )
+                    )
+                chunk_rows, chunk_columns = [], []
+                _insert(db, SkillCooccurrenceCandidate, snapshots)
+                snapshots = []
+        if chunk_rows:
+            pending.append(
+                executor.submit(
+                    _chunk_product,
+                    np.array(chunk_rows),
+                    np.array(chunk_columns),
+                    COOCCURRENCE_CHUNK_SIZE,
+                    len(columns),
+                )
+            )
+        _insert(db, SkillCooccurrenceCandidate, snapshots)
+        # Chunks read earlier know fewer skills, so their products are
+        # summed as coordinates in the final shape.
+        products = [future.result() for future in pending]
+
+    names = list(columns)
+    if products:
+        counts = sparse.coo_matrix(
+            (
+                np.concatenate([chunk.data for chunk in products]),
+                (
+                    np.concatenate([chunk.row for chunk in products]),
+                    np.concatenate([chunk.col for chunk in products]),
+                ),
+            ),
+            shape=(len(names), len(names)),
+        ).tocsr()
+        counts.sum_duplicates()
+        counts = counts.tocoo()
+        _insert(
+            db,
+            SkillPair,
+            [
+                {"skill": names[row], "other": names[column], "candidates": int(count)}
+                for row, column, count in zip(counts.row, counts.col, counts.data)
+            ],
+        )
+    refresh_neighbors(db, names)
+    _save_state(db, synced_seq)
+    return len(names)
+
+
+def _pairs(names: Iterable[str]) -> Iterable[Tuple[str, str]]:
+    names = list(names)
+    return product(names, names)
+
+
+def _upsert_pair_deltas(db: Session, deltas: Counter) -> None:
+    connection = db.connection()
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(SkillPair.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["skill", "other"],
+        set_={"candidates": SkillPair.candidates + statement.excluded.candidates},
+    )
+    rows = [
+        {"skill": skill, "other": other, "candidates": delta}
+        for (skill, other), delta in deltas.items()
+        if delta
+    ]
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        connection.execute(statement, rows[start : start + WRITE_BATCH_SIZE])
+    db.execute(delete(SkillPair).where(SkillPair.candidates <= 0))
+
+
+def _apply_candidates(db: Session, candidate_ids: List[str]) -> Set[str]:
+    """
+    Apply the current skills of candidates to the counts.
+
+    Returns:
+        Set[str]: The skills whose counts changed.
+    """
+    previous = {
+        candidate_id: set(skills)
+        for candidate_id, skills in db.execute(
+            select(
+                SkillCooccurrenceCandidate.candidate_id,
+                SkillCooccurrenceCandidate.skills,
+            ).where(SkillCooccurrenceCandidate.candidate_id.in_(candidate_ids))
+        ).tuples()
+    }
+    current = {
+        candidate_id: {normalize_skill(name) for name in names} - {""}
+        for candidate_id, names in get_skills_of_candidates(db, candidate_ids).items()
+    }
+
+    deltas: Counter = Counter()
+    for candidate_id in candidate_ids:
+        old, new = previous.get(candidate_id, set()), current.get(candidate_id, set())
+        if old == new:
+            continue
+        deltas.update(_pairs(new))
+        deltas.subtract(_pairs(old))
+    _upsert_pair_deltas(db, deltas)
+
+    db.execute(
+        delete(SkillCooccurrenceCandidate).where(
+            SkillCooccurrenceCandidate.candidate_id.in_(candidate_ids)
+        )
+    )
+    _insert(
+        db,
+        SkillCooccurrenceCandidate,
+        [
+            {"candidate_id": candidate_id, "skills": sorted(names)}
+            for candidate_id, names in current.items()
+            if names
+        ],
+    )
+    return {skill for (skill, _), delta in deltas.items() if delta}
+
+
+def refresh_neighbors(db: Session, skills: Iterable[str]) -> None:
+    """
+    Store the SKILL_NEIGHBORS_TOP_N most frequent neighbors of skills.
+
+    Args:
+        db (Session): The database session.
+        skills (Iterable[str]): The skills whose counts changed.
+    """
+    skills = sorted(set(skills))
+    for start in range(0, len(skills), NEIGHBOR_BATCH_SIZE):
+        batch = skills[start : start + NEIGHBOR_BATCH_SIZE]
+        db.execute(delete(SkillNeighbor).where(SkillNeighbor.skill.in_(batch)))
+        ranked = (
+            select(
+                SkillPair.skill,
+                SkillPair.other,
+                SkillPair.candidates,
+                func.row_number()
+                .over(
+                    partition_by=SkillPair.skill,
+                    order_by=(SkillPair.candidates.desc(), SkillPair.other),
+                )
+                .label("rank"),
+            )
+            .where(SkillPair.skill.in_(batch), SkillPair.skill != SkillPair.other)
+            .subquery()
+        )
+        totals = aliased(SkillPair)
+        rows = db.execute(
+            select(ranked, totals.candidates)
+            .join(
+                totals,
+                (totals.skill == ranked.c.skill) & (totals.other == ranked.c.skill),
+            )
+            .where(ranked.c.rank <= SKILL_NEIGHBORS_TOP_N)
+        ).tuples()
+        _insert(
+            db,
+            SkillNeighbor,
+            [
+                {
+                    "skill": skill,
+                    "rank": rank,
+                    "neighbor": other,
+                    "candidates": candidates,
+                    "share": candidates / total,
+                }
+                for skill, other, candidates, rank, total in rows
+            ],
+        )
+
+
+def _save_state(db: Session, synced_seq: int) -> None:
+    db.merge(
+        SkillCooccurrenceState(
+            id=STATE_ID, synced_seq=synced_seq, updated_at=datetime.now()
+        )
+    )
+    db.flush()
+
+
+def update_cooccurrence(db: Session) -> int:
+    """
+    Bring the co-occurrence counts and neighbors up to date.
+
+    Only candidates whose skills changed since the last run are read. The
+    counts are computed in full on the first run and when the changes since
+    the last run were pruned from the change log.
+
+    Args:
+        db (Session): A session on the primary; the caller commits.
+
+    Returns:
+        int: The number of skills whose neighbors were refreshed.
+    """
+    # Serializes concurrent runs on PostgreSQL.
+    state = db.get(SkillCooccurrenceState, STATE_ID, with_for_update=True)
+    oldest = get_oldest_change_sequence(db)
+    if state is None or (oldest is not None and state.synced_seq < oldest - 1):
+        return rebuild_cooccurrence(db)
+
+    settled_before = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    since = int(state.synced_seq)
+    candidate_ids: Set[str] = set()
+    while True:
+        changes = get_changes(db, since, CHANGE_PAGE_SIZE, settled_before)
+        candidate_ids.update(
+            str(change.candidate_id)
+            for change in changes
+            if change.candidate_id and (change.entity == SKILL or change.op == DELETE)
+        )
+        if changes:
+            since = int(changes[-1].seq)
+        if len(changes) < CHANGE_PAGE_SIZE:
+            break
+
+    changed_skills: Set[str] = set()
+    ordered_ids = sorted(candidate_ids)
+    for start in range(0, len(ordered_ids), CANDIDATE_BATCH_SIZE):
+        changed_skills |= _apply_candidates(
+            db, ordered_ids[start : start + CANDIDATE_BATCH_SIZE]
+        )
+    refresh_neighbors(db, changed_skills)
+    _save_state(db, since)
+    return len(changed_skills)
@@ -0,0 +1,250 @@
+"""
+Publish Celery tasks without letting broker trouble reach the request path.
+
+Tasks are published through a pool of pre-connected producers with short
+connect and socket timeouts and no publish retries. When the broker cannot be
+reached the task is put on a bounded in-process spool instead, and a
+background thread keeps retrying it. After a failed publish the broker is
+skipped for `TASK_BROKER_RETRY_SECONDS`, so while it is down requests only
+touch the spool.
+
+The Celery app is imported on first publish, importing this module is cheap.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import CELERY_DISPATCH_SPOOLED
+
+load_dotenv()
+
+# Seconds a publish may spend connecting to or writing to the broker.
+TASK_PUBLISH_TIMEOUT = float(os.getenv("TASK_PUBLISH_TIMEOUT", "0.25"))
+# Tasks kept in memory while the broker is unavailable.
+TASK_SPOOL_SIZE = int(os.getenv("TASK_SPOOL_SIZE", "1000"))
+# Seconds between attempts to publish spooled tasks, and for which requests
+# skip the broker after a failed publish.
+TASK_BROKER_RETRY_SECONDS = float(os.getenv("TASK_BROKER_RETRY_SECONDS", "5"))
+# Producers, and with them broker connections, kept open per process.
+TASK_PRODUCER_POOL_SIZE = int(os.getenv("TASK_PRODUCER_POOL_SIZE", "4"))
+
+logger = logging.getLogger(__name__)
+
+SpooledTask = Tuple[str, str, tuple, Dict]
+
+
+class DispatchUnavailable(Exception):
+    """
+    Raised when the broker is unavailable and the local spool is full.
+    """
+
+
+class _Dispatcher:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.spool: Deque[SpooledTask] = deque()
+        self.broker_down_until = 0.0
+        self.flusher: Optional[threading.Thread] = None
+        self.producers = None
+
+
+_dispatcher = _Dispatcher()
+
+
+def _reset_after_fork() -> None:
+    global _dispatcher
+    _dispatcher = _Dispatcher()
+    CELERY_DISPATCH_SPOOLED.set(0)
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _producer_pool():
+    with _dispatcher.lock:
+        if _dispatcher.producers is None:
+            from kombu.pools import ProducerPool
+
+            from app.celery.tasks import app as celery_app
+
+            # Connections are opened lazily, on first use of a producer.
+            connection = celery_app.connection_for_write(
+                connect_timeout=TASK_PUBLISH_TIMEOUT,
+                transport_options={
+                    "socket_connect_timeout": TASK_PUBLISH_TIMEOUT,
+                    "socket_timeout": TASK_PUBLISH_TIMEOUT,
+                    "max_retries": 0,
+                },
+            )
+            _dispatcher.producers = ProducerPool(
+                connection.Pool(limit=TASK_PRODUCER_POOL_SIZE),
+                limit=TASK_PRODUCER_POOL_SIZE,
+            )
+        return _dispatcher.producers
+
+
+def _discard_producers(producers) -> None:
+    # The next publish starts a new pool. Producers other threads still hold
+    # keep their connections and return them to the discarded pool; a pool
+    # another thread already replaced is left alone.
+    with _dispatcher.lock:
+        if _dispatcher.producers is producers:
+            _dispatcher.producers = None
+
+
+def _publish(task_name: str, task_id: str, args: tuple, kwargs: Dict) -> None:
+    from app.celery.tasks import app as celery_app
+
+    producers = _producer_pool()
+    try:
+        with producers.acquire(block=True, timeout=TASK_PUBLISH_TIMEOUT) as producer:
+            try:
+                # The API never waits for results, so the publish skips
+                # subscribing to the result backend, another blocking round
+                # trip.
+                celery_app.send_task(
+                    task_name,
+                    args=args,
+                    kwargs=kwargs,
+                    task_id=task_id,
+                    producer=producer,
+                    retry=False,
+                    ignore_result=True,
+                )
+            except Exception:
+                # The connection may be half broken; drop it without I/O.
+                producer.connection.collect()
+                raise
+    except Exception:
+        _discard_producers(producers)
+        raise
+
+
+def publish_task(
+    task_name: str,
+    args: tuple = (),
+    kwargs: Optional[Dict] = None,
+    task_id: Optional[str] = None,
+) -> str:
+    """
+    Publish a task by name, spooling it locally if the broker is unavailable.
+
+    Args:
+        task_name (str): The registered Celery task name.
+        args (tuple): Positional arguments for the task.
+        kwargs (Optional[Dict]): Keyword arguments for the task.
+        task_id (Optional[str]): The id to publish the task with, a new one
+                                 when omitted.
+
+    Returns:
+        str: The task id, the same whether the task was published or spooled.
+
+    Raises:
+        DispatchUnavailable: If the task could not be published and the
+                             spool already holds TASK_SPOOL_SIZE tasks.
+    """
+    task_id = task_id or str(uuid4())
+    kwargs = kwargs or {}
+
+    if time.monotonic() >= _dispatcher.broker_down_until:
+        try:
+            _publish(task_name, task_id, args, kwargs)
+            return task_id
+        except Exception as e:
+            _dispatcher.broker_down_until = time.monotonic() + TASK_BROKER_RETRY_SECONDS
+            logger.warning("publishing %s failed, spooling it: %s", task_name, e)
+
+    _spool((task_name, task_id, args, kwargs))
+    return task_id
+
+
+def _spool(task: SpooledTask) -> None:
+    with _dispatcher.lock:
+        if len(_dispatcher.spool) >= TASK_SPOOL_SIZE:
+            raise DispatchUnavailable(
+                f"broker unavailable and {TASK_SPOOL_SIZE} tasks already spooled"
+            )
+        _dispatcher.spool.append(task)
+        CELERY_DISPATCH_SPOOLED.set(len(_dispatcher.spool))
+        if _dispatcher.flusher is None or not _dispatcher.flusher.is_alive():
+            _dispatcher.flusher = threading.Thread(
+                target=_flush_forever, args=(_dispatcher,), daemon=True
+            )
+            _dispatcher.flusher.start()
+
+
+def flush_spool() -> int:
+    """
+    Publish spooled tasks in order until the spool is empty or a publish fails.
+
+    Returns:
+        int: The number of tasks published.
+    """
+    published = 0
+    while True:
+        with _dispatcher.lock:
+            if not _dispatcher.spool:
+                break
+            task = _dispatcher.spool[0]
+        try:
+            _publish(*task)
+        except Exception as e:
+            _dispatcher.broker_down_until = time.monotonic() + TASK_BROKER_RETRY_SECONDS
+            logger.debug("broker still unavailable: %s", e)
+            break
+        with _dispatcher.lock:
+            _dispatcher.spool.popleft()
+            CELERY_DISPATCH_SPOOLED.set(len(_dispatcher.spool))
+        published += 1
+
+    if published:
+        logger.info("published %d spooled tasks", published)
+        _dispatcher.broker_down_until = 0.0
+    return published
+
+
+def spooled_tasks() -> int:
+    """
+    Return the number of tasks waiting in the local spool.
+    """
+    return len(_dispatcher.spool)
+
+
+def _flush_forever(dispatcher: _Dispatcher) -> None:
+    # Exits when the spool is drained; the next spooled task starts a new one.
+    while dispatcher is _dispatcher:
+        time.sleep(TASK_BROKER_RETRY_SECONDS)
+        flush_spool()
+        with dispatcher.lock:
+            if not dispatcher.spool:
+                dispatcher.flusher = None
+                return
+
+
+def warm_up() -> None:
+    """
+    Open the pooled broker connections ahead of the first publish.
+
+    Failures are only logged; publishing falls back to the spool anyway.
+    """
+    producers = None
+    try:
+        producers = _producer_pool()
+        with producers.acquire(block=True, timeout=TASK_PUBLISH_TIMEOUT) as producer:
+            try:
+                producer.connection.ensure_connection(
+                    max_retries=1, interval_start=0, timeout=TASK_PUBLISH_TIMEOUT
+                )
+            except Exception:
+                producer.connection.collect()
+                raise
+    except Exception as e:
+        _discard_producers(producers)
+        logger.warning("could not connect to the broker: %s", e)
@@ -0,0 +1,405 @@
+"""
+Near-duplicate candidate detection.
+
+The job runs as a map-reduce over files in a shared run directory:
+
+1. Map: every shard of candidates (an id range) computes blocking keys per
+   candidate and appends them, with the candidate's contact details, to one
+   file per partition of the key space.
+2. Reduce: every partition groups its rows by key and scores the candidate
+   pairs sharing a key, so only candidates that share a key are compared.
+3. Report: the scored pairs of all partitions are merged into clusters and
+   written as a CSV for review.
+
+Blocking keys are the normalized email and phone and the LSH bands of a
+MinHash signature of the name, so names with typos still share a band with
+high probability.
+"""
+
+import csv
+import glob
+import hashlib
+import os
+import re
+import shutil
+import unicodedata
+import zlib
+from contextlib import suppress
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.celery.state import REPORTS_DIR
+from app.db.database import read_session_scope
+from app.db_queries.candidate_queries import (
+    get_candidate_shard_bounds,
+    iter_candidate_contacts,
+)
+from app.utils.ids import uuid7
+
+load_dotenv()
+
+# Candidates per map task.
+DUPLICATES_SHARD_SIZE = int(os.getenv("DUPLICATES_SHARD_SIZE", "50000"))
+# Reduce tasks; every blocking key belongs to one of them.
+DUPLICATES_PARTITIONS = int(os.getenv("DUPLICATES_PARTITIONS", "16"))
+# Pairs scoring at least this much are reported.
+DUPLICATES_MIN_SCORE = float(os.getenv("DUPLICATES_MIN_SCORE", "0.6"))
+# Keys shared by more candidates, e.g. a very common name, are not paired.
+DUPLICATES_MAX_BUCKET = int(os.getenv("DUPLICATES_MAX_BUCKET", "50"))
+# 8 bands of 4 hashes: names with a shingle Jaccard similarity of 0.6 share
+# a band with a probability of 0.68, at 0.8 of 0.98.
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MINHASH_BATCH_SIZE = 5000
+# Phone numbers are compared by their last digits, so country codes and
+# trunk prefixes do not matter.
+PHONE_DIGITS = 9
+
+# The same hash functions in every process.
+_rng = np.random.default_rng(20241019)
+_MINHASH_A = _rng.integers(1, 2**63, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+_MINHASH_A |= np.uint64(1)
+_MINHASH_B = _rng.integers(0, 2**63, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+
+REPORT_COLUMNS = (
+    "cluster",
+    "score",
+    "name_similarity",
+    "email_similarity",
+    "same_phone",
+    "id",
+    "name",
+    "email",
+    "phone",
+    "duplicate_id",
+    "duplicate_name",
+    "duplicate_email",
+    "duplicate_phone",
+)
+
+Contact = Tuple[str, str, str, str]
+
+
+def normalize_name(name: str) -> str:
+    """
+    Fold case and accents, drop punctuation and sort the words of a name.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(sorted(re.findall(r"\w+", name.lower())))
+
+
+def normalize_email(email: str) -> str:
+    """
+    Lower-case an address and drop its `+tag`, and the dots Gmail ignores.
+    """
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: str) -> str:
+    digits = re.sub(r"\D", "", phone)
+    return digits[-PHONE_DIGITS:] if len(digits) >= 7 else ""
+
+
+def shingles(text: str) -> Set[str]:
+    text = f" {text} "
+    return {text[index : index + 3] for index in range(len(text) - 2)}
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def minhash_signatures(texts: Sequence[str]) -> np.ndarray:
+    """
+    Compute the MinHash signatures of texts, vectorized over all shingles.
+
+    Args:
+        texts (Sequence[str]): Normalized texts, none of them empty.
+
+    Returns:
+        np.ndarray: One row of MINHASH_BANDS * MINHASH_ROWS hashes per text.
+    """
+    hashes: List[int] = []
+    offsets: List[int] = []
+    for text in texts:
+        offsets.append(len(hashes))
+        hashes.extend(zlib.crc32(shingle.encode()) for shingle in shingles(text))
+    values = np.array(hashes, dtype=np.uint64)[:, None]
+    # Multiply-shift hashing; uint64 arithmetic wraps around.
+    permuted = (values * _MINHASH_A + _MINHASH_B) >> np.uint64(32)
+    return np.minimum.reduceat(permuted, np.array(offsets), axis=0)
+
+
+def blocking_keys(contacts: Sequence[Contact]) -> Iterable[Tuple[str, Contact]]:
+    """
+    Yield the blocking keys of candidates.
+
+    Args:
+        contacts (Sequence[Contact]): Id, name, email and phone of candidates.
+
+    Yields:
+        Tuple[str, Contact]: A key and the candidate it belongs to.
+    """
+    named = []
+    for contact in contacts:
+        _, name, email, phone = contact
+        yield f"e:{normalize_email(email)}", contact
+        phone = normalize_phone(phone)
+        if phone:
+            yield f"p:{phone}", contact
+        name = normalize_name(name)
+        if name:
+            named.append((name, contact))
+    if not named:
+        return
+    signatures = minhash_signatures([name for name, _ in named])
+    for (_, contact), signature in zip(named, signatures):
+        for band in range(MINHASH_BANDS):
+            rows = signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+            yield f"n{band}:{digest}", contact
+
+
+def _partition(key: str) -> int:
+    return zlib.crc32(key.encode()) % DUPLICATES_PARTITIONS
+
+
+def start_run() -> str:
+    """
+    Create the directory the tasks of one detection run exchange files in.
+    """
+    run_dir = os.path.join(REPORTS_DIR, f"duplicates__{uuid7().hex}")
+    os.makedirs(run_dir)
+    return run_dir
+
+
+def discard_run(run_dir: str) -> None:
+    """
+    Remove the directory of a finished or failed detection run.
+    """
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def get_shards() -> List[Tuple[str, Optional[str]]]:
+    """
+    Split the candidates into id ranges of DUPLICATES_SHARD_SIZE.
+    """
+    with read_session_scope() as db:
+        bounds = get_candidate_shard_bounds(db, DUPLICATES_SHARD_SIZE)
+    return list(zip(bounds, bounds[1:] + [None]))
+
+
+def map_shard(run_dir: str, shard: int, start_id: str, end_id: Optional[str]) -> int:
+    """
+    Write the blocking keys of a shard of candidates to the partition files.
+
+    Args:
+        run_dir (str): The directory of the run.
+        shard (int): The number of the shard, naming its files.
+        start_id (str): The first candidate id of the shard.
+        end_id (Optional[str]): The id the shard ends before.
+
+    Returns:
+        int: The number of candidates in the shard.
+    """
+    files = [
+        open(
+            os.path.join(run_dir, f"keys-{partition}-{shard}.tsv"),
+            "w",
+            newline="",
+            encoding="utf-8",
+        )
+        for partition in range(DUPLICATES_PARTITIONS)
+    ]
+    writers = [csv.writer(file, delimiter="\t") for file in files]
+    count = 0
+    try:
+        with read_session_scope() as db:
+            batch: List[Contact] = []
+            for contact_id, name, email, phone in iter_candidate_contacts(
+                db, start_id, end_id
+            ):
+                batch.append((contact_id, name, email, phone))
+                if len(batch) == MINHASH_BATCH_SIZE:
+                    count += _write_keys(writers, batch)
+                    batch = []
+            count += _write_keys(writers, batch)
+    finally:
+        for file in files:
+            file.close()
+    return count
+
+
+def _write_keys(writers: List, contacts: List[Contact]) -> int:
+    for key, contact in blocking_keys(contacts):
+        writers[_partition(key)].writerow((key, *contact))
+    return len(contacts)
+
+
+def score_pair(first: Contact, second: Contact) -> Tuple[float, float, float, bool]:
+    """
+    Score how likely two candidates are the same person.
+
+    The mean of the name similarity and the better of the email and phone
+    similarities, so one shared contact detail and a similar name suffice.
+    Emails that differ after normalization are compared by the shingles of
+    their local part; phones match or not.
+
+    Returns:
+        Tuple[float, float, float, bool]: The score between 0 and 1, the name
+                                          and email similarities and whether
+                                          the phones match.
+    """
+    name = jaccard(
+        shingles(normalize_name(first[1])), shingles(normalize_name(second[1]))
+    )
+    first_email, second_email = normalize_email(first[2]), normalize_email(second[2])
+    if first_email == second_email:
+        email = 1.0
+    else:
+        email = jaccard(
+            shingles(first_email.rpartition("@")[0]),
+            shingles(second_email.rpartition("@")[0]),
+        )
+    first_phone = normalize_phone(first[3])
+    same_phone = bool(first_phone) and first_phone == normalize_phone(second[3])
+    return (name + max(email, same_phone)) / 2, name, email, same_phone
+
+
+def reduce_partition(run_dir: str, partition: int) -> int:
+    """
+    Score the candidate pairs that share a key of a partition.
+
+    Args:
+        run_dir (str): The directory of the run.
+        partition (int): The partition of the key space.
+
+    Returns:
+        int: The number of pairs scoring at least DUPLICATES_MIN_SCORE.
+    """
+    buckets: Dict[str, Dict[str, Contact]] = {}
+    for path in glob.glob(os.path.join(run_dir, f"keys-{partition}-*.tsv")):
+        with open(path, newline="", encoding="utf-8") as file:
+            for key, *contact in csv.reader(file, delimiter="\t"):
+                contact_id, contact_name, contact_email, contact_phone = contact
+                buckets.setdefault(key, {})[contact_id] = (
+                    contact_id,
+                    contact_name,
+                    contact_email,
+                    contact_phone,
+                )
+
+    seen: Set[Tuple[str, str]] = set()
+    found = 0
+    with open(
+        os.path.join(run_dir, f"pairs-{partition}.tsv"),
+        "w",
+        newline="",
+        encoding="utf-8",
+    ) as file:
+        writer = csv.writer(file, delimiter="\t")
+        for bucket in buckets.values():
+            if len(bucket) > DUPLICATES_MAX_BUCKET:
+                continue
+            for first, second in combinations(sorted(bucket.values()), 2):
+                if (first[0], second[0]) in seen:
+                    continue
+                seen.add((first[0], second[0]))
+                score, name, email, same_phone = score_pair(first, second)
+                if score >= DUPLICATES_MIN_SCORE:
+                    writer.writerow(
+                        (
+                            f"{score:.3f}",
+                            f"{name:.3f}",
+                            f"{email:.3f}",
+                            int(same_phone),
+                            *first,
+                            *second,
+                        )
+                    )
+                    found += 1
+    return found
+
+
+def _find(parents: Dict[str, str], candidate_id: str) -> str:
+    while parents.setdefault(candidate_id, candidate_id) != candidate_id:
+        parents[candidate_id] = parents[parents[candidate_id]]
+        candidate_id = parents[candidate_id]
+    return candidate_id
+
+
+def write_report(run_dir: str) -> str:
+    """
+    Merge the scored pairs of all partitions into a duplicates report.
+
+    A pair found through several keys is reported once. Pairs are grouped
+    into clusters of candidates linked by any pair, numbered from 1, and
+    sorted by cluster and descending score. The run directory is removed.
+
+    Args:
+        run_dir (str): The directory of the run.
+
+    Returns:
+        str: The file path of the CSV report.
+    """
+    pairs = {}
+    for path in glob.glob(os.path.join(run_dir, "pairs-*.tsv")):
+        with open(path, newline="", encoding="utf-8") as file:
+            for row in csv.reader(file, delimiter="\t"):
+                pairs[(row[4], row[8])] = row
+
+    parents: Dict[str, str] = {}
+    for first, second in pairs:
+        parents[_find(parents, first)] = _find(parents, second)
+    clusters: Dict[str, int] = {}
+    rows: List[Tuple[Any, ...]] = []
+    for (first, _), row in sorted(pairs.items()):
+        cluster = clusters.setdefault(_find(parents, first), len(clusters) + 1)
+        rows.append((cluster, *row))
+    rows.sort(key=lambda row: (row[0], -float(row[1])))
+
+    report_path = f"{run_dir}.csv"
+    partial_path = f"{report_path}.partial"
+    try:
+        with open(partial_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(REPORT_COLUMNS)
+            writer.writerows(rows)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, report_path)
+    discard_run(run_dir)
+    return report_path
+
+
+def find_duplicate_candidates() -> str:
+    """
+    Run every step of the detection in this process, e.g. for small tables
+    or without workers. The Celery task runs the shards and partitions as
+    parallel tasks instead.
+
+    Returns:
+        str: The file path of the CSV report.
+    """
+    run_dir = start_run()
+    try:
+        for shard, (start_id, end_id) in enumerate(get_shards()):
+            map_shard(run_dir, shard, start_id, end_id)
+        for partition in range(DUPLICATES_PARTITIONS):
+            reduce_partition(run_dir, partition)
+    except BaseException:
+        discard_run(run_dir)
+        raise
+    return write_report(run_dir)
@@ -0,0 +1,85 @@
+import csv
+import os
+from contextlib import suppress
+from uuid import uuid1
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+
+from app.celery.state import REPORTS_DIR, report_progress
+from app.db.database import read_session_scope
+from app.db_queries.candidate_queries import iter_candidate_chunks
+from app.models import Candidate
+
+load_dotenv()
+
+# Candidates loaded, written and reported as progress at a time.
+REPORT_CHUNK_SIZE = int(os.getenv("REPORT_CHUNK_SIZE", "1000"))
+# How long a finished report is handed out again for identical requests.
+# The data version follows the change log, whose latest number only misses a
+# write that commits after a later-numbered one, so this bounds how stale a
+# report gets then.
+REPORT_CACHE_SECONDS = float(os.getenv("REPORT_CACHE_SECONDS", "3600"))
+# Pending or running reports whose state did not change for this long are
+# presumed lost (e.g. a worker died) and no longer joined by new requests.
+REPORT_STALE_SECONDS = float(os.getenv("REPORT_STALE_SECONDS", "600"))
+
+
+def write_candidates_csv_file() -> str:
+    """
+    Generate a CSV file containing candidate information.
+
+    This function retrieves all candidates from the database and writes their details
+    to a CSV file, including their ID, name, email, skills, and experience. The
+    CSV file is saved in the reports directory with a unique filename. It is
+    the body of the report task for every task backend.
+
+    Candidates are read in chunks of REPORT_CHUNK_SIZE in id order. Progress is
+    reported after every chunk, where a cancelled task stops. The file is
+    written under a temporary name and only renamed once complete, a failed
+    or cancelled report leaves no file behind.
+
+    Returns:
+        str: The file path of the generated CSV file.
+
+    Raises:
+        TaskCancelled: If the report task was cancelled.
+        Exception: If there is an issue with database access or file writing.
+    """
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    file_name = f"candidates__{str(uuid1().int)[:8]}.csv"
+    csv_file_path = os.path.join(REPORTS_DIR, file_name)
+    partial_file_path = f"{csv_file_path}.partial"
+
+    try:
+        with read_session_scope() as db, open(
+            partial_file_path, mode="w", newline=""
+        ) as file:
+            total = db.scalar(select(func.count(Candidate.id))) or 0
+            writer = csv.writer(file)
+
+            # Write the header
+            writer.writerow(["id", "name", "email", "skills", "experience"])
+            processed = 0
+            report_progress(processed, total)
+            for candidates in iter_candidate_chunks(db, REPORT_CHUNK_SIZE):
+                for candidate in candidates:
+                    writer.writerow(
+                        [
+                            candidate.id,
+                            candidate.name,
+                            candidate.email,
+                            [skill.name for skill in candidate.skills],
+                            candidate.experience,
+                        ]
+                    )
+                processed += len(candidates)
+                report_progress(processed, max(total, processed))
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(partial_file_path)
+        raise
+
+    os.replace(partial_file_path, csv_file_path)
+    return csv_file_path
@@ -0,0 +1,302 @@
+"""
+Task states shared by every task backend.
+
+Each task has a small JSON file named after its id. The API writes it when a
+task is submitted and the process running the task updates it, so the state
+can be read from any API process whichever backend ran the task.
+
+Cancellation is cooperative: the API leaves a marker file next to the state
+and the task checks for it whenever it reports progress. The marker is
+removed when the task ends; markers of tasks that never ran and fingerprint
+claims are removed by sweep_task_files.
+"""
+
+import glob
+import itertools
+import json
+import logging
+import os
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.ids import is_valid_uuid
+
+load_dotenv()
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", "reports")
+TASK_STATE_DIR = os.path.join(REPORTS_DIR, "tasks")
+FINGERPRINT_DIR = os.path.join(TASK_STATE_DIR, "fingerprints")
+
+# The states reported by Celery's AsyncResult.
+PENDING = "PENDING"
+STARTED = "STARTED"
+SUCCESS = "SUCCESS"
+FAILURE = "FAILURE"
+REVOKED = "REVOKED"
+READY_STATES = (SUCCESS, FAILURE, REVOKED)
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a task whose cancellation was requested.
+    """
+
+
+class TaskProgress:
+    """
+    Progress of the task running in this process.
+    """
+
+    def __init__(self, task_id: str) -> None:
+        self.task_id = task_id
+        self.started = time.monotonic()
+
+    def update(self, processed: int, total: int) -> None:
+        """
+        Record how many of the task's items are done.
+
+        Args:
+            processed (int): Items processed so far.
+            total (int): Items the task processes in all.
+
+        Raises:
+            TaskCancelled: If cancellation of the task was requested.
+        """
+        if is_cancel_requested(self.task_id):
+            raise TaskCancelled(self.task_id)
+
+        elapsed = time.monotonic() - self.started
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        write_task_state(
+            self.task_id,
+            STARTED,
+            processed=processed,
+            total=total,
+            items_per_second=round(rate, 2),
+            eta_seconds=round((total - processed) / rate, 2) if rate else None,
+        )
+
+
+current_task: ContextVar[Optional[TaskProgress]] = ContextVar(
+    "current_task", default=None
+)
+
+
+def report_progress(processed: int, total: int) -> None:
+    """
+    Record progress of the current task; does nothing outside of a task.
+
+    Task bodies call this between chunks of work, which is also where they
+    stop when cancelled.
+
+    Args:
+        processed (int): Items processed so far.
+        total (int): Items the task processes in all.
+
+    Raises:
+        TaskCancelled: If cancellation of the current task was requested.
+    """
+    progress = current_task.get()
+    if progress is not None:
+        progress.update(processed, total)
+
+
+def _state_path(task_id: str) -> str:
+    return os.path.join(TASK_STATE_DIR, f"{task_id}.json")
+
+
+def _cancel_path(task_id: str) -> str:
+    return os.path.join(TASK_STATE_DIR, f"{task_id}.cancel")
+
+
+def write_task_state(task_id: str, state: str, **fields: Any) -> None:
+    """
+    Replace the stored state of a task.
+
+    The file is written next to its final path and renamed, so readers never
+    see a partially written state.
+
+    Args:
+        task_id (str): The task id.
+        state (str): One of PENDING, STARTED, SUCCESS, FAILURE or REVOKED.
+        **fields: Extra JSON serializable values, e.g. the result.
+    """
+    os.makedirs(TASK_STATE_DIR, exist_ok=True)
+    record = {"task_id": task_id, "state": state, "updated_at": time.time()}
+    record.update(fields)
+    path = _state_path(task_id)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(record, file)
+    os.replace(temporary_path, path)
+
+
+def read_task_state(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the stored state of a task.
+
+    Args:
+        task_id (str): The task id.
+
+    Returns:
+        Optional[Dict[str, Any]]: The state record, or None for unknown ids.
+    """
+    if not is_valid_uuid(task_id):
+        return None
+    try:
+        with open(_state_path(task_id)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def request_cancel(task_id: str) -> None:
+    """
+    Ask a pending or running task to stop.
+
+    Args:
+        task_id (str): The task id.
+    """
+    os.makedirs(TASK_STATE_DIR, exist_ok=True)
+    with open(_cancel_path(task_id), "w"):
+        pass
+
+
+def is_cancel_requested(task_id: str) -> bool:
+    """
+    Check whether cancellation of a task was requested.
+
+    Args:
+        task_id (str): The task id.
+
+    Returns:
+        bool: True once request_cancel was called for the task.
+    """
+    return os.path.exists(_cancel_path(task_id))
+
+
+def claim_fingerprint(fingerprint: str, task_id: str) -> Optional[str]:
+    """
+    Make a task the one producing the output identified by a fingerprint.
+
+    The claim is an exclusive file creation, so of several processes claiming
+    the same fingerprint at once exactly one succeeds.
+
+    Args:
+        fingerprint (str): Identifies the task's output, e.g. a hash of its
+                           parameters and the version of the data it reads.
+        task_id (str): The task that would produce it.
+
+    Returns:
+        Optional[str]: None if the claim succeeded, otherwise the id of the
+                       task holding the fingerprint.
+    """
+    os.makedirs(FINGERPRINT_DIR, exist_ok=True)
+    path = os.path.join(FINGERPRINT_DIR, fingerprint)
+    try:
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+    except FileExistsError:
+        try:
+            with open(path) as file:
+                return file.read() or task_id
+        except FileNotFoundError:
+            # Released in between; let the caller try again.
+            return task_id
+    with os.fdopen(descriptor, "w") as file:
+        file.write(task_id)
+    return None
+
+
+def sweep_task_files(max_age_seconds: float) -> int:
+    """
+    Remove fingerprint claims and cancel markers older than a given age.
+
+    Claims only serve requests while their report is pending, running or
+    fresh, and markers are left behind by tasks that never ran. Task states
+    are kept, they are looked up by id.
+
+    Args:
+        max_age_seconds (float): The age from which files are removed.
+
+    Returns:
+        int: The number of removed files.
+    """
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in itertools.chain(
+        glob.glob(os.path.join(FINGERPRINT_DIR, "*")),
+        glob.glob(os.path.join(TASK_STATE_DIR, "*.cancel")),
+    ):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def release_fingerprint(fingerprint: str, task_id: str) -> None:
+    """
+    Drop a task's claim on a fingerprint, e.g. once its output is stale.
+
+    Args:
+        fingerprint (str): The claimed fingerprint.
+        task_id (str): The task expected to hold it; a newer claim by another
+                       task is left alone.
+    """
+    path = os.path.join(FINGERPRINT_DIR, fingerprint)
+    try:
+        with open(path) as file:
+            if file.read() != task_id:
+                return
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def run_tracked(task_id: str, function: Callable, *args: Any) -> Any:
+    """
+    Run a task function and record its progress through the task states.
+
+    The function can report progress with report_progress, which raises
+    TaskCancelled once the task is cancelled; the task then ends as REVOKED.
+
+    Args:
+        task_id (str): The id the task was submitted with.
+        function (Callable): The task body; its return value is stored as
+                             the result and must be JSON serializable.
+        *args: Arguments for the function.
+
+    Returns:
+        Any: The return value of the function, None if it was cancelled.
+
+    Raises:
+        Exception: Whatever the function raised, after recording FAILURE.
+    """
+    token = current_task.set(TaskProgress(task_id))
+    try:
+        if is_cancel_requested(task_id):
+            raise TaskCancelled(task_id)
+        write_task_state(task_id, STARTED)
+        result = function(*args)
+    except TaskCancelled:
+        logger.info("task %s cancelled", task_id)
+        write_task_state(task_id, REVOKED)
+        return None
+    except Exception as e:
+        logger.exception("task %s failed", task_id)
+        write_task_state(task_id, FAILURE, error=repr(e))
+        raise
+    finally:
+        current_task.reset(token)
+        with suppress(FileNotFoundError):
+            os.remove(_cancel_path(task_id))
+    write_task_state(task_id, SUCCESS, result=result)
+    return result
@@ -1,16 +1,43 @@
-import csv
+import logging
 import os
-from uuid import uuid1
+import time
+from datetime import datetime, timedelta
+from typing import Optional
 
-from celery import Celery
+from celery import Celery, chain, group, signals
+from celery.schedules import crontab
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.models import Candidate
+from app.celery import duplicates
+from app.celery.cooccurrence import update_cooccurrence
+from app.celery.reports import (
+    REPORT_CACHE_SECONDS,
+    REPORT_STALE_SECONDS,
+    write_candidates_csv_file,
+)
+from app.celery.state import run_tracked, sweep_task_files
+from app.db.database import (
+    dispose_engines,
+    named_engines,
+    warm_up_engines,
+    write_session_scope,
+)
+from app.db_queries.candidate_queries import (
+    rebuild_candidate_documents,
+    refresh_open_experience_metrics,
+)
+from app.db_queries.change_queries import prune_change_log
+from app.utils.metrics import (
+    CELERY_TASK_DURATION,
+    CELERY_TASKS,
+    CELERY_TASKS_PUBLISHED,
+)
 
 load_dotenv()
 
+# Days the change feed keeps changes; readers further behind have to resync.
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7"))
+
 app = Celery(
     __name__,
     broker=os.getenv("CELERY_BROKER_URL"),
@@ -19,18 +46,84 @@ app = Celery(
 
 app.conf.broker_connection_retry_on_startup = True
 
-OUTPUT_DIR = "reports"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Run by the beat service, see docker-compose.yml.
+app.conf.beat_schedule = {
+    "refresh-experience-metrics": {
+        "task": "app.celery.tasks.refresh_experience_metrics",
+        "schedule": crontab(hour=0, minute=5),
+    },
+    "prune-change-log": {
+        "task": "app.celery.tasks.prune_change_log",
+        "schedule": crontab(hour=1, minute=5),
+    },
+    "update-skill-cooccurrence": {
+        "task": "app.celery.tasks.update_skill_cooccurrence",
+        "schedule": crontab(minute="*/10"),
+    },
+    "sweep-task-files": {
+        "task": "app.celery.tasks.sweep_task_files",
+        "schedule": crontab(minute=35),
+    },
+}
 
+logger = logging.getLogger(__name__)
 
-@app.task
-def generate_candidates_csv_file() -> str:
+_task_started_at: dict[str, float] = {}
+
+
+@signals.worker_process_init.connect
+def _init_worker_process(**kwargs):
+    # Each prefork child has its own pools, the parent's connections were
+    # dropped after the fork (see dispose_engines_after_fork), as Celery does
+    # for its broker pools. Connect before the first task arrives.
+    try:
+        warm_up_engines()
+    except Exception:
+        logger.exception("database warmup failed")
+
+
+@signals.worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    dispose_engines()
+
+
+@signals.task_postrun.connect
+def _check_connections_returned(task=None, **kwargs):
+    # Tasks use session scopes, so no connection may stay checked out between
+    # runs; a leak would keep one connection per run open.
+    for name, engine in named_engines().items():
+        checked_out = getattr(engine.pool, "checkedout", lambda: 0)()
+        if checked_out:
+            logger.warning(
+                "%s left %d %s connections checked out", task.name, checked_out, name
+            )
+
+
+@signals.after_task_publish.connect
+def _count_published_task(sender=None, **kwargs):
+    CELERY_TASKS_PUBLISHED.labels(sender).inc()
+
+
+@signals.task_prerun.connect
+def _start_task_timer(task_id=None, **kwargs):
+    _task_started_at[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def _record_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    CELERY_TASKS.labels(task.name, state).inc()
+    started = _task_started_at.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+
+
+@app.task(bind=True)
+def generate_candidates_csv_file(self) -> str:
     """
     Generate a CSV file containing candidate information.
 
-    This function retrieves all candidates from the database and writes their details
-    to a CSV file, including their ID, name, email, skills, and experience. The
-    CSV file is saved in the specified output directory with a unique filename.
+    Progress is recorded in the shared task states under the Celery task id,
+    see app.celery.state.
 
     Returns:
         str: The file path of the generated CSV file.
@@ -38,27 +131,157 @@ def generate_candidates_csv_file() -> str:
     Raises:
         Exception: If there is an issue with database access or file writing.
     """
+    if self.request.id is None:
+        # Called directly instead of through a worker.
+        return write_candidates_csv_file()
+    return run_tracked(self.request.id, write_candidates_csv_file)
+
+
+@app.task
+def refresh_experience_metrics() -> int:
+    """
+    Recount the experience months of candidates with open positions.
+
+    Scheduled daily, since open positions count up to the current date.
+
+    Returns:
+        int: The number of candidates whose values changed.
+    """
+    with write_session_scope() as db:
+        return refresh_open_experience_metrics(db)
+
+
+@app.task(name="app.celery.tasks.prune_change_log")
+def prune_change_log_task() -> int:
+    """
+    Delete changes older than CHANGE_LOG_RETENTION_DAYS from the change feed.
+
+    Returns:
+        int: The number of deleted changes.
+    """
+    before = datetime.now() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)
+    with write_session_scope() as db:
+        return prune_change_log(db, before)
+
+
+@app.task(name="app.celery.tasks.sweep_task_files")
+def sweep_task_files_task() -> int:
+    """
+    Remove report fingerprint claims and cancel markers that no request can
+    use any more.
+
+    Returns:
+        int: The number of removed files.
+    """
+    # A claim is at least as old as the state of its task, which new
+    # requests only join or reuse up to these ages.
+    return sweep_task_files(max(REPORT_CACHE_SECONDS, REPORT_STALE_SECONDS))
 
-    db: Session = next(get_db())
-    candidates = db.query(Candidate).all()
-    file_name = f"candidates__{str(uuid1().int)[:8]}.csv"
-    csv_file_path = os.path.join(OUTPUT_DIR, file_name)
-
-    with open(csv_file_path, mode="w", newline="") as file:
-        writer = csv.writer(file)
-
-        # Write the header
-        writer.writerow(["id", "name", "email", "skills", "experience"])
-        print(candidates)
-        for candidate in candidates:
-            writer.writerow(
-                [
-                    candidate.id,
-                    candidate.name,
-                    candidate.email,
-                    [skill.name for skill in candidate.skills],
-                    candidate.experience,
-                ]
-            )
 
-    return csv_file_path
+@app.task(name="app.celery.tasks.rebuild_candidate_documents")
+def rebuild_candidate_documents_task() -> int:
+    """
+    Rebuild the precomputed read documents of all candidates, e.g. after
+    enabling CANDIDATE_DOCUMENTS.
+
+    Returns:
+        int: The number of documents built.
+    """
+    with write_session_scope() as db:
+        return rebuild_candidate_documents(db)
+
+
+@app.task(name="app.celery.tasks.update_skill_cooccurrence")
+def update_skill_cooccurrence() -> int:
+    """
+    Apply the skill changes since the last run to the skill co-occurrence
+    counts and refresh the related skills of the changed skills.
+
+    Scheduled every ten minutes. Runs the full computation the first time
+    and when the change log no longer covers the changes since the last run.
+
+    Returns:
+        int: The number of skills whose related skills were refreshed.
+    """
+    with write_session_scope() as db:
+        return update_cooccurrence(db)
+
+
+@app.task(bind=True, name="app.celery.tasks.find_duplicate_candidates")
+def find_duplicate_candidates(self) -> str:
+    """
+    Find likely duplicate candidates and write them to a CSV report.
+
+    The task splits the candidates into shards and replaces itself with a
+    workflow of one map task per shard, then one reduce task per partition of
+    the blocking keys, each group running in parallel on the workers, and a
+    final task writing the report; see app.celery.duplicates. The workers
+    exchange files in REPORTS_DIR, which they all have to share. If any task
+    of the workflow fails, the files of the run are removed.
+
+    Returns:
+        str: The file path of the CSV report, the result of the final task.
+    """
+    shards = duplicates.get_shards()
+    run_dir = duplicates.start_run()
+    if not shards:
+        return duplicates.write_report(run_dir)
+    workflow = chain(
+        group(
+            map_duplicate_shard.si(run_dir, shard, start_id, end_id)
+            for shard, (start_id, end_id) in enumerate(shards)
+        ),
+        group(
+            reduce_duplicate_partition.si(run_dir, partition)
+            for partition in range(duplicates.DUPLICATES_PARTITIONS)
+        ),
+        write_duplicates_report.si(run_dir),
+    )
+    workflow.link_error(discard_duplicates_run.si(run_dir))
+    return self.replace(workflow)
+
+
+@app.task(name="app.celery.tasks.map_duplicate_shard")
+def map_duplicate_shard(
+    run_dir: str, shard: int, start_id: str, end_id: Optional[str]
+) -> int:
+    """
+    Write the blocking keys of one shard of candidates.
+
+    Returns:
+        int: The number of candidates in the shard.
+    """
+    return duplicates.map_shard(run_dir, shard, start_id, end_id)
+
+
+@app.task(name="app.celery.tasks.reduce_duplicate_partition")
+def reduce_duplicate_partition(run_dir: str, partition: int) -> int:
+    """
+    Score the candidate pairs of one partition of the blocking keys.
+
+    Returns:
+        int: The number of likely duplicate pairs.
+    """
+    return duplicates.reduce_partition(run_dir, partition)
+
+
+@app.task(name="app.celery.tasks.write_duplicates_report")
+def write_duplicates_report(run_dir: str) -> str:
+    """
+    Merge the pairs of all partitions into the duplicates report.
+
+    Returns:
+        str: The file path of the CSV report.
+    """
+    return duplicates.write_report(run_dir)
+
+
+@app.task(name="app.celery.tasks.discard_duplicates_run")
+def discard_duplicates_run(run_dir: str) -> None:
+    """
+    Remove the files of a detection run whose map or reduce task failed.
+
+    Linked as error callback to every task of the run, so it may run several
+    times for one run.
+    """
+    duplicates.discard_run(run_dir)
@@ -1,36 +1,377 @@
+import itertools
 import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from uuid import uuid4
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
 
+import jwt
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, String, DateTime
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, exc, text, Column, DateTime, Uuid
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.utils.ids import uuid7
 
 load_dotenv()
 
 DATABASE_URL = os.getenv(key="DATABASE_URL")
+# Comma separated URLs of read replicas; reads use the primary when empty.
+REPLICA_DATABASE_URLS = [
+    url.strip()
+    for url in os.getenv(key="REPLICA_DATABASE_URLS", default="").split(",")
+    if url.strip()
+]
+# How long after a write a client, and any client of the same user, keeps
+# reading from the primary.
+READ_YOUR_WRITES_SECONDS = float(os.getenv(key="READ_YOUR_WRITES_SECONDS", default="5"))
+# Connection pool bounds per engine and process. Celery children run one task
+# at a time and can use a pool of one, see docker-compose.yml.
+DB_POOL_SIZE = int(os.getenv(key="DB_POOL_SIZE", default="5"))
+DB_MAX_OVERFLOW = int(os.getenv(key="DB_MAX_OVERFLOW", default="10"))
+# Seconds after which pooled connections are replaced, -1 to keep them.
+DB_POOL_RECYCLE = int(os.getenv(key="DB_POOL_RECYCLE", default="1800"))
+LAST_WRITE_COOKIE = "last_write"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM")
+
+# Users whose last write is remembered before expired entries are dropped.
+MAX_REMEMBERED_WRITERS = 10_000
+
+# Time of the last write committed in this process per user, see wrote_recently.
+_last_write_by_user: Dict[str, float] = {}
+_last_write_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool keeping running totals of checkouts and the time spent waiting
+    for a connection, so they can be exported as metrics at scrape time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkout_count += 1
+                self.checkout_wait_seconds += waited
+
+
+@event.listens_for(Pool, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """
+    Turn on foreign key enforcement, and with it ON DELETE CASCADE, for SQLite
+    connections. Other databases always enforce foreign keys.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+@event.listens_for(Pool, "connect")
+def disable_pysqlite_transaction_handling(dbapi_connection, connection_record):
+    """
+    Stop the sqlite3 driver from managing transactions itself.
+
+    The driver only opens a transaction right before a data-modifying
+    statement, so a SAVEPOINT would start and its RELEASE end the whole
+    transaction. Transactions are begun explicitly instead, see
+    begin_sqlite_transaction.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, "begin")
+def begin_sqlite_transaction(connection):
+    # Sent on the driver connection, so it is not counted as a query.
+    dbapi_connection = connection.connection.driver_connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.execute("BEGIN")
+
+
+def _engine_options() -> Dict:
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """
+    Return the primary engine, creating it on first use.
+
+    Creating engines loads the database driver, so it is deferred until the
+    first session is needed instead of happening at import time.
+    """
+    return create_engine(url=DATABASE_URL, **_engine_options())
+
 
-engine = create_engine(url=DATABASE_URL)
+@lru_cache(maxsize=None)
+def get_replica_engines() -> Tuple[Engine, ...]:
+    """
+    Return the read replica engines, creating them on first use.
+    """
+    return tuple(
+        create_engine(url=url, **_engine_options()) for url in REPLICA_DATABASE_URLS
+    )
+
+
+@lru_cache(maxsize=None)
+def _replica_cycle() -> Iterator[Engine]:
+    return itertools.cycle(get_replica_engines())
+
+
+def named_engines() -> Dict[str, Engine]:
+    """
+    Return every engine of the application keyed by a stable name.
+
+    Returns:
+        Dict[str, Engine]: The primary engine as "primary" and the replicas as
+                           "replica_0", "replica_1", ...
+    """
+    engines = {"primary": get_engine()}
+    for index, replica_engine in enumerate(get_replica_engines()):
+        engines[f"replica_{index}"] = replica_engine
+    return engines
+
+
+def _created_engines() -> Tuple[Engine, ...]:
+    engines: Tuple[Engine, ...] = ()
+    if get_engine.cache_info().currsize:
+        engines += (get_engine(),)
+    if get_replica_engines.cache_info().currsize:
+        engines += get_replica_engines()
+    return engines
+
+
+def dispose_engines_after_fork() -> None:
+    """
+    Drop pooled connections inherited from the parent process.
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Runs in every forked child (preloading server workers, Celery prefork
+    children). `close=False` leaves the parent's sockets untouched; the child
+    simply starts with empty pools and opens its own connections.
+    """
+    for engine in _created_engines():
+        engine.dispose(close=False)
+
+
+def dispose_engines() -> None:
+    """
+    Close every pooled connection of the engines created in this process.
+    """
+    for engine in _created_engines():
+        engine.dispose()
+
+
+def warm_up_engines() -> None:
+    """
+    Open and check one connection per engine, so the first unit of work does
+    not pay for connecting and a bad database URL shows up at startup.
+    """
+    for engine in named_engines().values():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+os.register_at_fork(after_in_child=dispose_engines_after_fork)
+
+# Sessions are bound per call, see create_read_session and get_write_db.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
 class BaseModel(Base):  # type: ignore
     __abstract__ = True
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid7()))
     create_at = Column(DateTime, default=lambda: datetime.now())
     update_at = Column(
         DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now()
     )
 
 
-def get_db():
-    db = SessionLocal()
+def create_read_session() -> Session:
+    """
+    Create a session bound to the next read replica, or to the primary when
+    no replicas are configured.
+
+    Returns:
+        Session: A session meant for read-only work.
+    """
+    if not get_replica_engines():
+        return SessionLocal(bind=get_engine())
+    return SessionLocal(bind=next(_replica_cycle()))
+
+
+@contextmanager
+def read_session_scope(primary: bool = False) -> Iterator[Session]:
+    """
+    Provide a read session for a unit of work outside of a request.
+
+    The session is rolled back if the work fails and always closed, so its
+    connection goes back to the pool after every task run.
+
+    Args:
+        primary (bool): Read from the primary, for work that must see writes
+                        a replica may not have applied yet.
+
+    Yields:
+        Session: A session from create_read_session, or on the primary.
+    """
+    db = SessionLocal(bind=get_engine()) if primary else create_read_session()
+    try:
+        yield db
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@contextmanager
+def write_session_scope() -> Iterator[Session]:
+    """
+    Provide a primary session for a unit of work outside of a request.
+
+    The work is committed if it succeeds and rolled back otherwise, and the
+    session is always closed.
+
+    Yields:
+        Session: A session bound to the primary engine.
+    """
+    db = SessionLocal(bind=get_engine())
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _request_user(request: Request) -> Optional[str]:
+    # The session is chosen before authentication runs, so the user is taken
+    # from the bearer token directly; an invalid token is rejected later on.
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("email")
+    except jwt.InvalidTokenError:
+        return None
+
+
+def _remember_write(user: str) -> None:
+    now = time.time()
+    with _last_write_lock:
+        _last_write_by_user[user] = now
+        if len(_last_write_by_user) > MAX_REMEMBERED_WRITERS:
+            for key, last_write in list(_last_write_by_user.items()):
+                if now - last_write >= READ_YOUR_WRITES_SECONDS:
+                    del _last_write_by_user[key]
+
+
+def wrote_recently(request: Request) -> bool:
+    """
+    Check whether the client or its user committed a write within the
+    read-your-writes window.
+
+    The last write cookie covers the client across server processes. Writes
+    are also remembered per authenticated user in this process, so reads of
+    the user's other clients, or of clients dropping cookies, see them too.
+
+    Args:
+        request (Request): The incoming request carrying the last write cookie
+                           and the bearer token.
+
+    Returns:
+        bool: True if reads must go to the primary to see the client's own writes.
+    """
+    now = time.time()
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        last_write = 0.0
+    if now - last_write < READ_YOUR_WRITES_SECONDS:
+        return True
+    user = _request_user(request)
+    if user is None:
+        return False
+    with _last_write_lock:
+        last_write = _last_write_by_user.get(user, 0.0)
+    return now - last_write < READ_YOUR_WRITES_SECONDS
+
+
+def get_read_db(request: Request):
+    if wrote_recently(request):
+        db = SessionLocal(bind=get_engine())
+    else:
+        db = create_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db(request: Request, response: Response):
+    db = SessionLocal(bind=get_engine())
+
+    if get_replica_engines():
+        user = _request_user(request)
+
+        @event.listens_for(db, "after_commit")
+        def remember_write(session):
+            if user is not None:
+                _remember_write(user)
+            response.set_cookie(
+                key=LAST_WRITE_COOKIE,
+                value=str(time.time()),
+                max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+                httponly=True,
+            )
+
     try:
         yield db
-    except Exception as e:
-        raise e
     finally:
         db.close()
+
+
+def get_db(request: Request, response: Response):
+    """
+    Yield a session routed by HTTP method: reads go to a replica, writes to
+    the primary.
+
+    Authentication and the route share this dependency, so a request uses a
+    single session and connection.
+    """
+    if request.method in READ_METHODS:
+        yield from get_read_db(request=request)
+    else:
+        yield from get_write_db(request=request, response=response)
@@ -1,9 +1,42 @@
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
 from fastapi_pagination import Params, paginate, Page
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, selectinload
 
 from app.filters.candidate import CandidateFilter
 from app.models.candidate import Candidate
+from app.models.candidate_document import (
+    CandidateDocument,
+    build_candidate_documents,
+    save_candidate_documents,
+)
+from app.models.change_log import (
+    CANDIDATE,
+    DELETE,
+    UPDATE,
+    ChangeLog,
+    record_changes,
+)
+from app.models.experience import (
+    open_experience_candidate_ids,
+    refresh_experience_metrics,
+)
 from app.schemas.candidate import CandidateReadSchema
+from app.utils.ids import is_valid_uuid
+
+BULK_DELETE_CHUNK_SIZE = 1000
+EXPERIENCE_REFRESH_CHUNK_SIZE = 1000
+DOCUMENT_REBUILD_CHUNK_SIZE = 500
+
+# Load the relationships serialized by CandidateReadSchema with one query each
+# instead of one query per candidate.
+CANDIDATE_READ_OPTIONS = (
+    selectinload(Candidate.skills),
+    selectinload(Candidate.experience),
+)
 
 
 def get_candidate_by_email(email: str, db: Session) -> Candidate:
@@ -49,7 +82,7 @@ def add_new_candidate(candidate: Candidate, db: Session) -> None:
     db.commit()
 
 
-def get_candidate_by_id(id: str, db: Session) -> Candidate:
+def get_candidate_by_id(id: str, db: Session) -> Optional[Candidate]:
     """
     Retrieve a candidate from the database by their unique ID.
 
@@ -60,9 +93,61 @@ def get_candidate_by_id(id: str, db: Session) -> Candidate:
     Returns:
         Candidate: The Candidate instance associated with the given ID, or None if not found.
     """
+    if not is_valid_uuid(id):
+        return None
     return db.get(Candidate, id)
 
 
+def get_candidates_by_ids(ids: List[str], db: Session) -> Dict[str, Candidate]:
+    """
+    Retrieve many candidates with one IN query and one query per relationship.
+
+    Args:
+        ids (List[str]): The IDs of the candidates. Malformed IDs are ignored.
+        db (Session): The SQLAlchemy database session for querying.
+
+    Returns:
+        Dict[str, Candidate]: The candidates found, keyed by their canonical ID.
+    """
+    valid_ids = list(
+        {str(UUID(candidate_id)) for candidate_id in ids if is_valid_uuid(candidate_id)}
+    )
+    if not valid_ids:
+        return {}
+
+    candidates = db.scalars(
+        select(Candidate)
+        .options(*CANDIDATE_READ_OPTIONS)
+        .where(Candidate.id.in_(valid_ids))
+    )
+    return {str(candidate.id): candidate for candidate in candidates}
+
+
+def get_candidate_documents(ids: List[str], db: Session) -> Dict[str, bytes]:
+    """
+    Retrieve the precomputed read documents of candidates with one IN query.
+
+    Args:
+        ids (List[str]): The IDs of the candidates. Malformed IDs are ignored.
+        db (Session): The SQLAlchemy database session for querying.
+
+    Returns:
+        Dict[str, bytes]: The documents found, keyed by canonical candidate ID.
+    """
+    valid_ids = list(
+        {str(UUID(candidate_id)) for candidate_id in ids if is_valid_uuid(candidate_id)}
+    )
+    if not valid_ids:
+        return {}
+
+    rows = db.execute(
+        select(CandidateDocument.candidate_id, CandidateDocument.document).where(
+            CandidateDocument.candidate_id.in_(valid_ids)
+        )
+    )
+    return {candidate_id: document for candidate_id, document in rows}
+
+
 def get_paginated_list_of_candidates(
     db: Session, params: Params
 ) -> Page[CandidateReadSchema]:
@@ -76,7 +161,9 @@ def get_paginated_list_of_candidates(
     Returns:
         Page[CandidateReadSchema]: A paginated list of candidates.
     """
-    return paginate(db.query(Candidate).all(), params=params)
+    return paginate(
+        db.query(Candidate).options(*CANDIDATE_READ_OPTIONS).all(), params=params
+    )
 
 
 def filter_and_paginate_candidates(
@@ -94,20 +181,293 @@ def filter_and_paginate_candidates(
         Page[CandidateReadSchema]: A filtered and paginated list of candidates.
     """
 
-    query = candidate_filter.filter(query=db.query(Candidate))
+    query = candidate_filter.filter(
+        query=db.query(Candidate).options(*CANDIDATE_READ_OPTIONS)
+    )
     return paginate(query.all(), params=params)
 
 
-def candidate_delete(db: Session, candidate: Candidate) -> None:
+def iter_candidate_chunks(
+    db: Session,
+    chunk_size: int,
+    candidate_filter: Optional[CandidateFilter] = None,
+) -> Iterator[Sequence[Candidate]]:
+    """
+    Iterate over candidates in id order, one chunk at a time.
+
+    Every chunk is a keyset query on the primary key with the skills and
+    experience of the whole chunk loaded by one query each. Candidates of a
+    chunk are expunged before the next one is loaded, so memory stays flat
+    however many candidates there are.
+
+    Args:
+        db (Session): The database session.
+        chunk_size (int): The number of candidates per chunk.
+        candidate_filter (Optional[CandidateFilter]): Criteria the candidates
+                                                      must match.
+
+    Yields:
+        Sequence[Candidate]: The next chunk of at most `chunk_size` candidates.
     """
-    Delete a candidate from the database.
+    last_id = None
+    while True:
+        query = (
+            select(Candidate)
+            .options(*CANDIDATE_READ_OPTIONS)
+            .order_by(Candidate.id)
+            .limit(chunk_size)
+        )
+        if candidate_filter is not None:
+            query = candidate_filter.filter(query)
+        if last_id is not None:
+            query = query.where(Candidate.id > last_id)
+        candidates = db.scalars(query).all()
+        if not candidates:
+            return
+
+        yield candidates
+        last_id = candidates[-1].id
+        db.expunge_all()
+        if len(candidates) < chunk_size:
+            return
+
+
+def candidate_delete(db: Session, candidate_id: str) -> int:
+    """
+    Delete a candidate from the database with a single DELETE statement.
+
+    Skills and experience are removed by the database through ON DELETE CASCADE,
+    so they are never loaded.
 
     Args:
         db (Session): The SQLAlchemy database session.
-        candidate (Candidate): The candidate instance to be deleted.
+        candidate_id (str): The unique ID of the candidate to be deleted.
 
     Returns:
-        None: This function does not return a value.
+        int: The number of deleted candidates, 0 if the candidate does not exist.
     """
-    db.delete(candidate)
+    if not is_valid_uuid(candidate_id):
+        return 0
+
+    result = db.execute(delete(Candidate).where(Candidate.id == candidate_id))
+    if result.rowcount:
+        record_changes(db, CANDIDATE, DELETE, [candidate_id])
     db.commit()
+
+    return result.rowcount
+
+
+def delete_candidates_by_ids(db: Session, ids: List[str]) -> int:
+    """
+    Delete candidates by ID in chunks of BULK_DELETE_CHUNK_SIZE.
+
+    Each chunk is one DELETE ... WHERE id IN (...) RETURNING id statement plus
+    the change log entries of the deleted candidates, and is committed on its
+    own to keep transactions and locks short.
+
+    Args:
+        db (Session): The SQLAlchemy database session.
+        ids (List[str]): The IDs of the candidates to delete. Malformed IDs are ignored.
+
+    Returns:
+        int: The number of deleted candidates.
+    """
+    valid_ids = [
+        candidate_id
+        for candidate_id in dict.fromkeys(ids)
+        if is_valid_uuid(candidate_id)
+    ]
+    deleted = 0
+
+    for start in range(0, len(valid_ids), BULK_DELETE_CHUNK_SIZE):
+        chunk = valid_ids[start : start + BULK_DELETE_CHUNK_SIZE]
+        deleted_ids = db.scalars(
+            delete(Candidate).where(Candidate.id.in_(chunk)).returning(Candidate.id)
+        ).all()
+        record_changes(db, CANDIDATE, DELETE, deleted_ids)
+        db.commit()
+        deleted += len(deleted_ids)
+
+    return deleted
+
+
+def delete_candidates_by_filter(
+    db: Session, candidate_filter: CandidateFilter, limit: int
+) -> int:
+    """
+    Delete up to `limit` candidates matching a filter in chunks.
+
+    Each chunk is one DELETE ... WHERE id IN (SELECT id ... LIMIT n) RETURNING id
+    statement plus the change log entries, and is committed on its own.
+
+    Args:
+        db (Session): The SQLAlchemy database session.
+        candidate_filter (CandidateFilter): The filter criteria for selecting candidates.
+        limit (int): The maximum number of candidates to delete.
+
+    Returns:
+        int: The number of deleted candidates.
+    """
+    deleted = 0
+
+    while deleted < limit:
+        chunk_size = min(BULK_DELETE_CHUNK_SIZE, limit - deleted)
+        chunk = candidate_filter.filter(select(Candidate.id)).limit(chunk_size)
+        deleted_ids = db.scalars(
+            delete(Candidate).where(Candidate.id.in_(chunk)).returning(Candidate.id)
+        ).all()
+        record_changes(db, CANDIDATE, DELETE, deleted_ids)
+        db.commit()
+        deleted += len(deleted_ids)
+
+        if len(deleted_ids) < chunk_size:
+            break
+
+    return deleted
+
+
+def get_candidates_data_version(
+    db: Session,
+) -> Tuple[int, Optional[datetime], Optional[int]]:
+    """
+    Summarize the data a candidates report is built from, with one statement.
+
+    Every write of candidates, skills and experience is recorded in the change
+    log, so its latest sequence number changes with any of them.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        Tuple[int, Optional[datetime], Optional[int]]: The number of
+                                                       candidates, the latest
+                                                       candidate update and
+                                                       the latest change.
+    """
+    latest_change = select(func.max(ChangeLog.seq)).scalar_subquery()
+    count, updated_at, seq = db.execute(
+        select(
+            func.count(Candidate.id),
+            func.max(Candidate.update_at),
+            latest_change,
+        )
+    ).one()
+    return count, updated_at, seq
+
+
+def refresh_open_experience_metrics(db: Session, today: Optional[date] = None) -> int:
+    """
+    Bring the derived experience columns of candidates with open positions up
+    to date.
+
+    Open positions count up to the current date, so these candidates' values
+    grow without any write of their experience. Candidates are recomputed in
+    chunks, each committed on its own together with the change log entries of
+    the updated candidates, so change feed readers see the new values.
+
+    Args:
+        db (Session): The database session, bound to the primary.
+        today (Optional[date]): The date to count up to, defaults to today.
+
+    Returns:
+        int: The number of candidates whose values changed.
+    """
+    today = today or date.today()
+    candidate_ids = db.scalars(open_experience_candidate_ids(today)).all()
+    updated = 0
+    for start in range(0, len(candidate_ids), EXPERIENCE_REFRESH_CHUNK_SIZE):
+        chunk = candidate_ids[start : start + EXPERIENCE_REFRESH_CHUNK_SIZE]
+        changed = refresh_experience_metrics(db.connection(), chunk, today)
+        record_changes(db, CANDIDATE, UPDATE, list(changed))
+        db.commit()
+        updated += len(changed)
+    return updated
+
+
+def rebuild_candidate_documents(db: Session) -> int:
+    """
+    Replace every precomputed candidate document.
+
+    Existing documents are deleted first, since writes made while documents
+    were disabled did not update them; until a candidate's document is
+    rebuilt, its reads fall back to loading the candidate. Chunks of
+    DOCUMENT_REBUILD_CHUNK_SIZE candidates are committed on their own.
+
+    Args:
+        db (Session): The database session, bound to the primary.
+
+    Returns:
+        int: The number of documents built.
+    """
+    db.execute(delete(CandidateDocument))
+    db.commit()
+
+    built = 0
+    last_id = None
+    while True:
+        query = (
+            select(Candidate.id)
+            .order_by(Candidate.id)
+            .limit(DOCUMENT_REBUILD_CHUNK_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(Candidate.id > last_id)
+        candidate_ids = db.scalars(query).all()
+        if not candidate_ids:
+            return built
+
+        documents = build_candidate_documents(db, candidate_ids)
+        save_candidate_documents(db, documents)
+        db.commit()
+        db.expunge_all()
+        built += len(documents)
+        last_id = candidate_ids[-1]
+
+
+def get_candidate_shard_bounds(db: Session, shard_size: int) -> List[str]:
+    """
+    Split the candidates into id ranges of `shard_size` candidates.
+
+    Args:
+        db (Session): The database session.
+        shard_size (int): The number of candidates per range.
+
+    Returns:
+        List[str]: The first id of every range, in id order; a range ends
+                   before the first id of the next one.
+    """
+    numbered = select(
+        Candidate.id, func.row_number().over(order_by=Candidate.id).label("row")
+    ).subquery()
+    return list(
+        db.scalars(
+            select(numbered.c.id)
+            .where((numbered.c.row - 1) % shard_size == 0)
+            .order_by(numbered.c.id)
+        )
+    )
+
+
+def iter_candidate_contacts(
+    db: Session, start_id: str, end_id: Optional[str] = None
+) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Stream the id, name, email and phone of the candidates in an id range.
+
+    Args:
+        db (Session): The database session.
+        start_id (str): The first id of the range.
+        end_id (Optional[str]): The id the range ends before, open if None.
+
+    Yields:
+        Tuple[str, str, str, str]: The contact details of every candidate.
+    """
+    query = (
+        select(Candidate.id, Candidate.name, Candidate.email, Candidate.phone)
+        .where(Candidate.id >= start_id)
+        .order_by(Candidate.id)
+        .execution_options(yield_per=5000)
+    )
+    if end_id is not None:
+        query = query.where(Candidate.id < end_id)
+    yield from db.execute(query).tuples()
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+
+
+def get_changes(
+    db: Session, since: int, limit: int, settled_before: datetime
+) -> List[ChangeLog]:
+    """
+    Retrieve the changes after a sequence number, in sequence order.
+
+    Sequence numbers are assigned when a change is written, not when it
+    commits, so a missing number may belong to a transaction that is still
+    running. The page stops before such a gap unless the change after it is
+    older than `settled_before`, by when the gap is taken to be a rolled back
+    transaction. A transaction that commits later than that, counted from
+    when it wrote the change, is skipped by every reader that passed the
+    gap: its changes are lost to the feed.
+
+    Args:
+        db (Session): The database session.
+        since (int): The sequence number of the last change already seen.
+        limit (int): The maximum number of changes to return.
+        settled_before (datetime): When a gap in the sequence is final.
+
+    Returns:
+        List[ChangeLog]: The changes, without gaps that may still be filled.
+    """
+    rows = db.scalars(
+        select(ChangeLog)
+        .where(ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit)
+    ).all()
+
+    changes: List[ChangeLog] = []
+    expected = since + 1 if since else None
+    for row in rows:
+        if expected is not None and row.seq != expected:
+            if row.changed_at > settled_before:
+                break
+        changes.append(row)
+        expected = int(row.seq) + 1
+    return changes
+
+
+def get_oldest_change_sequence(db: Session) -> Optional[int]:
+    """
+    Return the sequence number of the oldest retained change, if any.
+    """
+    return db.scalar(select(func.min(ChangeLog.seq)))
+
+
+def get_latest_change_sequence(db: Session) -> int:
+    """
+    Return the sequence number of the latest change, 0 if there is none.
+    """
+    return db.scalar(select(func.max(ChangeLog.seq))) or 0
+
+
+def get_settled_change_sequence(db: Session, settled_before: datetime) -> int:
+    """
+    Return the sequence number of the latest change recorded before a point
+    in time, 0 if there is none.
+
+    Changes with lower numbers that are not visible yet are taken to be
+    rolled back, see get_changes, so a reader that copied the data can
+    continue the feed from here without missing any. Later changes may
+    already be part of the copy and are read again.
+
+    Args:
+        db (Session): The database session.
+        settled_before (datetime): When a gap in the sequence is final.
+    """
+    return (
+        db.scalar(
+            select(func.max(ChangeLog.seq)).where(ChangeLog.changed_at < settled_before)
+        )
+        or 0
+    )
+
+
+def prune_change_log(db: Session, before: datetime) -> int:
+    """
+    Delete the changes recorded before a point in time.
+
+    Args:
+        db (Session): The database session.
+        before (datetime): Changes older than this are deleted.
+
+    Returns:
+        int: The number of deleted changes.
+    """
+    result = db.execute(delete(ChangeLog).where(ChangeLog.changed_at < before))
+    db.commit()
+    return result.rowcount
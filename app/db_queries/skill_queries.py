@@ -1,7 +1,12 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
 from fastapi_pagination import Params, paginate
+from sqlalchemy import delete, distinct, func, select, update
 from sqlalchemy.orm import Session
 
 from app.models import Candidate
+from app.models.change_log import DELETE, SKILL, UPDATE, record_changes
+from app.models.skill_cooccurrence import SkillNeighbor
 from app.models.skills import Skill
 from app.schemas.candidate import SkillUpdateSchema
 
@@ -51,27 +56,37 @@ def get_paginated_list_of_skills(candidate: Candidate, params: Params):
     return paginate(candidate.skills, params=params)
 
 
-def skill_delete(id: int, db: Session) -> None:
+def skill_delete(id: int, db: Session) -> bool:
     """
-    Delete a skill from the database by its unique ID.
+    Delete a skill from the database by its unique ID with a single DELETE statement
+    and record the deletion in the change log.
 
     Args:
         id (int): The unique ID of the skill to be deleted.
         db (Session): The database session.
 
     Returns:
-        None: This function does not return a value.
+        bool: True if the skill existed and was deleted, otherwise False.
 
     """
-    skill = get_skill_by_id(id=id, db=db)
-
-    db.delete(skill)
+    skill = db.execute(
+        delete(Skill)
+        .where(Skill.id == id)
+        .returning(Skill.id, Skill.candidate_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if skill:
+        record_changes(db, SKILL, DELETE, [skill.id], [skill.candidate_id])
     db.commit()
 
+    return skill is not None
+
 
-def skill_update(id: int, request_body: SkillUpdateSchema, db: Session) -> Skill:
+def skill_update(
+    id: int, request_body: SkillUpdateSchema, db: Session
+) -> Optional[Dict[str, Any]]:
     """
-    Update a skill in the database.
+    Update a skill in the database with a single UPDATE ... RETURNING statement.
 
     Args:
         id (int): The unique ID of the skill to update.
@@ -79,17 +94,105 @@ def skill_update(id: int, request_body: SkillUpdateSchema, db: Session) -> Skill
         db (Session): The database session.
 
     Returns:
-        Skill: The updated Skill instance.
+        Optional[Dict[str, Any]]: The updated skill's columns, or None if no skill
+                                  with the given ID exists.
+    """
+    result = db.execute(
+        update(Skill)
+        .where(Skill.id == id)
+        .values(**request_body.model_dump())
+        .returning(Skill.id, Skill.name, Skill.candidate_id)
+        .execution_options(synchronize_session=False)
+    )
+    skill = result.mappings().first()
+    if skill:
+        record_changes(db, SKILL, UPDATE, [skill["id"]], [skill["candidate_id"]])
+    db.commit()
 
-    Raises:
-        ValueError: If no skill with the given ID exists.
+    return dict(skill) if skill else None
+
+
+def iter_skill_pairs(db: Session) -> Iterable[Tuple[str, str]]:
     """
-    skill = get_skill_by_id(id=id, db=db)
+    Stream the (candidate id, skill name) pair of every skill.
 
-    for key, value in request_body.model_dump().items():
-        setattr(skill, key, value)
+    Args:
+        db (Session): The database session.
 
-    db.commit()
-    db.refresh(skill)
+    Returns:
+        Iterable[Tuple[str, str]]: The pairs, read from the cursor in batches.
+    """
+    return db.execute(
+        select(Skill.candidate_id, Skill.name).execution_options(yield_per=10_000)
+    ).tuples()
 
-    return skill
+
+def get_skills_of_candidates(
+    db: Session, candidate_ids: Iterable[str]
+) -> Dict[str, List[str]]:
+    """
+    Retrieve the skill names of candidates with one query.
+
+    Args:
+        db (Session): The database session.
+        candidate_ids (Iterable[str]): The candidates whose skills to read.
+
+    Returns:
+        Dict[str, List[str]]: The skill names of every candidate that exists;
+                              candidates without skills map to an empty list.
+    """
+    candidate_ids = list(candidate_ids)
+    rows = db.execute(
+        select(Candidate.id, Skill.name)
+        .outerjoin(Skill, Skill.candidate_id == Candidate.id)
+        .where(Candidate.id.in_(candidate_ids))
+    ).tuples()
+    skills: Dict[str, List[str]] = {}
+    for candidate_id, name in rows:
+        names = skills.setdefault(candidate_id, [])
+        if name is not None:
+            names.append(name)
+    return skills
+
+
+def get_skill_name_counts(db: Session) -> List[Tuple[str, int]]:
+    """
+    Count the candidates of every distinct skill name.
+
+    Names are compared trimmed and lower-cased.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        List[Tuple[str, int]]: Every normalized name and its number of
+                               candidates.
+    """
+    name = func.lower(func.trim(Skill.name))
+    return list(
+        db.execute(
+            select(name, func.count(distinct(Skill.candidate_id))).group_by(name)
+        ).tuples()
+    )
+
+
+def get_skill_neighbors(db: Session, name: str, limit: int) -> List[SkillNeighbor]:
+    """
+    Retrieve the skills most often held together with a skill.
+
+    Args:
+        db (Session): The database session.
+        name (str): The normalized skill name.
+        limit (int): The maximum number of neighbors.
+
+    Returns:
+        List[SkillNeighbor]: The stored neighbors, best first.
+    """
+    return list(
+        db.scalars(
+            select(SkillNeighbor)
+            .where(SkillNeighbor.skill == name)
+            .order_by(SkillNeighbor.rank)
+            .limit(limit)
+        )
+    )
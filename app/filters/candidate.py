@@ -9,6 +9,10 @@ class CandidateFilter(Filter):
     name: Optional[str] = None
     phone: Optional[str] = None
     email: Optional[str] = None
+    experience_months__gte: Optional[int] = None
+    experience_months__lte: Optional[int] = None
+    current_company: Optional[str] = None
+    latest_job_title: Optional[str] = None
 
     class Constants(Filter.Constants):
         model = Candidate
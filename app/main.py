@@ -1,9 +1,46 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.routes import candidate as candidate_routers, user as user_routers
+from app.celery.backends import get_task_backend
+from app.db.database import get_engine, get_replica_engines, named_engines
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.routes import (
+    batch as batch_routers,
+    candidate as candidate_routers,
+    change as change_routers,
+    metrics as metrics_routers,
+    user as user_routers,
+)
 from app.routes.skill import skill_router
+from app.utils.metrics import instrument_engines
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the engines before serving the first request; importing the
+    # application stays cheap because nothing is connected at import time.
+    get_engine()
+    get_replica_engines()
+    # Connect to the broker or start the local task processes in the
+    # background, startup must not wait for them.
+    threading.Thread(target=get_task_backend().warm_up, daemon=True).start()
+    yield
+
+
+instrument_engines(named_engines)
 
-app: FastAPI = FastAPI()
+app: FastAPI = FastAPI(lifespan=lifespan)
+# Innermost, so shed requests are still profiled and counted.
+app.add_middleware(AdmissionControlMiddleware, routes=app.routes)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(user_routers.router)
 app.include_router(candidate_routers.router)
 app.include_router(skill_router)
+app.include_router(batch_routers.router)
+app.include_router(change_routers.router)
+app.include_router(metrics_routers.router)
@@ -0,0 +1,178 @@
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils import constants
+from app.utils.metrics import ADMISSION_LIMIT, ADMISSION_REJECTED
+
+load_dotenv()
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+# Seconds clients are told to wait before retrying a shed request.
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+READ = "read"
+WRITE = "write"
+HEAVY = "heavy"
+
+# Initial, minimum and maximum concurrency and the latency target per class.
+ROUTE_CLASS_LIMITS = {
+    READ: (64, 4, 512, float(os.getenv("ADMISSION_READ_TARGET_MS", "250"))),
+    WRITE: (32, 2, 256, float(os.getenv("ADMISSION_WRITE_TARGET_MS", "500"))),
+    HEAVY: (4, 1, 32, float(os.getenv("ADMISSION_HEAVY_TARGET_MS", "2000"))),
+}
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase, multiplicative decrease.
+
+    Every request finishing within the latency target while the limit is in
+    use raises the limit by about one per limit's worth of requests; every
+    request over the target or failing with a server error cuts it by
+    `backoff`. Under a slow database the limit quickly shrinks to what the
+    database can serve in time, and grows back once it recovers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        target_ms: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target_ms / 1000
+        self.backoff = backoff
+        self.in_flight = 0
+        ADMISSION_LIMIT.labels(name).set(self.limit)
+
+    def try_acquire(self) -> bool:
+        """
+        Admit a request if fewer than `limit` requests are in flight.
+
+        Returns:
+            bool: True if the request may proceed; it must call release.
+        """
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, failed: bool) -> None:
+        """
+        Account for a finished request and adjust the limit.
+
+        Args:
+            latency (float): Time the request took, in seconds.
+            failed (bool): Whether it ended in a server error.
+        """
+        # Only grow while the limit is actually being used, otherwise a
+        # quiet period would inflate it far beyond what was ever tested.
+        in_use = self.in_flight * 2 >= self.limit
+        self.in_flight -= 1
+        if failed or latency > self.target:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+        elif in_use:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.labels(self.name).set(self.limit)
+
+
+def admission(route_class: Optional[str]) -> Callable[[Callable], Callable]:
+    """
+    Assign a route to an admission class, e.g. HEAVY for filters and reports.
+
+    Routes default to READ for GET and HEAD and to WRITE otherwise; None
+    exempts a route from admission control. Applied below the router
+    decorator, like query_budget.
+
+    Args:
+        route_class (Optional[str]): READ, WRITE, HEAVY or None.
+
+    Returns:
+        Callable: A decorator attaching the class to the endpoint.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.admission_class = route_class  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware shedding load before it reaches the threadpool and the
+    database pool.
+
+    Each route class has its own AdaptiveLimiter. Requests over the current
+    limit are answered at once with 503 and `Retry-After` instead of queueing,
+    so latency stays bounded under overload. Limits are per process.
+    """
+
+    def __init__(self, app: ASGIApp, routes: list) -> None:
+        self.app = app
+        self.routes = routes
+        self.limiters: Dict[str, AdaptiveLimiter] = {
+            name: AdaptiveLimiter(name, *limits)
+            for name, limits in ROUTE_CLASS_LIMITS.items()
+        }
+
+    def _route_class(self, scope: Scope) -> Optional[str]:
+        route = self._match(scope)
+        default = READ if scope["method"] in ("GET", "HEAD") else WRITE
+        if route is None:
+            return default
+        return getattr(getattr(route, "endpoint", None), "admission_class", default)
+
+    def _match(self, scope: Scope) -> Optional[BaseRoute]:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not ADMISSION_CONTROL:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self._route_class(scope)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        if not limiter.try_acquire():
+            ADMISSION_REJECTED.labels(route_class).inc()
+            response = JSONResponse(
+                {"detail": constants.SERVER_OVERLOADED_MESSAGE},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limiter.release(time.perf_counter() - started, status_code >= 500)
@@ -0,0 +1,362 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+MAX_CAPTURED_STATEMENTS = 50
+
+# When true, a request exceeding its query budget raises instead of logging.
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """
+    Timings and SQL statistics collected while serving a single request.
+    """
+
+    __slots__ = (
+        "started",
+        "query_count",
+        "sql_time",
+        "endpoint_time",
+        "endpoint_finished",
+        "serialization_time",
+        "sections",
+        "statements",
+    )
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.endpoint_time = 0.0
+        self.endpoint_finished = 0.0
+        self.serialization_time = 0.0
+        self.sections: Dict[str, float] = {}
+        self.statements: List[Tuple[str, float]] = []
+
+    def record_query(self, statement: str, elapsed: float) -> None:
+        """
+        Account for one executed SQL statement.
+
+        Args:
+            statement (str): The SQL text sent to the database.
+            elapsed (float): Execution time in seconds.
+        """
+        self.query_count += 1
+        self.sql_time += elapsed
+        if len(self.statements) < MAX_CAPTURED_STATEMENTS:
+            self.statements.append((statement, elapsed))
+
+    def elapsed(self) -> float:
+        """
+        Return the time in seconds since the request started.
+        """
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Render the collected timings as a `Server-Timing` header value.
+
+        Returns:
+            str: Comma separated metrics, durations in milliseconds.
+        """
+        metrics = [
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.query_count} queries"'
+        ]
+        for name, duration in self.sections.items():
+            metrics.append(f"{name};dur={duration * 1000:.2f}")
+        metrics.append(f"app;dur={self.endpoint_time * 1000:.2f}")
+        metrics.append(f"serialize;dur={self.serialization_time * 1000:.2f}")
+        metrics.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised in strict mode when a request issues more SQL statements than the
+    budget declared for its route.
+    """
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """
+    Time a block of code and report it as its own `Server-Timing` metric.
+
+    Args:
+        name (str): The metric name, e.g. "auth".
+    """
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections[name] = profile.sections.get(name, 0.0) + (
+            time.perf_counter() - started
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is None or not starts:
+        return
+    profile.record_query(statement, time.perf_counter() - starts.pop())
+
+
+def query_budget(max_queries: int) -> Callable[[Callable], Callable]:
+    """
+    Declare the maximum number of SQL statements a route may issue per request.
+
+    The budget covers everything the request executes, including dependencies
+    such as authentication and lazy loads triggered during serialization. It
+    must be applied below the router decorator:
+
+        @router.get("/")
+        @query_budget(4)
+        def list_items(...): ...
+
+    Args:
+        max_queries (int): The number of statements allowed.
+
+    Returns:
+        Callable: A decorator attaching the budget to the endpoint.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+def _report_budget_exceeded(
+    route: str, budget: int, query_count: int, statements: List[str]
+) -> None:
+    message = f"{route} issued {query_count} SQL statements, its budget is {budget}"
+    if QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(f"{message}:\n" + "\n".join(statements))
+
+    logger.warning(
+        json.dumps(
+            {
+                "event": "query_budget_exceeded",
+                "route": route,
+                "budget": budget,
+                "query_count": query_count,
+                "statements": statements,
+            }
+        )
+    )
+
+
+def _check_query_budget(route: APIRoute, profile: RequestProfile) -> None:
+    budget = getattr(route, "query_budget", None)
+    if budget is None or profile.query_count <= budget:
+        return
+    _report_budget_exceeded(
+        route.path,
+        budget,
+        profile.query_count,
+        [statement for statement, _ in profile.statements],
+    )
+
+
+@contextmanager
+def section_query_budget(name: str, max_queries: int) -> Iterator[None]:
+    """
+    Hold a part of a request to its own budget of SQL statements, e.g. each
+    item of a request that handles a list of them. Exceeding it is reported
+    like a route exceeding its budget.
+
+    Args:
+        name (str): Describes the part in the report, e.g. "/batch/ create_skill".
+        max_queries (int): The number of statements allowed in the block.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    query_count, captured = profile.query_count, len(profile.statements)
+    yield
+    count = profile.query_count - query_count
+    if count > max_queries:
+        _report_budget_exceeded(
+            name,
+            max_queries,
+            count,
+            [statement for statement, _ in profile.statements[captured:]],
+        )
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """
+    Wrap a route endpoint so its own execution time is recorded.
+
+    The wrapper keeps the endpoint signature intact, so FastAPI resolves
+    dependencies and parameters exactly as it would for the original function.
+    Routers copy their routes when included, so already wrapped endpoints are
+    returned unchanged.
+    """
+    if getattr(endpoint, "__profiled__", False):
+        return endpoint
+
+    def _record(started: float) -> None:
+        profile = current_profile.get()
+        if profile is not None:
+            profile.endpoint_finished = time.perf_counter()
+            profile.endpoint_time += profile.endpoint_finished - started
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _record(started)
+
+        async_wrapper.__profiled__ = True  # type: ignore[attr-defined]
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _record(started)
+
+    wrapper.__profiled__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute that records endpoint and response serialization time.
+
+    Everything between the endpoint returning and the route handler
+    producing its response is response validation and serialization.
+    Routes whose endpoint declares a `query_budget` are checked against it.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        self.query_budget = getattr(endpoint, "query_budget", None)
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            response = await handler(request)
+            profile = current_profile.get()
+            if profile is not None and profile.endpoint_finished:
+                profile.serialization_time = (
+                    time.perf_counter() - profile.endpoint_finished
+                )
+            if profile is not None:
+                _check_query_budget(self, profile)
+            return response
+
+        return profiled_handler
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware emitting per-request `Server-Timing` headers and logs.
+
+    Every request is logged as a JSON record at INFO level. Requests slower
+    than `SLOW_REQUEST_THRESHOLD_MS` are logged at WARNING level together
+    with the SQL statements they executed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", profile.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            _log_profile(scope, profile, status_code)
+
+
+def _log_profile(scope: Scope, profile: RequestProfile, status_code: int) -> None:
+    duration_ms = profile.elapsed() * 1000
+    route = scope.get("route")
+    record = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", None),
+        "status": status_code,
+        "duration_ms": round(duration_ms, 2),
+        "query_count": profile.query_count,
+        "sql_ms": round(profile.sql_time * 1000, 2),
+        "app_ms": round(profile.endpoint_time * 1000, 2),
+        "serialize_ms": round(profile.serialization_time * 1000, 2),
+    }
+    for name, duration in profile.sections.items():
+        record[f"{name}_ms"] = round(duration * 1000, 2)
+
+    if duration_ms < SLOW_REQUEST_THRESHOLD_MS:
+        logger.info(json.dumps(record))
+        return
+
+    record["statements"] = [
+        {"sql": statement, "ms": round(elapsed * 1000, 2)}
+        for statement, elapsed in profile.statements
+    ]
+    logger.warning(json.dumps(record))
@@ -1,3 +1,6 @@
 from app.models.candidate import Candidate  # NoQa
 from app.models.skills import Skill  # NoQa
 from app.models.experience import Experience  # NoQa
+from app.models.candidate_document import CandidateDocument  # NoQa
+from app.models.change_log import ChangeLog  # NoQa
+from app.models.skill_cooccurrence import SkillPair  # NoQa
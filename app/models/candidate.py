@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column
+from sqlalchemy import String, Column, Integer
 from sqlalchemy.orm import Relationship
 
 from app.db.database import BaseModel
@@ -11,5 +11,27 @@ class Candidate(BaseModel):
     email = Column(String, nullable=False, unique=True)
     phone = Column(String(15), nullable=False, unique=True)
 
-    skills = Relationship("Skill", back_populates="candidate", uselist=True)
-    experience = Relationship("Experience", back_populates="candidate", uselist=True)
+    # Derived from the candidate's experience and kept in sync on every write
+    # of it, so experience filters are index scans; see app.models.experience.
+    experience_months = Column(
+        Integer, nullable=False, default=0, server_default="0", index=True
+    )
+    current_company = Column(String, nullable=True, index=True)
+    latest_job_title = Column(String, nullable=True, index=True)
+
+    # Children are removed by the ON DELETE CASCADE of their foreign keys, so
+    # deleting a candidate never loads its skills and experience.
+    skills = Relationship(
+        "Skill",
+        back_populates="candidate",
+        uselist=True,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    experience = Relationship(
+        "Experience",
+        back_populates="candidate",
+        uselist=True,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
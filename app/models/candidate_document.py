@@ -0,0 +1,127 @@
+import os
+from datetime import datetime
+from typing import Dict, Iterable
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, DateTime, ForeignKey, LargeBinary, Uuid, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.database import Base, SessionLocal
+from app.models.candidate import Candidate
+
+load_dotenv()
+
+# Serve single and batch candidate reads from precomputed documents. Writes
+# keep the documents current only while enabled; after enabling it, run the
+# rebuild_candidate_documents task.
+CANDIDATE_DOCUMENTS = os.getenv("CANDIDATE_DOCUMENTS", "false").lower() == "true"
+# Statements a write adds to its request to refresh the documents.
+DOCUMENT_WRITE_QUERIES = 2 if CANDIDATE_DOCUMENTS else 0
+# Statements a read adds when it falls back from a missing document.
+DOCUMENT_READ_QUERIES = 1 if CANDIDATE_DOCUMENTS else 0
+
+
+class CandidateDocument(Base):
+    """
+    The CandidateReadSchema JSON of a candidate, serialized in advance.
+    """
+
+    __tablename__ = "candidate_documents"
+    candidate_id = Column(
+        Uuid(as_uuid=False),
+        ForeignKey("candidates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    document = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now())
+
+
+def build_candidate_documents(
+    session: Session, candidate_ids: Iterable[str]
+) -> Dict[str, bytes]:
+    """
+    Serialize candidates as CandidateReadSchema JSON with one query.
+
+    Skills and experience are joined into the candidate query; a candidate
+    has few of either, so the joined rows stay few.
+
+    Args:
+        session (Session): A session on the connection of the transaction.
+        candidate_ids (Iterable[str]): The candidates to serialize.
+
+    Returns:
+        Dict[str, bytes]: The documents of the candidates that exist.
+    """
+    # The schemas import the models, so they are imported on first use.
+    from app.schemas.candidate import CandidateReadSchema
+
+    candidates = session.scalars(
+        select(Candidate)
+        .options(joinedload(Candidate.skills), joinedload(Candidate.experience))
+        .where(Candidate.id.in_(list(candidate_ids)))
+        .execution_options(populate_existing=True)
+    ).unique()
+    return {
+        str(candidate.id): CandidateReadSchema.model_validate(
+            candidate, from_attributes=True
+        )
+        .model_dump_json()
+        .encode()
+        for candidate in candidates
+    }
+
+
+def save_candidate_documents(session: Session, documents: Dict[str, bytes]) -> None:
+    """
+    Insert or replace documents with one statement.
+    """
+    if not documents:
+        return
+    connection = session.connection()
+    # Only the dialect of the engine is loaded, with the engine.
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert  # type: ignore[assignment]
+    now = datetime.now()
+    statement = insert(CandidateDocument.__table__)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["candidate_id"],
+            set_={
+                "document": statement.excluded.document,
+                "updated_at": statement.excluded.updated_at,
+            },
+        ),
+        [
+            {"candidate_id": candidate_id, "document": document, "updated_at": now}
+            for candidate_id, document in documents.items()
+        ],
+    )
+
+
+def refresh_candidate_documents(session: Session, candidate_ids: Iterable) -> None:
+    """
+    Rebuild the documents of changed candidates in the writing transaction.
+
+    Called for every change recorded in the change log, so ORM writes and
+    bulk statements alike keep the documents current. Deleted candidates
+    lose their document through ON DELETE CASCADE.
+
+    Args:
+        session (Session): The session that made the changes.
+        candidate_ids (Iterable): The candidates whose data changed.
+    """
+    candidate_ids = {
+        str(candidate_id) for candidate_id in candidate_ids if candidate_id
+    }
+    if not CANDIDATE_DOCUMENTS or not candidate_ids:
+        return
+    # A separate session, so building the documents neither loads into nor
+    # flushes the writing session.
+    reader = SessionLocal(bind=session.connection())
+    try:
+        documents = build_candidate_documents(reader, candidate_ids)
+    finally:
+        reader.close()
+    save_candidate_documents(session, documents)
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Uuid,
+    event,
+    insert,
+)
+from sqlalchemy.orm import Session
+
+from app.db.database import Base
+from app.models.candidate import Candidate
+from app.models.candidate_document import refresh_candidate_documents
+from app.models.experience import Experience
+from app.models.skills import Skill
+
+CANDIDATE = "candidate"
+SKILL = "skill"
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+
+class ChangeLog(Base):
+    """
+    One row per created, updated or deleted candidate or skill.
+
+    `seq` grows with every change and is the cursor of the change feed.
+    Experience belongs to the candidate's representation, so experience
+    writes are recorded as updates of the candidate. Skills removed together
+    with their candidate are covered by the candidate's delete.
+    """
+
+    __tablename__ = "change_log"
+    # Without AUTOINCREMENT SQLite reuses the numbers of pruned changes.
+    __table_args__ = {"sqlite_autoincrement": True}
+    # SQLite only autoincrements INTEGER primary keys.
+    seq = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(String, nullable=False)
+    op = Column(String(8), nullable=False)
+    candidate_id = Column(Uuid(as_uuid=False), nullable=True)
+    changed_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(), index=True
+    )
+
+
+class ChangeSignal:
+    """
+    Counter of commits that recorded changes in this process, so waiting
+    change feed readers of the same process wake up without polling the
+    database.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def notify(self) -> None:
+        # Commits run in worker threads; the events are set on their loops.
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # The loop was closed while the waiter was registered.
+                pass
+
+    async def wait(self, version: int, timeout: float) -> None:
+        """
+        Wait until the counter moves past `version`, at most `timeout` seconds.
+
+        Args:
+            version (int): The counter value read before the last read.
+            timeout (float): How long to wait, so that changes of other
+                             processes are found by the next read.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self.version != version:
+                return
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+change_signal = ChangeSignal()
+# Counter of commits that changed skills, including candidates deleted with
+# their skills, for in-memory skill indexes of this process.
+skill_signal = ChangeSignal()
+
+
+def record_changes(
+    session: Session,
+    entity: str,
+    op: str,
+    entity_ids: Iterable,
+    candidate_ids: Optional[Iterable] = None,
+) -> None:
+    """
+    Append changes made outside of the ORM unit of work, e.g. by bulk DELETE
+    or UPDATE statements, to the change log of the session's transaction.
+
+    Args:
+        session (Session): The session that made the changes.
+        entity (str): CANDIDATE or SKILL.
+        op (str): CREATE, UPDATE or DELETE.
+        entity_ids (Iterable): The ids of the changed rows.
+        candidate_ids (Optional[Iterable]): The candidate of every changed
+                                            skill; candidates are their own.
+    """
+    entity_ids = list(entity_ids)
+    if candidate_ids is None:
+        candidate_ids = entity_ids if entity == CANDIDATE else [None] * len(entity_ids)
+    _insert_changes(
+        session,
+        [
+            _change(entity, entity_id, op, candidate_id)
+            for entity_id, candidate_id in zip(entity_ids, candidate_ids)
+        ],
+    )
+
+
+def _insert_changes(session: Session, rows: list) -> None:
+    if not rows:
+        return
+    now = datetime.now()
+    for row in rows:
+        row["changed_at"] = now
+    session.connection().execute(insert(ChangeLog.__table__), rows)
+    session.info["changes_recorded"] = True
+    if any(
+        row["entity"] == SKILL or (row["entity"] == CANDIDATE and row["op"] == DELETE)
+        for row in rows
+    ):
+        session.info["skills_changed"] = True
+    refresh_candidate_documents(
+        session,
+        {
+            row["candidate_id"]
+            for row in rows
+            if not (row["entity"] == CANDIDATE and row["op"] == DELETE)
+        },
+    )
+
+
+def _change(entity: str, entity_id, op: str, candidate_id=None) -> dict:
+    return {
+        "entity": entity,
+        "entity_id": str(entity_id),
+        "op": op,
+        "candidate_id": candidate_id,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def record_changes_after_flush(session: Session, flush_context) -> None:
+    """
+    Record the candidates and skills written through the ORM in the change
+    log, in the flushing transaction.
+    """
+    changes: Dict[Tuple[str, Any], dict] = {}
+    key: Tuple[str, Any]
+    for op, instances in (
+        (CREATE, session.new),
+        (UPDATE, session.dirty),
+        (DELETE, session.deleted),
+    ):
+        for instance in instances:
+            if op == UPDATE and not session.is_modified(
+                instance, include_collections=False
+            ):
+                continue
+            if isinstance(instance, Candidate):
+                key = (CANDIDATE, instance.id)
+                change = _change(CANDIDATE, instance.id, op, instance.id)
+            elif isinstance(instance, Skill):
+                key = (SKILL, instance.id)
+                change = _change(SKILL, instance.id, op, instance.candidate_id)
+            elif isinstance(instance, Experience) and instance.candidate_id:
+                key = (CANDIDATE, instance.candidate_id)
+                change = _change(
+                    CANDIDATE, instance.candidate_id, UPDATE, instance.candidate_id
+                )
+            else:
+                continue
+            # A candidate created or deleted in this flush is not also updated.
+            if key not in changes or changes[key]["op"] == UPDATE:
+                changes[key] = change
+
+    _insert_changes(session, list(changes.values()))
+
+
+@event.listens_for(Session, "after_commit")
+def notify_change_readers(session: Session) -> None:
+    if session.info.pop("changes_recorded", False):
+        change_signal.notify()
+    if session.info.pop("skills_changed", False):
+        skill_signal.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_recorded_changes(session: Session) -> None:
+    session.info.pop("changes_recorded", None)
+    session.info.pop("skills_changed", None)
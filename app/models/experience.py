@@ -1,9 +1,29 @@
-from sqlalchemy import String, Column, ForeignKey, Date, Integer
-from sqlalchemy.orm import Relationship
+import itertools
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import (
+    String,
+    Column,
+    ForeignKey,
+    Date,
+    Integer,
+    Uuid,
+    bindparam,
+    event,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Relationship, Session, attributes
 
 from app.db.database import Base
 from app.models.candidate import Candidate
 
+# Candidate columns derived from experience rows, see refresh_experience_metrics.
+EXPERIENCE_METRICS = ("experience_months", "current_company", "latest_job_title")
+
 
 class Experience(Base):
     __tablename__ = "experience"
@@ -12,6 +32,178 @@ class Experience(Base):
     company = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=True, default=None)
-    candidate_id = Column(String, ForeignKey("candidates.id", ondelete="CASCADE"))
+    candidate_id = Column(
+        Uuid(as_uuid=False), ForeignKey("candidates.id", ondelete="CASCADE")
+    )
 
     candidate = Relationship(Candidate, back_populates="experience")
+
+
+def months_between(start: date, end: date) -> int:
+    """
+    Count the whole months from `start` up to, but excluding, `end`.
+    """
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day:
+        months -= 1
+    return max(months, 0)
+
+
+def summarize_experience(rows: Iterable, today: date) -> Dict[str, Any]:
+    """
+    Derive the experience metrics of one candidate.
+
+    Overlapping and adjacent positions are merged before counting, so two
+    parallel jobs are not counted twice. Positions without an end date, or
+    ending in the future, count up to today and are current.
+
+    Args:
+        rows (Iterable): Rows with job_title, company, start_date and end_date.
+        today (date): The date open positions are counted up to.
+
+    Returns:
+        Dict[str, Any]: Values for the columns in EXPERIENCE_METRICS.
+    """
+    rows = [row for row in rows if row.start_date <= today]
+    intervals = sorted(
+        (row.start_date, min(row.end_date or today, today)) for row in rows
+    )
+    months = 0
+    merged: Optional[Tuple[date, date]] = None
+    for start, end in intervals:
+        if merged is not None and start <= merged[1] + timedelta(days=1):
+            merged = merged[0], max(merged[1], end)
+            continue
+        if merged is not None:
+            months += months_between(merged[0], merged[1] + timedelta(days=1))
+        merged = start, end
+    if merged is not None:
+        months += months_between(merged[0], merged[1] + timedelta(days=1))
+
+    def recency(row):
+        return (row.end_date or date.max, row.start_date)
+
+    latest = max(rows, key=recency, default=None)
+    current = max(
+        (row for row in rows if row.end_date is None or row.end_date >= today),
+        key=recency,
+        default=None,
+    )
+    return {
+        "experience_months": months,
+        "current_company": current.company if current else None,
+        "latest_job_title": latest.job_title if latest else None,
+    }
+
+
+def refresh_experience_metrics(
+    connection: Connection,
+    candidate_ids: Iterable[str],
+    today: Optional[date] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Recompute the derived experience columns of the given candidates.
+
+    Only candidates whose values changed are updated, in one executemany
+    statement.
+
+    Args:
+        connection (Connection): The connection of the writing transaction.
+        candidate_ids (Iterable[str]): The candidates to recompute.
+        today (Optional[date]): The date open positions are counted up to,
+                                defaults to the current date.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The new values of the updated candidates.
+    """
+    candidate_ids = list(candidate_ids)
+    if not candidate_ids:
+        return {}
+    today = today or date.today()
+
+    experience = defaultdict(list)
+    for row in connection.execute(
+        select(
+            Experience.candidate_id,
+            Experience.job_title,
+            Experience.company,
+            Experience.start_date,
+            Experience.end_date,
+        ).where(Experience.candidate_id.in_(candidate_ids))
+    ):
+        experience[row.candidate_id].append(row)
+
+    candidates = connection.execute(
+        select(
+            Candidate.id, *(getattr(Candidate, name) for name in EXPERIENCE_METRICS)
+        ).where(Candidate.id.in_(candidate_ids))
+    ).all()
+    changed = {}
+    for candidate in candidates:
+        values = summarize_experience(experience[candidate.id], today)
+        if values != {name: getattr(candidate, name) for name in EXPERIENCE_METRICS}:
+            changed[candidate.id] = values
+
+    if changed:
+        statement = (
+            update(Candidate.__table__)
+            .where(Candidate.__table__.c.id == bindparam("candidate_id"))
+            .values({name: bindparam(f"new_{name}") for name in EXPERIENCE_METRICS})
+        )
+        connection.execute(
+            statement,
+            [
+                {
+                    "candidate_id": candidate_id,
+                    **{f"new_{name}": value for name, value in values.items()},
+                }
+                for candidate_id, values in changed.items()
+            ],
+        )
+    return changed
+
+
+def open_experience_candidate_ids(today: date):
+    """
+    Select the candidates whose metrics change with the date: those with a
+    position that is open or ended yesterday.
+    """
+    return (
+        select(Experience.candidate_id)
+        .where(
+            (Experience.end_date.is_(None))
+            | (Experience.end_date >= today - timedelta(days=1))
+        )
+        .distinct()
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def refresh_experience_metrics_after_flush(session: Session, flush_context) -> None:
+    """
+    Keep the derived experience columns in sync with ORM writes of experience.
+
+    Runs in the flushing transaction, so the columns are committed or rolled
+    back together with the experience rows. Loaded candidates get the new
+    values without being marked as modified.
+    """
+    candidate_ids: Set[str] = set()
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, Experience):
+            history = attributes.get_history(instance, "candidate_id")
+            candidate_ids.update(
+                candidate_id
+                for candidate_id in (instance.candidate_id, *history.deleted)
+                if candidate_id is not None
+            )
+    if not candidate_ids:
+        return
+
+    changed = refresh_experience_metrics(session.connection(), candidate_ids)
+    for candidate_id, values in changed.items():
+        candidate = session.identity_map.get(
+            Session.identity_key(Candidate, candidate_id)
+        )
+        if candidate is not None:
+            for name, value in values.items():
+                attributes.set_committed_value(candidate, name, value)
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Uuid,
+)
+
+from app.db.database import Base
+
+
+class SkillPair(Base):
+    """
+    The number of candidates having both of two skills.
+
+    Every pair is stored in both directions, and a skill paired with itself
+    counts the candidates having it. Skill names are trimmed and lower-cased.
+    """
+
+    __tablename__ = "skill_pairs"
+    skill = Column(String, primary_key=True)
+    other = Column(String, primary_key=True)
+    candidates = Column(Integer, nullable=False)
+
+
+class SkillNeighbor(Base):
+    """
+    The skills most often held together with a skill, best first.
+
+    `share` is the fraction of the skill's candidates that have the neighbor.
+    """
+
+    __tablename__ = "skill_neighbors"
+    skill = Column(String, primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    neighbor = Column(String, nullable=False)
+    candidates = Column(Integer, nullable=False)
+    share = Column(Float, nullable=False)
+
+
+class SkillCooccurrenceCandidate(Base):
+    """
+    The skill names of a candidate as last counted in `skill_pairs`, so a
+    change of the candidate's skills is applied as a difference.
+
+    No foreign key: a deleted candidate's skills are subtracted after it is
+    gone.
+    """
+
+    __tablename__ = "skill_cooccurrence_candidates"
+    candidate_id = Column(Uuid(as_uuid=False), primary_key=True)
+    skills = Column(JSON, nullable=False)
+
+
+class SkillCooccurrenceState(Base):
+    """
+    The change log sequence number the co-occurrence tables reflect; a
+    single row with id 1.
+    """
+
+    __tablename__ = "skill_cooccurrence_state"
+    id = Column(Integer, primary_key=True)
+    synced_seq = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now())
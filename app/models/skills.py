@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, ForeignKey, Integer
+from sqlalchemy import String, Column, ForeignKey, Integer, Uuid
 from sqlalchemy.orm import Relationship
 
 from app.db.database import Base
@@ -9,5 +9,7 @@ class Skill(Base):
     __tablename__ = "skills"
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
-    candidate_id = Column(String, ForeignKey("candidates.id", ondelete="CASCADE"))
+    candidate_id = Column(
+        Uuid(as_uuid=False), ForeignKey("candidates.id", ondelete="CASCADE")
+    )
     candidate = Relationship(Candidate, back_populates="skills")
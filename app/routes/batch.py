@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.middleware.profiling import ProfiledRoute, query_budget
+from app.schemas.batch import BatchResultSchema, BatchSchema
+from app.services import batch as batch_services
+from app.utils import authentication, constants
+
+router = APIRouter(
+    prefix="/batch",
+    tags=["Batch"],
+    dependencies=[Depends(authentication.get_current_user)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.post("/", response_model=BatchResultSchema, status_code=status.HTTP_200_OK)
+# Authentication and the operations; each operation is also held to its own
+# budget, see batch_services.OPERATIONS.
+@query_budget(1 + batch_services.MAX_OPERATION_QUERIES * constants.MAX_BATCH_OPERATIONS)
+def run_batch(body: BatchSchema, db: Session = Depends(get_db)):
+    return batch_services.run_batch(body=body, db=db)
@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, status
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi_filter import FilterDepends
 from fastapi_pagination import Params, Page
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.filters.candidate import CandidateFilter
-from app.schemas.candidate import CandidateSchema, CandidateReadSchema
-from app.services import candidate
+from app.middleware.admission import HEAVY, READ, admission
+from app.middleware.profiling import ProfiledRoute, query_budget
+from app.models.candidate_document import DOCUMENT_READ_QUERIES, DOCUMENT_WRITE_QUERIES
+from app.schemas.candidate import (
+    CandidateBatchGetSchema,
+    CandidateBatchItemSchema,
+    CandidateBulkDeleteSchema,
+    CandidateMatchSchema,
+    CandidateSchema,
+    CandidateReadSchema,
+    SkillMatchSchema,
+)
+from app.services import candidate, export, matching
 from app.utils import authentication
 
 router = APIRouter(
     prefix="/candidates",
     tags=["Candidate"],
     dependencies=[Depends(authentication.get_current_user)],
+    route_class=ProfiledRoute,
 )
 
 
 @router.get(
     path="/", response_model=Page[CandidateReadSchema], status_code=status.HTTP_200_OK
 )
+@query_budget(4)
 def list_candidates(
     params: Params = Depends(), session: Session = Depends(get_db)
 ) -> Page[CandidateReadSchema]:
@@ -28,20 +44,37 @@ def list_candidates(
 @router.post(
     path="/", response_model=CandidateReadSchema, status_code=status.HTTP_201_CREATED
 )
+@query_budget(8 + DOCUMENT_WRITE_QUERIES)
 def create_candidate(body: CandidateSchema, db: Session = Depends(get_db)):
     return candidate.create_candidate(body=body, db=db)
 
 
+# A POST only to carry the ids in the body, so it reads from a replica.
+@router.post(
+    path="/batch-get/",
+    response_model=List[CandidateBatchItemSchema],
+    status_code=status.HTTP_200_OK,
+)
+@query_budget(4 + DOCUMENT_READ_QUERIES)
+@admission(READ)
+def batch_get_candidates(
+    body: CandidateBatchGetSchema, db: Session = Depends(get_read_db)
+):
+    return candidate.batch_get_candidates_response(body=body, db=db)
+
+
 @router.get(
     path="/{candidate_id}",
     response_model=CandidateReadSchema,
     status_code=status.HTTP_200_OK,
 )
+@query_budget(4 + DOCUMENT_READ_QUERIES)
 def retrieve_candidate(candidate_id: str, db: Session = Depends(get_db)):
-    return candidate.retrieve_candidate(candidate_id=candidate_id, db=db)
+    return candidate.retrieve_candidate_response(candidate_id=candidate_id, db=db)
 
 
 @router.delete(path="/{candidate_id}", status_code=status.HTTP_200_OK)
+@query_budget(3)
 def delete_candidate(candidate_id: str, db: Session = Depends(get_db)):
     return candidate.delete_candidate(candidate_id=candidate_id, db=db)
 
@@ -51,6 +84,8 @@ def delete_candidate(candidate_id: str, db: Session = Depends(get_db)):
     response_model=Page[CandidateReadSchema],
     status_code=status.HTTP_200_OK,
 )
+@query_budget(4)
+@admission(HEAVY)
 def filter_candidates(
     params: Params,
     candidate_filter: CandidateFilter,
@@ -61,6 +96,55 @@ def filter_candidates(
     )
 
 
+@router.get(path="/export/", status_code=status.HTTP_200_OK)
+# Authentication; every streamed chunk has its own budget, see
+# export.EXPORT_CHUNK_QUERIES.
+@query_budget(1)
+@admission(None)
+def export_candidates(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    candidate_filter: CandidateFilter = FilterDepends(CandidateFilter),
+):
+    # Streams for as long as the client reads, so it is bounded by its own
+    # concurrency limit instead of the latency-based admission control.
+    return export.export_candidates(
+        candidate_filter=candidate_filter, export_format=export_format
+    )
+
+
+@router.post(
+    path="/match/", response_model=CandidateMatchSchema, status_code=status.HTTP_200_OK
+)
+# Authentication and the refresh of the skill matrix from the change log.
+@query_budget(5)
+@admission(HEAVY)
+def match_candidates(body: SkillMatchSchema, db: Session = Depends(get_db)):
+    return matching.match_candidates(body=body, db=db)
+
+
+@router.post(path="/bulk-delete/", status_code=status.HTTP_200_OK)
+@query_budget(21)
+@admission(HEAVY)
+def bulk_delete_candidates(
+    body: CandidateBulkDeleteSchema, db: Session = Depends(get_db)
+):
+    return candidate.bulk_delete_candidates(body=body, db=db)
+
+
 @router.get(path="/generate-report/", status_code=status.HTTP_202_ACCEPTED)
-def generate_candidates_report(db: Session = Depends(get_db)):
-    return candidate.generate_candidates_report(db=db)
+@query_budget(2)
+@admission(HEAVY)
+def generate_candidates_report(response: Response, db: Session = Depends(get_db)):
+    return candidate.generate_candidates_report(db=db, response=response)
+
+
+@router.get(path="/reports/{task_id}", status_code=status.HTTP_200_OK)
+@query_budget(1)
+def get_report_status(task_id: str):
+    return candidate.get_report_status(task_id=task_id)
+
+
+@router.post(path="/reports/{task_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+@query_budget(1)
+def cancel_report(task_id: str):
+    return candidate.cancel_report(task_id=task_id)
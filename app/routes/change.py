@@ -0,0 +1,55 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+
+from app.middleware.admission import admission
+from app.middleware.profiling import ProfiledRoute, query_budget
+from app.schemas.change import ChangePageSchema, LatestChangeSchema
+from app.services import change as change_services
+from app.utils import authentication, constants
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Changes"],
+    dependencies=[Depends(authentication.get_current_user_detached)],
+    route_class=ProfiledRoute,
+)
+
+# Long polls and event streams are open for as long as there is nothing to
+# send, so they are exempt from the latency-based admission control. A long
+# poll reads the change log once per poll interval and has no query budget.
+# Authentication closes its session before the route runs, so no database
+# connection is held while waiting.
+
+
+@router.get("/", response_model=ChangePageSchema, status_code=status.HTTP_200_OK)
+@admission(None)
+async def list_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=constants.MAX_CHANGES_PER_PAGE),
+    wait: float = Query(default=0, ge=0, le=constants.MAX_CHANGES_WAIT_SECONDS),
+):
+    return await change_services.list_changes(since=since, limit=limit, wait=wait)
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK)
+# Authentication and the check of the cursor; the stream reads afterwards.
+@query_budget(3)
+@admission(None)
+def stream_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=constants.MAX_CHANGES_PER_PAGE),
+    last_event_id: Optional[int] = Header(default=None, ge=0),
+):
+    return change_services.stream_changes(
+        since=last_event_id if last_event_id is not None else since,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/latest", response_model=LatestChangeSchema, status_code=status.HTTP_200_OK
+)
+@query_budget(2)
+def latest_change():
+    return change_services.latest_change()
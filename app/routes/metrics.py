@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from app.middleware.admission import admission
+from app.middleware.profiling import ProfiledRoute, query_budget
+from app.utils.metrics import METRICS_CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=["Metrics"], route_class=ProfiledRoute)
+
+
+@router.get("/metrics", include_in_schema=False)
+@query_budget(0)
+@admission(None)
+def metrics() -> Response:
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -1,34 +1,71 @@
-from fastapi import APIRouter, Depends, status
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, status
 from fastapi_pagination import Page, Params
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
+from app.middleware.profiling import ProfiledRoute, query_budget
+from app.models.candidate_document import DOCUMENT_WRITE_QUERIES
 from app.schemas.candidate import (
+    SkillCompletionSchema,
+    SkillNeighborSchema,
     SkillUpdateSchema,
     SkillSchema,
     SkillReadSchema,
     SkillReadSchemaWithCandidateId,
 )
 from app.services import skill as skill_service
-from app.utils import authentication
+from app.utils import authentication, constants
 
 skill_router = APIRouter(
     prefix="/skills",
     tags=["Skills"],
     dependencies=[Depends(authentication.get_current_user)],
+    route_class=ProfiledRoute,
 )
 
 
 @skill_router.post(
     "/", response_model=SkillReadSchema, status_code=status.HTTP_201_CREATED
 )
+@query_budget(5 + DOCUMENT_WRITE_QUERIES)
 def create_skill(request_body: SkillSchema, db: Session = Depends(get_db)):
     return skill_service.create_skill(request_body=request_body, db=db)
 
 
+@skill_router.get(
+    "/autocomplete",
+    response_model=List[SkillCompletionSchema],
+    status_code=status.HTTP_200_OK,
+)
+# Authentication, and the rebuild of the index after skill writes.
+@query_budget(2)
+def autocomplete_skills(
+    prefix: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=constants.MAX_SKILL_COMPLETIONS),
+):
+    return skill_service.autocomplete_skills(prefix=prefix, limit=limit)
+
+
+@skill_router.get(
+    "/related",
+    response_model=List[SkillNeighborSchema],
+    status_code=status.HTTP_200_OK,
+)
+@query_budget(2)
+def list_related_skills(
+    name: str = Query(min_length=1),
+    limit: int = Query(default=10, ge=1, le=constants.MAX_RELATED_SKILLS),
+    db: Session = Depends(get_db),
+):
+    return skill_service.list_related_skills(name=name, limit=limit, db=db)
+
+
 @skill_router.get(
     "/{skill_id}", response_model=SkillReadSchema, status_code=status.HTTP_200_OK
 )
+@query_budget(2)
 def retrieve_skill(skill_id: int, db: Session = Depends(get_db)):
     return skill_service.retrieve_skill(skill_id=skill_id, db=db)
 
@@ -38,6 +75,7 @@ def retrieve_skill(skill_id: int, db: Session = Depends(get_db)):
     response_model=Page[SkillReadSchemaWithCandidateId],
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 def list_skills(
     candidate_id: str, db: Session = Depends(get_db), params: Params = Depends()
 ):
@@ -45,6 +83,7 @@ def list_skills(
 
 
 @skill_router.put("/{skill_id}/update", status_code=status.HTTP_200_OK)
+@query_budget(3 + DOCUMENT_WRITE_QUERIES)
 def update_skill(
     request_body: SkillUpdateSchema, skill_id: int, db: Session = Depends(get_db)
 ):
@@ -54,5 +93,6 @@ def update_skill(
 
 
 @skill_router.delete("/{skill_id}/delete/", status_code=status.HTTP_200_OK)
+@query_budget(3 + DOCUMENT_WRITE_QUERIES)
 def delete_skill(skill_id: int, db: Session = Depends(get_db)):
     return skill_service.delete_skill(skill_id=skill_id, db=db)
@@ -5,24 +5,28 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
+from app.middleware.profiling import ProfiledRoute, query_budget
 from app.schemas.user import UserSchema
 from app.services import user as user_services
 from app.utils import authentication
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=ProfiledRoute)
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
+@query_budget(2)
 def register(body: UserSchema, db: Session = Depends(get_db)):
     return user_services.register(body=body, db=db)
 
 
 @router.post("/login")
+@query_budget(2)
 def login(body: UserSchema, db: Session = Depends(get_db)):
     return user_services.login(body=body, db=db)
 
 
 @router.post("/token")
+@query_budget(1)
 def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db),
@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.utils import constants
+
+
+class BatchOperationSchema(BaseModel):
+    op: Literal[
+        "create_candidate",
+        "retrieve_candidate",
+        "delete_candidate",
+        "create_skill",
+        "retrieve_skill",
+        "update_skill",
+        "delete_skill",
+    ]
+    # Request body fields and path parameters of the operation. String values
+    # of the form "$<index>.<field>" are replaced by that field of the result
+    # of an earlier operation, e.g. {"candidate_id": "$0.id"}.
+    args: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchSchema(BaseModel):
+    mode: Literal["atomic", "best_effort"] = "atomic"
+    operations: List[BatchOperationSchema] = Field(
+        min_length=1, max_length=constants.MAX_BATCH_OPERATIONS
+    )
+
+
+class BatchOperationResultSchema(BaseModel):
+    index: int
+    status: int
+    result: Optional[Any] = None
+    error: Optional[Any] = None
+
+
+class BatchResultSchema(BaseModel):
+    committed: bool
+    results: List[BatchOperationResultSchema]
@@ -1,7 +1,10 @@
 from datetime import datetime, date
-from typing import List
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, PositiveFloat
+
+from app.filters.candidate import CandidateFilter
+from app.utils import constants
 
 
 class CandidateSkillSchema(BaseModel):
@@ -12,7 +15,7 @@ class ExperienceSchema(BaseModel):
     job_title: str
     company: str
     start_date: date
-    end_date: date
+    end_date: Optional[date] = None
 
 
 class CandidateSchema(BaseModel):
@@ -25,6 +28,9 @@ class CandidateReadSchema(CandidateSchema):
     id: str
     create_at: datetime
     update_at: datetime
+    experience_months: int
+    current_company: Optional[str] = None
+    latest_job_title: Optional[str] = None
     skills: List[CandidateSkillSchema]
     experience: List[ExperienceSchema]
 
@@ -32,6 +38,41 @@ class CandidateReadSchema(CandidateSchema):
         from_attributes = True
 
 
+class CandidateBulkDeleteSchema(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=constants.MAX_BULK_DELETE)
+    candidate_filter: Optional[CandidateFilter] = None
+
+
+class CandidateBatchGetSchema(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=constants.MAX_BATCH_GET)
+
+
+class CandidateBatchItemSchema(BaseModel):
+    id: str
+    found: bool
+    candidate: Optional[CandidateReadSchema] = None
+
+
+class SkillMatchSchema(BaseModel):
+    required: Dict[str, PositiveFloat] = Field(
+        default_factory=dict, max_length=constants.MAX_MATCH_SKILLS
+    )
+    preferred: Dict[str, PositiveFloat] = Field(
+        default_factory=dict, max_length=constants.MAX_MATCH_SKILLS
+    )
+    top_k: int = Field(default=20, ge=1, le=constants.MAX_MATCH_TOP_K)
+
+
+class CandidateMatchItemSchema(BaseModel):
+    candidate_id: str
+    score: float
+    matched_skills: List[str]
+
+
+class CandidateMatchSchema(BaseModel):
+    matches: List[CandidateMatchItemSchema]
+
+
 # Skill Schemas
 
 
@@ -52,6 +93,20 @@ class SkillReadSchema(BaseModel):
         from_attributes = True
 
 
+class SkillCompletionSchema(BaseModel):
+    name: str
+    candidates: int
+
+
+class SkillNeighborSchema(BaseModel):
+    neighbor: str
+    candidates: int
+    share: float
+
+    class Config:
+        from_attributes = True
+
+
 class SkillReadSchemaWithCandidateId(BaseModel):
     candidate_id: str
     name: str
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeSchema(BaseModel):
+    seq: int
+    entity: Literal["candidate", "skill"]
+    entity_id: str
+    op: Literal["create", "update", "delete"]
+    candidate_id: Optional[str] = None
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChangePageSchema(BaseModel):
+    changes: List[ChangeSchema]
+    # Pass as `since` to get the changes after this page.
+    next_since: int
+
+
+class LatestChangeSchema(BaseModel):
+    seq: int
@@ -0,0 +1,245 @@
+import logging
+import re
+from typing import Any, Callable, Dict, List
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.middleware.profiling import section_query_budget
+from app.models.candidate_document import DOCUMENT_WRITE_QUERIES
+from app.schemas.batch import (
+    BatchOperationResultSchema,
+    BatchResultSchema,
+    BatchSchema,
+)
+from app.schemas.candidate import (
+    CandidateReadSchema,
+    CandidateSchema,
+    SkillReadSchemaWithCandidateId,
+    SkillSchema,
+    SkillUpdateSchema,
+)
+from app.services import candidate as candidate_service
+from app.services import skill as skill_service
+from app.utils import constants
+
+logger = logging.getLogger(__name__)
+
+REFERENCE = re.compile(r"^\$(\d+)\.(\w+)$")
+
+# A document refresh runs in a savepoint of the operation's savepoint, which
+# adds the SAVEPOINT and ROLLBACK TO SAVEPOINT statements.
+BATCH_DOCUMENT_WRITE_QUERIES = (
+    DOCUMENT_WRITE_QUERIES + 2 if DOCUMENT_WRITE_QUERIES else 0
+)
+
+
+def _dump(schema: type[BaseModel], value: Any) -> Dict[str, Any]:
+    return schema.model_validate(value, from_attributes=True).model_dump(mode="json")
+
+
+def _create_candidate(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    body = CandidateSchema.model_validate(args)
+    return _dump(
+        CandidateReadSchema, candidate_service.create_candidate(body=body, db=db)
+    )
+
+
+def _retrieve_candidate(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    return _dump(
+        CandidateReadSchema,
+        candidate_service.retrieve_candidate(
+            candidate_id=str(args["candidate_id"]), db=db
+        ),
+    )
+
+
+def _delete_candidate(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    return candidate_service.delete_candidate(
+        candidate_id=str(args["candidate_id"]), db=db
+    )
+
+
+def _create_skill(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    body = SkillSchema.model_validate(args)
+    return _dump(
+        SkillReadSchemaWithCandidateId,
+        skill_service.create_skill(request_body=body, db=db),
+    )
+
+
+def _retrieve_skill(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    return _dump(
+        SkillReadSchemaWithCandidateId,
+        skill_service.retrieve_skill(skill_id=int(args["skill_id"]), db=db),
+    )
+
+
+def _update_skill(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    body = SkillUpdateSchema.model_validate(args)
+    return _dump(
+        SkillReadSchemaWithCandidateId,
+        skill_service.update_skill(
+            request_body=body, skill_id=int(args["skill_id"]), db=db
+        ),
+    )
+
+
+def _delete_skill(db: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+    return skill_service.delete_skill(skill_id=int(args["skill_id"]), db=db)
+
+
+# Each operation maps to the service behind the equivalent endpoint, the
+# status code that endpoint answers with and its query budget: the statements
+# of the service, the change log and loading the result, including the
+# savepoints around the operation and around loading the result.
+OPERATIONS: Dict[str, tuple[Callable[[Session, Dict], Any], int, int]] = {
+    "create_candidate": (
+        _create_candidate,
+        status.HTTP_201_CREATED,
+        11 + BATCH_DOCUMENT_WRITE_QUERIES,
+    ),
+    "retrieve_candidate": (_retrieve_candidate, status.HTTP_200_OK, 5),
+    "delete_candidate": (_delete_candidate, status.HTTP_200_OK, 4),
+    "create_skill": (
+        _create_skill,
+        status.HTTP_201_CREATED,
+        8 + BATCH_DOCUMENT_WRITE_QUERIES,
+    ),
+    "retrieve_skill": (_retrieve_skill, status.HTTP_200_OK, 3),
+    "update_skill": (
+        _update_skill,
+        status.HTTP_200_OK,
+        4 + BATCH_DOCUMENT_WRITE_QUERIES,
+    ),
+    "delete_skill": (
+        _delete_skill,
+        status.HTTP_200_OK,
+        4 + BATCH_DOCUMENT_WRITE_QUERIES,
+    ),
+}
+# The most statements any operation may issue, for the budget of a batch.
+MAX_OPERATION_QUERIES = max(queries for _, _, queries in OPERATIONS.values())
+
+
+def _resolve(value: Any, results: List[BatchOperationResultSchema]) -> Any:
+    """
+    Replace "$<index>.<field>" references with results of earlier operations.
+
+    Raises:
+        HTTPException: If a reference names a failed, later or missing result.
+    """
+    if isinstance(value, dict):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    match = REFERENCE.match(value)
+    if not match:
+        return value
+    index, field = int(match.group(1)), match.group(2)
+    earlier = results[index] if index < len(results) else None
+    if (
+        earlier is not None
+        and earlier.error is None
+        and isinstance(earlier.result, dict)
+        and field in earlier.result
+    ):
+        return earlier.result[field]
+    raise HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=constants.BATCH_UNRESOLVED_REFERENCE_MESSAGE.format(reference=value),
+    )
+
+
+def _run_operation(
+    db: Session, index: int, op: str, args: Dict[str, Any], results: List
+) -> BatchOperationResultSchema:
+    """
+    Run one operation in its own savepoint and describe its outcome.
+
+    The services commit their work; in a savepoint session that only releases
+    the savepoint, so nothing is durable before the whole batch commits. A
+    failing operation is rolled back to its savepoint.
+    """
+    function, success_status, _ = OPERATIONS[op]
+    error: Any
+    try:
+        result = function(db, _resolve(args, results))
+        db.commit()
+        return BatchOperationResultSchema(
+            index=index, status=success_status, result=result
+        )
+    except HTTPException as e:
+        status_code, error = e.status_code, e.detail
+    except ValidationError as e:
+        status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+        error = e.errors(include_url=False, include_context=False)
+    except (KeyError, ValueError) as e:
+        status_code, error = status.HTTP_422_UNPROCESSABLE_ENTITY, repr(e)
+    except IntegrityError as e:
+        status_code, error = status.HTTP_409_CONFLICT, str(e.orig)
+    except Exception:
+        logger.exception("batch operation %d (%s) failed", index, op)
+        status_code, error = status.HTTP_500_INTERNAL_SERVER_ERROR, "internal error"
+
+    db.rollback()
+    return BatchOperationResultSchema(index=index, status=status_code, error=error)
+
+
+def run_batch(body: BatchSchema, db: Session) -> BatchResultSchema:
+    """
+    Run a list of candidate and skill operations in one database transaction.
+
+    Operations run in order against the same services as the individual
+    endpoints, each in a savepoint of a single transaction that is committed
+    once at the end. In "atomic" mode the first failing operation rolls the
+    whole batch back and the remaining ones are skipped; in "best_effort"
+    mode only the failing operations are rolled back.
+
+    Args:
+        body (BatchSchema): The mode and the operations.
+        db (Session): The SQLAlchemy database session of the request.
+
+    Returns:
+        BatchResultSchema: Whether the transaction was committed and the
+                           status and result or error of every operation.
+    """
+    # A second session on the request's connection, joining its transaction
+    # through savepoints; commits of the services end a savepoint only.
+    work = SessionLocal(bind=db.connection(), join_transaction_mode="create_savepoint")
+    results: List[BatchOperationResultSchema] = []
+    failed = False
+    try:
+        for index, operation in enumerate(body.operations):
+            if failed and body.mode == "atomic":
+                results.append(
+                    BatchOperationResultSchema(
+                        index=index,
+                        status=status.HTTP_424_FAILED_DEPENDENCY,
+                        error=constants.BATCH_OPERATION_SKIPPED_MESSAGE,
+                    )
+                )
+                continue
+            with section_query_budget(
+                f"/batch/ {operation.op}", OPERATIONS[operation.op][2]
+            ):
+                result = _run_operation(
+                    work, index, operation.op, operation.args, results
+                )
+            failed = failed or result.error is not None
+            results.append(result)
+    finally:
+        work.close()
+
+    if failed and body.mode == "atomic":
+        db.rollback()
+        return BatchResultSchema(committed=False, results=results)
+
+    db.commit()
+    return BatchResultSchema(committed=True, results=results)
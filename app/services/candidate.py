@@ -1,23 +1,52 @@
-from typing import Dict
-
-from fastapi import HTTPException, status
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Union
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, Response, status
 from fastapi_pagination import Params, Page
 from sqlalchemy.orm import Session
 
-from app.celery.tasks import generate_candidates_csv_file
+from app.celery.backends import REPORT_TASK, get_task_backend
+from app.celery.dispatch import DispatchUnavailable
+from app.celery.reports import REPORT_CACHE_SECONDS, REPORT_STALE_SECONDS
+from app.celery.state import (
+    PENDING,
+    READY_STATES,
+    STARTED,
+    SUCCESS,
+    claim_fingerprint,
+    is_cancel_requested,
+    release_fingerprint,
+)
 from app.db_queries.candidate_queries import (
     add_new_candidate,
     get_candidate_by_email,
     get_candidate_by_id,
     get_candidate_by_phone,
+    get_candidate_documents,
+    get_candidates_by_ids,
+    get_candidates_data_version,
     get_paginated_list_of_candidates,
     candidate_delete,
+    delete_candidates_by_filter,
+    delete_candidates_by_ids,
     filter_and_paginate_candidates,
 )
 from app.filters.candidate import CandidateFilter
 from app.models.candidate import Candidate
-from app.schemas.candidate import CandidateSchema, CandidateReadSchema
+from app.models.candidate_document import CANDIDATE_DOCUMENTS
+from app.schemas.candidate import (
+    CandidateBatchGetSchema,
+    CandidateBatchItemSchema,
+    CandidateBulkDeleteSchema,
+    CandidateSchema,
+    CandidateReadSchema,
+)
 from app.utils import constants
+from app.utils.ids import is_valid_uuid
 
 
 def create_candidate(body: CandidateSchema, db: Session) -> Candidate:
@@ -81,6 +110,131 @@ def retrieve_candidate(candidate_id: str, db: Session) -> Candidate:
     return candidate
 
 
+def batch_get_candidates(
+    body: CandidateBatchGetSchema, db: Session
+) -> List[CandidateBatchItemSchema]:
+    """
+    Retrieve many candidates by ID in one round trip.
+
+    Args:
+        body (CandidateBatchGetSchema): The IDs of the candidates to retrieve.
+        db (Session): The SQLAlchemy database session used for database operations.
+
+    Returns:
+        List[CandidateBatchItemSchema]: One item per requested ID, in request
+                                        order, with `found` false and no
+                                        candidate for unknown or malformed IDs.
+    """
+    candidates = get_candidates_by_ids(ids=body.ids, db=db)
+    items = []
+    for candidate_id in body.ids:
+        candidate = (
+            candidates.get(str(UUID(candidate_id)))
+            if is_valid_uuid(candidate_id)
+            else None
+        )
+        items.append(
+            CandidateBatchItemSchema(
+                id=candidate_id,
+                found=candidate is not None,
+                candidate=(
+                    CandidateReadSchema.model_validate(candidate, from_attributes=True)
+                    if candidate
+                    else None
+                ),
+            )
+        )
+    return items
+
+
+def _json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+def retrieve_candidate_response(
+    candidate_id: str, db: Session
+) -> Union[Candidate, Response]:
+    """
+    Retrieve a candidate for the detail endpoint.
+
+    With CANDIDATE_DOCUMENTS enabled, the candidate's precomputed document is
+    returned as is, fetched with a single-row query; candidates without a
+    document are loaded like in retrieve_candidate.
+
+    Args:
+        candidate_id (str): The unique identifier of the candidate to retrieve.
+        db (Session): The SQLAlchemy database session used for database operations.
+
+    Returns:
+        Union[Candidate, Response]: The candidate, or the JSON response with
+                                    its document.
+
+    Raises:
+        HTTPException: If no candidate is found with the provided ID, a
+                       404 Not Found error is raised.
+    """
+    if CANDIDATE_DOCUMENTS:
+        document = get_candidate_documents(ids=[candidate_id], db=db)
+        if document:
+            return _json_response(next(iter(document.values())))
+
+    return retrieve_candidate(candidate_id=candidate_id, db=db)
+
+
+def batch_get_candidates_response(
+    body: CandidateBatchGetSchema, db: Session
+) -> Union[List[CandidateBatchItemSchema], Response]:
+    """
+    Retrieve many candidates by ID for the batch get endpoint.
+
+    With CANDIDATE_DOCUMENTS enabled, the response is assembled from the
+    precomputed documents, fetched with one IN query, without validating or
+    serializing the candidates again. Candidates without a document are
+    loaded like in batch_get_candidates.
+
+    Args:
+        body (CandidateBatchGetSchema): The IDs of the candidates to retrieve.
+        db (Session): The SQLAlchemy database session used for database operations.
+
+    Returns:
+        Union[List[CandidateBatchItemSchema], Response]: One item per
+                                                        requested ID, in
+                                                        request order.
+    """
+    if not CANDIDATE_DOCUMENTS:
+        return batch_get_candidates(body=body, db=db)
+
+    documents = get_candidate_documents(ids=body.ids, db=db)
+    canonical_ids = {
+        candidate_id: str(UUID(candidate_id))
+        for candidate_id in body.ids
+        if is_valid_uuid(candidate_id)
+    }
+    missing = [
+        candidate_id
+        for candidate_id in canonical_ids.values()
+        if candidate_id not in documents
+    ]
+    if missing:
+        for candidate_id, candidate in get_candidates_by_ids(
+            ids=missing, db=db
+        ).items():
+            documents[candidate_id] = (
+                CandidateReadSchema.model_validate(candidate, from_attributes=True)
+                .model_dump_json()
+                .encode()
+            )
+
+    items = []
+    for candidate_id in body.ids:
+        canonical_id = canonical_ids.get(candidate_id)
+        document = documents.get(canonical_id) if canonical_id else None
+        # The item without its closing brace, followed by the document.
+        head = json.dumps({"id": candidate_id, "found": document is not None})[:-1]
+        items.append(head.encode() + b', "candidate": ' + (document or b"null") + b"}")
+    return _json_response(b"[" + b", ".join(items) + b"]")
+
+
 def list_candidates(db: Session, params: Params) -> Page[CandidateReadSchema]:
     """
     Retrieve a paginated list of candidates from the database.
@@ -137,31 +291,202 @@ def delete_candidate(candidate_id: str, db: Session) -> Dict:
                        404 Not Found error is raised.
     """
 
-    candidate = get_candidate_by_id(db=db, id=candidate_id)
-    if not candidate:
+    if not candidate_delete(candidate_id=candidate_id, db=db):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="candidate not found."
         )
 
-    candidate_delete(candidate=candidate, db=db)
-
     return {"message": "candidate deleted."}
 
 
-def generate_candidates_report(db: Session) -> dict[str, str]:
+def bulk_delete_candidates(body: CandidateBulkDeleteSchema, db: Session) -> Dict:
+    """
+    Delete many candidates by ID list or by filter with chunked set-based statements.
+
+    Args:
+        body (CandidateBulkDeleteSchema): Either the IDs of the candidates to delete
+                                          or filter criteria selecting them.
+        db (Session): The SQLAlchemy database session used for database operations.
+
+    Returns:
+        Dict: A message and the number of deleted candidates. At most
+              MAX_BULK_DELETE candidates matching a filter are deleted per call.
+
+    Raises:
+        HTTPException: If neither IDs nor any filter value is given, a
+                       400 Bad Request error is raised.
+    """
+    if body.ids:
+        deleted = delete_candidates_by_ids(db=db, ids=body.ids)
+    elif body.candidate_filter and body.candidate_filter.filtering_fields:
+        deleted = delete_candidates_by_filter(
+            db=db,
+            candidate_filter=body.candidate_filter,
+            limit=constants.MAX_BULK_DELETE,
+        )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=constants.BULK_DELETE_CRITERIA_REQUIRED_MESSAGE,
+        )
+
+    return {"message": "candidates deleted.", "deleted": deleted}
+
+
+def _reusable_report(task_id: str) -> Optional[Dict]:
+    """
+    Return the state of a report task a new identical request can use.
+
+    Args:
+        task_id (str): The task holding the request's fingerprint.
+
+    Returns:
+        Optional[Dict]: The state of a pending or running task, or of a
+                        finished one whose file is still there and fresh;
+                        None otherwise.
+    """
+    task_state = get_task_backend().status(task_id)
+    if task_state is None:
+        return None
+
+    age = time.time() - task_state["updated_at"]
+    if task_state["state"] in (PENDING, STARTED):
+        if age < REPORT_STALE_SECONDS and not is_cancel_requested(task_id):
+            return task_state
+    elif task_state["state"] == SUCCESS:
+        if age < REPORT_CACHE_SECONDS and os.path.exists(task_state["result"]):
+            return task_state
+    return None
+
+
+def generate_candidates_report(db: Session, response: Response) -> dict[str, str]:
     """
     Initiate the generation of a candidates report in CSV format.
 
+    The report is generated by the task backend selected with TASK_BACKEND,
+    Celery or a local process pool. Celery tasks are handed to the broker with
+    a short timeout and spooled in-process while it is unavailable, so the
+    response does not wait on the broker.
+
+    Requests are fingerprinted by the report parameters and the version of
+    the candidate data. A request identical to a pending or running report
+    joins that task, and while the data is unchanged the last finished report
+    is returned right away.
+
     Args:
         db (Session): The SQLAlchemy database session.
+        response (Response): The response, set to 200 OK when the report is
+                             already available.
+
+    Returns:
+        dict[str, str]: A message and the id of the report task, and the
+                        report path if it is already available.
+
+    Raises:
+        HTTPException: If the broker is unavailable and the local spool is
+                       full, a 503 Service Unavailable error is raised.
+    """
+    params = {"report": "candidates"}
+    version = get_candidates_data_version(db=db)
+    fingerprint = hashlib.sha256(
+        json.dumps([params, version], default=str).encode()
+    ).hexdigest()
+
+    # A second round only follows releasing a stale claim.
+    claimed = True
+    for _ in range(2):
+        task_id = str(uuid4())
+        holder = claim_fingerprint(fingerprint, task_id)
+        if holder is None:
+            break
+
+        task_state = _reusable_report(holder)
+        if task_state is None:
+            release_fingerprint(fingerprint, holder)
+            continue
+        if task_state["state"] == SUCCESS:
+            response.status_code = status.HTTP_200_OK
+            return {
+                "message": "Report is ready.",
+                "task_id": holder,
+                "result": task_state["result"],
+            }
+        return {"message": "Generating report...", "task_id": holder}
+    else:
+        # Lost a race for the fingerprint twice; generate without coalescing.
+        claimed = False
+
+    try:
+        task_id = get_task_backend().submit(REPORT_TASK, task_id=task_id)
+    except DispatchUnavailable:
+        if claimed:
+            release_fingerprint(fingerprint, task_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=constants.REPORT_DISPATCH_UNAVAILABLE_MESSAGE,
+        )
+
+    return {"message": "Generating report...", "task_id": task_id}
+
+
+def get_report_status(task_id: str) -> Dict:
+    """
+    Retrieve the state of a report task.
+
+    Args:
+        task_id (str): The id returned when the report was requested.
+
+    Returns:
+        Dict: The task id and its state (PENDING, STARTED, SUCCESS, FAILURE
+              or REVOKED). Running reports include the candidates processed,
+              the total, the throughput and the estimated seconds left;
+              finished ones the report path, failed ones the error.
+
+    Raises:
+        HTTPException: If no report task has this id, a 404 Not Found error
+                       is raised.
+    """
+    task_state = get_task_backend().status(task_id)
+
+    if task_state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="report task not found."
+        )
+
+    return task_state
+
+
+def cancel_report(task_id: str) -> Dict:
+    """
+    Cancel a pending or running report task.
+
+    The task stops before its next chunk of candidates and removes the
+    partially written report.
+
+    Args:
+        task_id (str): The id returned when the report was requested.
 
     Returns:
-        str: A message indicating that the report generation has been initiated.
+        Dict: A message and the task id.
 
     Raises:
-        HTTPException: If there is an issue with starting the report generation.
+        HTTPException: If no report task has this id, a 404 Not Found error
+                       is raised; if the task already finished, a 409
+                       Conflict error is raised.
     """
+    backend = get_task_backend()
+    task_state = backend.status(task_id)
+
+    if task_state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="report task not found."
+        )
+    if task_state["state"] in READY_STATES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=constants.REPORT_ALREADY_FINISHED_MESSAGE,
+        )
 
-    generate_candidates_csv_file.delay()
+    backend.cancel(task_id)
 
-    return {"message": "Generating report..."}
+    return {"message": "report cancellation requested.", "task_id": task_id}
@@ -0,0 +1,148 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.db.database import read_session_scope
+from app.db_queries.change_queries import (
+    get_changes,
+    get_latest_change_sequence,
+    get_oldest_change_sequence,
+)
+from app.models.change_log import change_signal
+from app.schemas.change import ChangePageSchema, ChangeSchema, LatestChangeSchema
+from app.utils import constants
+
+load_dotenv()
+
+# How often waiting readers look for changes committed by other processes.
+# Changes committed by this process wake them at once.
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))
+# How long a gap in the sequence may belong to a running transaction. Changes
+# are stamped when they are written, not when they commit, so this has to
+# exceed the longest write transaction, see get_changes. API requests are cut
+# off after WEB_TIMEOUT (60 seconds) and tasks commit in chunks.
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "300"))
+# Seconds between keep-alive comments on idle event streams.
+CHANGE_FEED_HEARTBEAT_SECONDS = 15
+
+
+def _read_changes(since: int, limit: int) -> ChangePageSchema:
+    """
+    Read a page of changes with a short-lived session.
+
+    Raises:
+        HTTPException: If changes after `since` were already pruned.
+    """
+    with read_session_scope() as db:
+        if since:
+            oldest = get_oldest_change_sequence(db)
+            if oldest is not None and since < oldest - 1:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail=constants.CHANGE_FEED_EXPIRED_MESSAGE,
+                )
+        settled_before = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+        changes = [
+            ChangeSchema.model_validate(change)
+            for change in get_changes(db, since, limit, settled_before)
+        ]
+    return ChangePageSchema(
+        changes=changes, next_since=changes[-1].seq if changes else since
+    )
+
+
+async def list_changes(since: int, limit: int, wait: float) -> ChangePageSchema:
+    """
+    Retrieve the changes to candidates and skills after a sequence number.
+
+    With `wait`, an empty page is not returned at once: the request is held
+    until changes are committed or `wait` seconds have passed (long polling).
+    Waiting does not hold a database connection or a worker thread.
+
+    Args:
+        since (int): The `next_since` of the previous page, 0 to start from
+                     the oldest retained change.
+        limit (int): The maximum number of changes to return.
+        wait (float): How long to wait for changes if there are none.
+
+    Returns:
+        ChangePageSchema: The changes in sequence order and the cursor of the
+                          next page.
+
+    Raises:
+        HTTPException: If changes after `since` are no longer retained, a 410
+                       Gone error is raised; the client has to resynchronize.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        version = change_signal.version
+        page = await run_in_threadpool(_read_changes, since, limit)
+        remaining = deadline - time.monotonic()
+        if page.changes or remaining <= 0:
+            return page
+        await change_signal.wait(version, min(remaining, CHANGE_FEED_POLL_SECONDS))
+
+
+async def _change_events(since: int, limit: int) -> AsyncIterator[str]:
+    last_sent = time.monotonic()
+    while True:
+        version = change_signal.version
+        try:
+            page = await run_in_threadpool(_read_changes, since, limit)
+        except HTTPException:
+            # Pruned while the client was reading; it reconnects with its
+            # last event id and gets the 410.
+            return
+        for change in page.changes:
+            yield f"id: {change.seq}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+        since = page.next_since
+        if page.changes:
+            last_sent = time.monotonic()
+            continue
+
+        if time.monotonic() - last_sent >= CHANGE_FEED_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await change_signal.wait(version, CHANGE_FEED_POLL_SECONDS)
+
+
+def stream_changes(since: int, limit: int) -> StreamingResponse:
+    """
+    Push the changes after a sequence number as server-sent events.
+
+    Every change is an event of type "change" whose id is its sequence
+    number, so a reconnecting client resumes through `Last-Event-ID`.
+
+    Args:
+        since (int): The sequence number of the last change already seen.
+        limit (int): The maximum number of changes read at a time.
+
+    Returns:
+        StreamingResponse: The event stream, open until the client leaves.
+
+    Raises:
+        HTTPException: If changes after `since` are no longer retained, a 410
+                       Gone error is raised.
+    """
+    # Fail before the stream starts if the cursor has expired.
+    _read_changes(since, 1)
+    return StreamingResponse(
+        _change_events(since, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def latest_change() -> LatestChangeSchema:
+    """
+    Return the sequence number of the latest change, where a client that
+    just copied all candidates continues the feed.
+    """
+    with read_session_scope() as db:
+        return LatestChangeSchema(seq=get_latest_change_sequence(db))
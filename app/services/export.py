@@ -0,0 +1,159 @@
+import csv
+import io
+import os
+import threading
+from typing import Iterator, Sequence
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.db.database import read_session_scope
+from app.db_queries.candidate_queries import iter_candidate_chunks
+from app.filters.candidate import CandidateFilter
+from app.middleware.profiling import section_query_budget
+from app.models.candidate import Candidate
+from app.schemas.candidate import CandidateReadSchema
+from app.utils import constants
+
+load_dotenv()
+
+# Candidates loaded and sent to the client at a time.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+# Exports running at once per process; each holds a database connection
+# for as long as the client takes to read it.
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", "4"))
+EXPORT_RETRY_AFTER_SECONDS = 5
+# Statements per chunk: the candidates, their skills and their experience.
+EXPORT_CHUNK_QUERIES = 3
+
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+CSV_COLUMNS = [
+    "id",
+    "name",
+    "email",
+    "phone",
+    "skills",
+    "experience_months",
+    "current_company",
+    "latest_job_title",
+]
+
+_export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENCY)
+
+
+class _ExportSlot:
+    """
+    One acquired export slot, released at most once by whichever of the
+    stream and the response's background task ends first.
+    """
+
+    def __init__(self) -> None:
+        self._held = True
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        _export_slots.release()
+
+
+def _ndjson_chunk(candidates: Sequence[Candidate]) -> bytes:
+    return b"".join(
+        CandidateReadSchema.model_validate(candidate).model_dump_json().encode() + b"\n"
+        for candidate in candidates
+    )
+
+
+def _csv_chunk(candidates: Sequence[Candidate]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for candidate in candidates:
+        writer.writerow(
+            [
+                candidate.id,
+                candidate.name,
+                candidate.email,
+                candidate.phone,
+                ";".join(skill.name for skill in candidate.skills),
+                candidate.experience_months,
+                candidate.current_company,
+                candidate.latest_job_title,
+            ]
+        )
+    return buffer.getvalue().encode()
+
+
+def _export_chunks(
+    candidate_filter: CandidateFilter, export_format: str, slot: _ExportSlot
+) -> Iterator[bytes]:
+    # Runs while the response is sent, after the request's session is gone,
+    # so it opens its own. The slot is released when the stream ends, fails
+    # or is closed because the client went away.
+    try:
+        if export_format == CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(CSV_COLUMNS)
+            yield buffer.getvalue().encode()
+
+        serialize = _csv_chunk if export_format == CSV else _ndjson_chunk
+        with read_session_scope() as db:
+            chunks = iter_candidate_chunks(db, EXPORT_CHUNK_SIZE, candidate_filter)
+            while True:
+                # The route's budget is checked before streaming starts, so
+                # every chunk, serialization included, is held to its own.
+                with section_query_budget(
+                    "/candidates/export/ chunk", EXPORT_CHUNK_QUERIES
+                ):
+                    candidates = next(chunks, None)
+                    data = serialize(candidates) if candidates else None
+                if data is None:
+                    return
+                yield data
+    finally:
+        slot.release()
+
+
+def export_candidates(
+    candidate_filter: CandidateFilter, export_format: str
+) -> StreamingResponse:
+    """
+    Stream every candidate matching a filter as NDJSON or CSV.
+
+    Candidates are read in keyset chunks of EXPORT_CHUNK_SIZE with their
+    skills and experience, and every chunk is serialized and sent before the
+    next one is read. The next chunk is only read once the client has taken
+    the previous one, so a slow client slows the export down instead of
+    making it buffer, and the first rows go out after a single chunk.
+
+    Args:
+        candidate_filter (CandidateFilter): The filter criteria to apply.
+        export_format (str): "ndjson" for one CandidateReadSchema object per
+                             line, "csv" for the flat CSV_COLUMNS.
+
+    Returns:
+        StreamingResponse: The streamed export.
+
+    Raises:
+        HTTPException: If EXPORT_MAX_CONCURRENCY exports are already running,
+                       a 503 Service Unavailable error is raised.
+    """
+    if not _export_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=constants.SERVER_OVERLOADED_MESSAGE,
+            headers={"Retry-After": str(EXPORT_RETRY_AFTER_SECONDS)},
+        )
+
+    slot = _ExportSlot()
+    return StreamingResponse(
+        _export_chunks(candidate_filter, export_format, slot),
+        media_type=MEDIA_TYPES[export_format],
+        # Releases the slot if the stream never started.
+        background=BackgroundTask(slot.release),
+    )
@@ -0,0 +1,147 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db_queries.change_queries import (
+    get_changes,
+    get_oldest_change_sequence,
+    get_settled_change_sequence,
+)
+from app.db_queries.skill_queries import get_skills_of_candidates, iter_skill_pairs
+from app.schemas.candidate import CandidateMatchSchema, SkillMatchSchema
+from app.services.change import CHANGE_FEED_SETTLE_SECONDS
+from app.utils import constants
+
+if TYPE_CHECKING:
+    from app.utils.skill_matrix import SkillMatrix
+
+load_dotenv()
+
+# Candidates per row block of the skill matrix. Blocks are scored in parallel,
+# so pools smaller than one block are scored on one thread.
+MATCHING_BLOCK_ROWS = int(os.getenv("MATCHING_BLOCK_ROWS", "250000"))
+# Threads scoring the blocks; SciPy releases the GIL for sparse products.
+MATCHING_WORKERS = int(os.getenv("MATCHING_WORKERS", str(os.cpu_count() or 1)))
+# Changed candidates kept beside the matrix before it is rebuilt with them.
+MATCHING_COMPACT_AFTER = int(os.getenv("MATCHING_COMPACT_AFTER", "1000"))
+# Changes applied incrementally per request; a larger backlog reloads the
+# matrix from the skills table.
+MATCHING_MAX_CHANGES = 10_000
+
+
+class _MatchingState:
+    """
+    The skill matrix of this process and the change log position it reflects.
+    """
+
+    def __init__(self) -> None:
+        self.matrix: Optional["SkillMatrix"] = None
+        self.synced_seq = 0
+        self.lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_state() -> _MatchingState:
+    return _MatchingState()
+
+
+def _load(state: _MatchingState, db: Session) -> "SkillMatrix":
+    # NumPy and SciPy are loaded with the first match, not at startup.
+    from app.utils.skill_matrix import SkillMatrix
+
+    if state.matrix is None:
+        state.matrix = SkillMatrix(
+            block_rows=MATCHING_BLOCK_ROWS,
+            workers=MATCHING_WORKERS,
+            compact_after=MATCHING_COMPACT_AFTER,
+        )
+    # A change numbered below the latest one may still be uncommitted and
+    # missing from the load, so the next refresh starts at the last settled
+    # change. Changes after it are applied again, which only reads the
+    # current skills of their candidates once more.
+    settled_before = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    state.synced_seq = get_settled_change_sequence(db, settled_before)
+    state.matrix.load(iter_skill_pairs(db))
+    return state.matrix
+
+
+def _refresh(state: _MatchingState, db: Session) -> "SkillMatrix":
+    """
+    Bring the skill matrix up to date with the change log.
+
+    Only candidates whose skills were written since the last refresh are read
+    again. The matrix is reloaded on first use, when the changes since the
+    last refresh were pruned, and when there are too many to apply one by one.
+
+    Returns:
+        SkillMatrix: The up to date matrix.
+    """
+    matrix = state.matrix
+    if matrix is None:
+        return _load(state, db)
+    oldest = get_oldest_change_sequence(db)
+    if oldest is not None and state.synced_seq < oldest - 1:
+        return _load(state, db)
+
+    settled_before = datetime.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    changes = get_changes(db, state.synced_seq, MATCHING_MAX_CHANGES, settled_before)
+    if not changes:
+        return matrix
+    if len(changes) == MATCHING_MAX_CHANGES:
+        return _load(state, db)
+    candidate_ids = {
+        str(change.candidate_id) for change in changes if change.candidate_id
+    }
+    if candidate_ids:
+        skills = get_skills_of_candidates(db, candidate_ids)
+        matrix.update(
+            {candidate_id: skills.get(candidate_id) for candidate_id in candidate_ids}
+        )
+    state.synced_seq = int(changes[-1].seq)
+    return matrix
+
+
+def match_candidates(body: SkillMatchSchema, db: Session) -> CandidateMatchSchema:
+    """
+    Rank candidates by how well their skills match a job.
+
+    Scoring runs over a candidate × skill matrix held in memory and kept
+    current from the change log, so a request reads only the skills written
+    since the previous one.
+
+    Args:
+        body (SkillMatchSchema): The weighted required and preferred skills
+                                 and the number of candidates to return.
+        db (Session): The database session.
+
+    Returns:
+        CandidateMatchSchema: The best candidates, highest score first.
+
+    Raises:
+        HTTPException: If no skill is given, a 400 Bad Request error is raised.
+    """
+    if not body.required and not body.preferred:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=constants.MATCH_SKILLS_REQUIRED_MESSAGE,
+        )
+    state = _get_state()
+    with state.lock:
+        matrix = _refresh(state, db)
+    matches = matrix.match(body.required, body.preferred, body.top_k)
+    return CandidateMatchSchema(
+        matches=[
+            {
+                "candidate_id": match.candidate_id,
+                "score": match.score,
+                "matched_skills": match.matched_skills,
+            }
+            for match in matches
+        ]
+    )
@@ -1,21 +1,44 @@
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, cast
+
+from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi_pagination import Params, Page
 from sqlalchemy.orm import Session
 
+from app.db.database import read_session_scope
 from app.db_queries.candidate_queries import get_candidate_by_id
 from app.db_queries.skill_queries import (
     add_new_skill,
     get_skill_by_id,
     get_paginated_list_of_skills,
+    get_skill_name_counts,
+    get_skill_neighbors,
     skill_delete,
     skill_update,
 )
+from app.models.change_log import skill_signal
+from app.models.skill_cooccurrence import SkillNeighbor
 from app.models.skills import Skill
 from app.schemas.candidate import (
+    SkillCompletionSchema,
     SkillSchema,
     SkillReadSchemaWithCandidateId,
     SkillUpdateSchema,
 )
+from app.utils import constants
+from app.utils.skill_index import SkillIndex
+
+load_dotenv()
+
+# Skill writes of this process refresh the autocomplete index on the next
+# request; writes of other processes are picked up after this many seconds.
+SKILL_AUTOCOMPLETE_REFRESH_SECONDS = float(
+    os.getenv("SKILL_AUTOCOMPLETE_REFRESH_SECONDS", "30")
+)
 
 
 def create_skill(request_body: SkillSchema, db: Session) -> Skill:
@@ -113,17 +136,17 @@ def delete_skill(skill_id: int, db: Session) -> dict[str, str]:
         HTTPException: If no skill is found, a 404 Not Found error is raised.
     """
 
-    if not get_skill_by_id(id=skill_id, db=db):
+    if not skill_delete(id=skill_id, db=db):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found."
         )
 
-    skill_delete(id=skill_id, db=db)
-
     return {"message": "skill deleted."}
 
 
-def update_skill(request_body: SkillUpdateSchema, skill_id: int, db: Session) -> Skill:
+def update_skill(
+    request_body: SkillUpdateSchema, skill_id: int, db: Session
+) -> Dict[str, Any]:
     """
     Update an existing skill in the database.
 
@@ -133,16 +156,109 @@ def update_skill(request_body: SkillUpdateSchema, skill_id: int, db: Session) ->
         db (Session): The SQLAlchemy database session.
 
     Returns:
-        Skill: The updated skill object.
+        Dict[str, Any]: The updated skill's id, name and candidate id.
 
     Raises:
         HTTPException: If no skill is found, a 404 Not Found error is raised.
     """
-    if not get_skill_by_id(id=skill_id, db=db):
+    skill = skill_update(id=skill_id, request_body=request_body, db=db)
+
+    if not skill:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found."
         )
 
-    skill = skill_update(id=skill_id, request_body=request_body, db=db)
-
     return skill
+
+
+class _AutocompleteState:
+    """
+    The skill autocomplete index of this process and when it was built.
+    """
+
+    def __init__(self) -> None:
+        self.index: Optional[SkillIndex] = None
+        self.version = -1
+        self.built_at = 0.0
+        self.lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return (
+            self.index is None
+            or self.version != skill_signal.version
+            or time.monotonic() - self.built_at > SKILL_AUTOCOMPLETE_REFRESH_SECONDS
+        )
+
+
+@lru_cache(maxsize=1)
+def _get_autocomplete_state() -> _AutocompleteState:
+    return _AutocompleteState()
+
+
+def _get_skill_index() -> SkillIndex:
+    state = _get_autocomplete_state()
+    # One request rebuilds a stale index while the others keep answering
+    # from the previous one; only the first build is waited for.
+    if state.is_stale() and state.lock.acquire(blocking=state.index is None):
+        try:
+            if state.is_stale():
+                # Read before the query, so writes committed meanwhile make
+                # the new index stale again.
+                version = skill_signal.version
+                # After skill writes of this process, a replica may not have
+                # them yet and the index would miss them until the next
+                # periodic refresh.
+                written = state.index is not None and state.version != version
+                with read_session_scope(primary=written) as db:
+                    counts = get_skill_name_counts(db)
+                state.index = SkillIndex(
+                    counts, max_limit=constants.MAX_SKILL_COMPLETIONS
+                )
+                state.version = version
+                state.built_at = time.monotonic()
+        finally:
+            state.lock.release()
+    # The first build is waited for, so the index exists from here on.
+    return cast(SkillIndex, state.index)
+
+
+def autocomplete_skills(prefix: str, limit: int) -> List[SkillCompletionSchema]:
+    """
+    Complete a skill name from an in-memory index of the distinct names.
+
+    The index is rebuilt with one query after skills were written, so typing
+    does not query the skills table.
+
+    Args:
+        prefix (str): The typed start of the name, matched case-insensitively.
+        limit (int): The maximum number of completions.
+
+    Returns:
+        List[SkillCompletionSchema]: The names starting with the prefix, held
+                                     by the most candidates first.
+    """
+    completions = _get_skill_index().complete(prefix.strip().lower(), limit)
+    return [
+        SkillCompletionSchema(name=name, candidates=candidates)
+        for name, candidates in completions
+    ]
+
+
+def list_related_skills(name: str, limit: int, db: Session) -> List[SkillNeighbor]:
+    """
+    Retrieve the skills most often held by the candidates having a skill.
+
+    The neighbors are precomputed by the update_skill_cooccurrence task, so
+    they lag skill writes by up to its schedule.
+
+    Args:
+        name (str): The skill name, matched case-insensitively.
+        limit (int): The maximum number of related skills.
+        db (Session): The SQLAlchemy database session.
+
+    Returns:
+        List[SkillNeighbor]: The related skills with the number and share of
+                             the skill's candidates having them, best first;
+                             empty for unknown skills.
+    """
+    return get_skill_neighbors(db=db, name=name.strip().lower(), limit=limit)
@@ -1,10 +1,15 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from fastapi import status
-from app.db.database import Base, get_db
+from app.celery import state
+from app.db import database
+from app.db.database import Base, get_db, get_read_db
 from app.main import app
+from app.middleware import profiling
 
 DB_URL = "sqlite:///./test.db"
 engine = create_engine(url=DB_URL, connect_args={"check_same_thread": False})
@@ -22,6 +27,19 @@ def test_db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def task_state_dir(tmp_path, monkeypatch):
+    """
+    Keep report files and task states of a test in its own directory.
+    """
+    # Spawned task processes read the directory from the environment.
+    monkeypatch.setenv("REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(state, "TASK_STATE_DIR", os.path.join(tmp_path, "tasks"))
+    monkeypatch.setattr(
+        state, "FINGERPRINT_DIR", os.path.join(tmp_path, "tasks", "fingerprints")
+    )
+
+
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -31,6 +49,10 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+
+# Fail the test whenever a request issues more SQL statements than its route allows.
+profiling.QUERY_BUDGET_STRICT = True
 
 # Test client
 client = TestClient(app)
@@ -52,3 +74,35 @@ def authenticate():
     response = client.post("/users/login", json=payload)
     token = response.json().get("access_token")
     return token
+
+
+@pytest.fixture
+def headers(test_db, monkeypatch):
+    """
+    Authorization headers of the test user. Sessions opened outside of the
+    request dependencies use the test database too.
+    """
+    monkeypatch.setattr(database, "create_read_session", TestingSessionLocal)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    return {"Authorization": f"Bearer {authenticate()}"}
+
+
+def create_skill(headers, candidate_id, name):
+    response = client.post(
+        "/skills/", json={"name": name, "candidate_id": candidate_id}, headers=headers
+    )
+    return response.json()["id"]
+
+
+def create_candidate(headers, index, skills=()):
+    payload = {
+        "name": f"candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "phone": f"phone {index}",
+    }
+    candidate_id = client.post("/candidates", json=payload, headers=headers).json()[
+        "id"
+    ]
+    for name in skills:
+        create_skill(headers, candidate_id, name)
+    return candidate_id
@@ -0,0 +1,65 @@
+from typing import Any
+
+from fastapi import status
+
+from app.main import app
+from app.middleware.admission import (
+    HEAVY,
+    READ,
+    AdaptiveLimiter,
+    AdmissionControlMiddleware,
+)
+from app.tests.conftest import client, authenticate, test_db
+
+
+def get_admission_middleware() -> AdmissionControlMiddleware:
+    handler: Any = app.middleware_stack
+    while not isinstance(handler, AdmissionControlMiddleware):
+        handler = handler.app
+    return handler
+
+
+def test_limit_adapts_to_latency():
+    """
+    Test that the limit shrinks on slow requests and grows back on fast ones.
+    """
+    limiter = AdaptiveLimiter("test", initial=10, minimum=2, maximum=20, target_ms=100)
+
+    for _ in range(50):
+        assert limiter.try_acquire()
+        limiter.release(latency=1.0, failed=False)
+
+    assert limiter.limit == 2
+
+    for _ in range(200):
+        while limiter.try_acquire():
+            pass
+        for _ in range(limiter.in_flight):
+            limiter.release(latency=0.01, failed=False)
+
+    assert limiter.limit == 20
+
+
+def test_requests_over_limit_are_shed(test_db):
+    """
+    Test that a route class at its limit answers at once with 503 and
+    Retry-After, while other classes keep serving.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    limiters = get_admission_middleware().limiters
+    heavy = limiters[HEAVY]
+    heavy.in_flight = int(heavy.limit)
+
+    try:
+        response = client.get("/candidates/all/", headers=headers)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+
+        response = client.get("/candidates/", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert limiters[READ].in_flight == 0
+    finally:
+        heavy.in_flight = 0
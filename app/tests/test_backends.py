@@ -0,0 +1,222 @@
+import os
+import time
+from uuid import uuid4
+
+from fastapi import status
+
+from app.celery import dispatch, reports, state
+from app.celery.backends import LocalBackend
+from app.db import database
+from app.tests.conftest import (
+    TestingSessionLocal,
+    client,
+    authenticate,
+    create_candidate,
+    create_skill,
+    task_state_dir,
+    test_db,
+)
+
+
+def wait_for_state(backend, task_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        task_state = backend.status(task_id)
+        if task_state["state"] in state.READY_STATES:
+            return task_state
+        time.sleep(0.05)
+    raise AssertionError(f"task {task_id} did not finish")
+
+
+def test_local_backend_runs_tasks_in_worker_processes(task_state_dir, monkeypatch):
+    """
+    Test that the local backend runs tasks in its own processes and reports
+    their state like the Celery backend.
+    """
+    monkeypatch.setattr(LocalBackend, "functions", {"pid": os.getpid})
+    backend = LocalBackend(max_workers=1)
+
+    try:
+        task_id = backend.submit("pid")
+        assert backend.status(task_id)["state"] in (state.PENDING, state.STARTED)
+
+        task_state = wait_for_state(backend, task_id)
+    finally:
+        backend.shutdown()
+
+    assert task_state["state"] == state.SUCCESS
+    assert task_state["result"] != os.getpid()
+
+
+def test_report_status(test_db, task_state_dir, monkeypatch):
+    """
+    Test that a requested report can be looked up by its task id.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(dispatch, "publish_task", lambda *args, **kwargs: None)
+
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+    task_id = response.json()["task_id"]
+    response = client.get(url=f"/candidates/reports/{task_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["state"] == state.PENDING
+
+    response = client.get(url="/candidates/reports/unknown", headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def create_candidates(headers, count):
+    for index in range(count):
+        payload = {
+            "name": "candidate name",
+            "email": f"candidate{index}@example.com",
+            "phone": f"phone {index}",
+        }
+        client.post("/candidates", json=payload, headers=headers)
+
+
+def test_report_progress_and_cancel(test_db, task_state_dir, tmp_path, monkeypatch):
+    """
+    Test that the report task reports progress per chunk, and that a cancelled
+    report stops between chunks without leaving a file behind.
+    """
+    token = authenticate()
+    create_candidates({"Authorization": f"Bearer {token}"}, 3)
+    monkeypatch.setattr(database, "create_read_session", TestingSessionLocal)
+    monkeypatch.setattr(reports, "REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(reports, "REPORT_CHUNK_SIZE", 1)
+    progress = []
+
+    def record_progress(processed, total):
+        progress.append((processed, total))
+        state.report_progress(processed, total)
+
+    monkeypatch.setattr(reports, "report_progress", record_progress)
+
+    file_path = state.run_tracked(str(uuid4()), reports.write_candidates_csv_file)
+
+    assert progress == [(0, 3), (1, 3), (2, 3), (3, 3)]
+    with open(file_path) as file:
+        assert len(file.readlines()) == 4
+
+    task_id = str(uuid4())
+
+    def cancel_after_first_chunk(processed, total):
+        if processed == 1:
+            state.request_cancel(task_id)
+        state.report_progress(processed, total)
+
+    monkeypatch.setattr(reports, "report_progress", cancel_after_first_chunk)
+
+    assert state.run_tracked(task_id, reports.write_candidates_csv_file) is None
+    assert state.read_task_state(task_id)["state"] == state.REVOKED
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(file_path), "tasks"]
+
+
+def test_cancel_report(test_db, task_state_dir):
+    """
+    Test cancelling a pending report and refusing to cancel a finished one.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    pending, finished = str(uuid4()), str(uuid4())
+    state.write_task_state(pending, state.PENDING)
+    state.write_task_state(finished, state.SUCCESS, result="report.csv")
+
+    response = client.post(f"/candidates/reports/{pending}/cancel", headers=headers)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert state.is_cancel_requested(pending)
+
+    response = client.post(f"/candidates/reports/{finished}/cancel", headers=headers)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_identical_report_requests_are_coalesced(test_db, task_state_dir, monkeypatch):
+    """
+    Test that identical report requests share a task, that a finished report is
+    returned while the data is unchanged, and that changed data starts a new one.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    create_candidates(headers, 1)
+    published = []
+    monkeypatch.setattr(
+        dispatch, "publish_task", lambda *args, **kwargs: published.append(kwargs)
+    )
+
+    first = client.get(url="/candidates/generate-report/", headers=headers).json()
+    second = client.get(url="/candidates/generate-report/", headers=headers).json()
+
+    assert second["task_id"] == first["task_id"]
+    assert len(published) == 1
+
+    report_path = os.path.join(os.environ["REPORTS_DIR"], "report.csv")
+    open(report_path, "w").close()
+    state.write_task_state(first["task_id"], state.SUCCESS, result=report_path)
+
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["result"] == report_path
+
+    candidate_id = create_candidate(headers, 1)
+    skill_id = create_skill(headers, candidate_id, "go")
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    second = response.json()["task_id"]
+    assert second != first["task_id"]
+    assert len(published) == 2
+
+    # Renaming a skill changes neither the candidates nor the number of rows.
+    state.write_task_state(second, state.SUCCESS, result=report_path)
+    client.put(f"/skills/{skill_id}/update", json={"name": "rust"}, headers=headers)
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert len(published) == 3
+
+
+def test_cancel_marker_is_removed_when_the_task_ends(task_state_dir):
+    """
+    Test that the cancel marker of a task is removed once the task stopped.
+    """
+    task_id = str(uuid4())
+    state.write_task_state(task_id, state.PENDING)
+    state.request_cancel(task_id)
+
+    assert state.run_tracked(task_id, lambda: None) is None
+
+    assert state.read_task_state(task_id)["state"] == state.REVOKED
+    assert not state.is_cancel_requested(task_id)
+
+
+def test_sweep_task_files(task_state_dir):
+    """
+    Test that old fingerprint claims and cancel markers are removed and that
+    recent ones and task states are kept.
+    """
+    old, recent = str(uuid4()), str(uuid4())
+    for task_id in (old, recent):
+        state.write_task_state(task_id, state.PENDING)
+        state.request_cancel(task_id)
+        assert state.claim_fingerprint(task_id, task_id) is None
+    past = time.time() - 3600
+    for path in (
+        os.path.join(state.TASK_STATE_DIR, f"{old}.cancel"),
+        os.path.join(state.FINGERPRINT_DIR, old),
+    ):
+        os.utime(path, (past, past))
+
+    assert state.sweep_task_files(60) == 2
+
+    assert not state.is_cancel_requested(old)
+    assert state.is_cancel_requested(recent)
+    assert state.claim_fingerprint(old, str(uuid4())) is None
+    assert state.claim_fingerprint(recent, str(uuid4())) == recent
+    assert state.read_task_state(old)["state"] == state.PENDING
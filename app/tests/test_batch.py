@@ -0,0 +1,101 @@
+import pytest
+from fastapi import status
+
+from app.middleware.profiling import QueryBudgetExceeded
+from app.services import batch
+from app.tests.conftest import client, authenticate, test_db
+
+
+def candidate_args(index):
+    return {
+        "name": f"candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "phone": f"phone {index}",
+    }
+
+
+def test_batch_runs_workflow_in_one_transaction(test_db):
+    """
+    Test that operations can use results of earlier ones and are committed together.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    operations = [
+        {"op": "create_candidate", "args": candidate_args(0)},
+        {"op": "create_skill", "args": {"name": "python", "candidate_id": "$0.id"}},
+        {"op": "update_skill", "args": {"skill_id": "$1.id", "name": "rust"}},
+    ]
+
+    response = client.post("/batch/", json={"operations": operations}, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [201, 201, 200]
+    candidate_id = body["results"][0]["result"]["id"]
+    response = client.get(f"/candidates/{candidate_id}", headers=headers)
+    assert response.json()["skills"] == [{"name": "rust"}]
+
+
+def test_atomic_batch_rolls_back_on_failure(test_db):
+    """
+    Test that a failing operation rolls back the whole atomic batch.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    operations = [
+        {"op": "create_candidate", "args": candidate_args(0)},
+        {"op": "retrieve_candidate", "args": {"candidate_id": "unknown"}},
+        {"op": "create_candidate", "args": candidate_args(1)},
+    ]
+
+    response = client.post("/batch/", json={"operations": operations}, headers=headers)
+
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["status"] for result in body["results"]] == [201, 404, 424]
+    response = client.get("/candidates/", headers=headers)
+    assert response.json()["total"] == 0
+
+
+def test_best_effort_batch_keeps_successful_operations(test_db):
+    """
+    Test that best-effort mode only rolls back the failing operations.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    operations = [
+        {"op": "create_candidate", "args": candidate_args(0)},
+        {"op": "create_candidate", "args": candidate_args(0)},
+        {"op": "create_skill", "args": {"name": "python", "candidate_id": "$1.id"}},
+        {"op": "create_candidate", "args": candidate_args(1)},
+    ]
+
+    response = client.post(
+        "/batch/",
+        json={"mode": "best_effort", "operations": operations},
+        headers=headers,
+    )
+
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [201, 400, 422, 201]
+    response = client.get("/candidates/", headers=headers)
+    assert response.json()["total"] == 2
+
+
+def test_operations_are_held_to_their_query_budget(test_db, monkeypatch):
+    """
+    Test that an operation issuing more statements than its own budget is
+    reported, even though the batch stays within the budget of the route.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    function, success_status, _ = batch.OPERATIONS["create_candidate"]
+    monkeypatch.setitem(
+        batch.OPERATIONS, "create_candidate", (function, success_status, 1)
+    )
+    operations = [{"op": "create_candidate", "args": candidate_args(0)}]
+
+    with pytest.raises(QueryBudgetExceeded, match="/batch/ create_candidate"):
+        client.post("/batch/", json={"operations": operations}, headers=headers)
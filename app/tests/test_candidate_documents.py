@@ -0,0 +1,108 @@
+import json
+from datetime import date
+
+from fastapi import status
+
+from app.db_queries.candidate_queries import (
+    rebuild_candidate_documents,
+    refresh_open_experience_metrics,
+)
+from app.db_queries.skill_queries import skill_update
+from app.models import candidate_document
+from app.models.candidate_document import CandidateDocument
+from app.models.experience import Experience
+from app.schemas.candidate import CandidateSchema, SkillSchema, SkillUpdateSchema
+from app.services import candidate as candidate_service
+from app.services import skill as skill_service
+from app.tests.conftest import client, authenticate, test_db
+
+
+def test_documents_follow_writes_and_serve_reads(test_db, monkeypatch):
+    """
+    Test that documents are rewritten with every write of a candidate, its
+    skills and experience, and are served by the detail and batch reads.
+    """
+    monkeypatch.setattr(candidate_document, "CANDIDATE_DOCUMENTS", True)
+    monkeypatch.setattr(candidate_service, "CANDIDATE_DOCUMENTS", True)
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    candidate = candidate_service.create_candidate(
+        body=CandidateSchema(name="name", email="a@example.com", phone="1"), db=test_db
+    )
+    candidate_id = candidate.id
+    skill = skill_service.create_skill(
+        request_body=SkillSchema(name="python", candidate_id=candidate_id), db=test_db
+    )
+    skill_update(id=skill.id, request_body=SkillUpdateSchema(name="rust"), db=test_db)
+    test_db.add(
+        Experience(
+            candidate_id=candidate_id,
+            job_title="engineer",
+            company="acme",
+            start_date=date(2020, 1, 1),
+        )
+    )
+    test_db.commit()
+
+    response = client.get(f"/candidates/{candidate_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["skills"] == [{"name": "rust"}]
+    assert body["current_company"] == "acme"
+    assert body["experience"][0]["company"] == "acme"
+
+    response = client.post(
+        "/candidates/batch-get/",
+        json={"ids": [candidate_id, "unknown"]},
+        headers=headers,
+    )
+
+    assert response.json() == [
+        {"id": candidate_id, "found": True, "candidate": body},
+        {"id": "unknown", "found": False, "candidate": None},
+    ]
+
+    candidate_service.delete_candidate(candidate_id=candidate_id, db=test_db)
+    assert test_db.query(CandidateDocument).count() == 0
+
+
+def test_rebuild_candidate_documents(test_db):
+    """
+    Test that a rebuild replaces documents written while they were disabled.
+    """
+    candidate_id = candidate_service.create_candidate(
+        body=CandidateSchema(name="name", email="a@example.com", phone="1"), db=test_db
+    ).id
+    test_db.add(CandidateDocument(candidate_id=candidate_id, document=b"{}"))
+    test_db.commit()
+
+    assert rebuild_candidate_documents(test_db) == 1
+    document = test_db.get(CandidateDocument, candidate_id).document
+    assert document.startswith(f'{{"name":"name","email":"a@example.com"'.encode())
+
+
+def test_experience_recount_refreshes_documents(test_db, monkeypatch):
+    """
+    Test that the periodic recount of open positions rewrites the documents
+    of the candidates it updates.
+    """
+    monkeypatch.setattr(candidate_document, "CANDIDATE_DOCUMENTS", True)
+    candidate_id = candidate_service.create_candidate(
+        body=CandidateSchema(name="name", email="a@example.com", phone="1"), db=test_db
+    ).id
+    test_db.add(
+        Experience(
+            candidate_id=candidate_id,
+            job_title="engineer",
+            company="acme",
+            start_date=date(2020, 1, 1),
+        )
+    )
+    test_db.commit()
+
+    assert refresh_open_experience_metrics(test_db, today=date(2030, 1, 1)) == 1
+
+    document = test_db.get(CandidateDocument, candidate_id)
+    test_db.refresh(document)
+    assert json.loads(document.document)["experience_months"] == 120
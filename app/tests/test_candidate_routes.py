@@ -134,3 +134,102 @@ def test_generate_candidate_report(test_db):
     response = client.get(url="/candidates/generate-report/", headers=headers)
 
     assert response.status_code == status.HTTP_202_ACCEPTED
+
+
+def test_delete_candidate_removes_skills(test_db):
+    """
+    Test that deleting a candidate removes their skills through the database cascade.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {
+        "name": "candidate name",
+        "email": "candidate@example.com",
+        "phone": "phone number",
+    }
+    response = client.post("/candidates", json=payload, headers=headers)
+    candidate_id = response.json().get("id")
+    skill_payload = {"name": "skill name", "candidate_id": candidate_id}
+    response = client.post("/skills", json=skill_payload, headers=headers)
+    skill_id = response.json().get("id")
+
+    response = client.delete(f"/candidates/{candidate_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get(f"/skills/{skill_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_bulk_delete_candidates(test_db):
+    """
+    Test bulk deletion of candidates by ID list and by filter.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    candidate_ids = []
+    for index in range(4):
+        payload = {
+            "name": "to delete" if index < 2 else "to keep",
+            "email": f"candidate{index}@example.com",
+            "phone": f"phone {index}",
+        }
+        response = client.post("/candidates", json=payload, headers=headers)
+        candidate_ids.append(response.json().get("id"))
+
+    response = client.post(
+        "/candidates/bulk-delete/",
+        json={"ids": candidate_ids[2:] + ["invalid-id"]},
+        headers=headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("deleted") == 2
+
+    response = client.post(
+        "/candidates/bulk-delete/",
+        json={"candidate_filter": {"name": "to delete"}},
+        headers=headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("deleted") == 2
+
+    # without ids or filter values nothing may be deleted
+    response = client.post("/candidates/bulk-delete/", json={}, headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_batch_get_candidates(test_db):
+    """
+    Test fetching several candidates in request order with not-found markers.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    ids = []
+    for index in range(3):
+        payload = {
+            "name": f"candidate {index}",
+            "email": f"candidate{index}@example.com",
+            "phone": f"phone {index}",
+        }
+        response = client.post("/candidates", json=payload, headers=headers)
+        ids.append(response.json()["id"])
+    skill_payload = {"name": "skill name", "candidate_id": ids[1]}
+    client.post("/skills", json=skill_payload, headers=headers)
+    missing = "0190f5b4-0000-7000-8000-000000000000"
+    requested = [ids[2], missing, ids[1].upper(), "not-an-id", ids[0]]
+
+    response = client.post(
+        "/candidates/batch-get/", json={"ids": requested}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()
+    assert [item["id"] for item in items] == requested
+    assert [item["found"] for item in items] == [True, False, True, False, True]
+    assert items[1]["candidate"] is None
+    assert items[2]["candidate"]["name"] == "candidate 1"
+    assert items[2]["candidate"]["skills"] == [{"name": "skill name"}]
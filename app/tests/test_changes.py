@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.db_queries.change_queries import get_changes, prune_change_log
+from app.models.change_log import ChangeLog
+from app.services import change as change_services
+from app.tests.conftest import client, create_candidate, headers, test_db
+
+
+def test_changes_cover_candidates_and_skills(headers):
+    """
+    Test that creates, updates and deletes of candidates and skills are listed
+    in order and can be paged through with the returned cursor.
+    """
+    candidate_id = create_candidate(headers, 0)
+    skill_id = client.post(
+        "/skills/",
+        json={"name": "python", "candidate_id": candidate_id},
+        headers=headers,
+    ).json()["id"]
+    client.put(f"/skills/{skill_id}/update", json={"name": "rust"}, headers=headers)
+    client.delete(f"/skills/{skill_id}/delete/", headers=headers)
+    client.delete(f"/candidates/{candidate_id}", headers=headers)
+
+    changes, since = [], 0
+    while True:
+        response = client.get(
+            "/changes/", params={"since": since, "limit": 2}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        if not page["changes"]:
+            break
+        changes += page["changes"]
+        since = page["next_since"]
+
+    assert [(change["entity"], change["op"]) for change in changes] == [
+        ("candidate", "create"),
+        ("skill", "create"),
+        ("skill", "update"),
+        ("skill", "delete"),
+        ("candidate", "delete"),
+    ]
+    assert {change["candidate_id"] for change in changes} == {candidate_id}
+    response = client.get("/changes/latest", headers=headers)
+    assert response.json()["seq"] == since
+
+
+def test_long_poll_returns_when_changes_commit(headers):
+    """
+    Test that a waiting request returns as soon as a change is committed.
+    """
+    since = client.get("/changes/latest", headers=headers).json()["seq"]
+    timer = threading.Timer(0.2, create_candidate, args=(headers, 0))
+    timer.start()
+
+    try:
+        response = client.get(
+            "/changes/", params={"since": since, "wait": 10}, headers=headers
+        )
+    finally:
+        timer.join()
+
+    assert [change["op"] for change in response.json()["changes"]] == ["create"]
+
+
+def test_gaps_of_running_transactions_are_not_skipped(test_db):
+    """
+    Test that a page stops before a recent gap in the sequence, which may
+    belong to a transaction that has not committed yet.
+    """
+    now = datetime.now()
+    for seq in (1, 3):
+        test_db.add(
+            ChangeLog(seq=seq, entity="candidate", entity_id=str(seq), op="create")
+        )
+    test_db.commit()
+
+    changes = get_changes(test_db, 1, 10, settled_before=now - timedelta(seconds=10))
+    assert changes == []
+
+    changes = get_changes(test_db, 1, 10, settled_before=now + timedelta(seconds=10))
+    assert [change.seq for change in changes] == [3]
+
+
+def test_pruned_cursor_is_gone(headers, test_db):
+    """
+    Test that a cursor behind the retained changes is refused with 410.
+    """
+    for index in range(3):
+        create_candidate(headers, index)
+    cutoff = test_db.query(ChangeLog).order_by(ChangeLog.seq.desc()).first()
+    prune_change_log(test_db, cutoff.changed_at + timedelta(microseconds=1))
+    create_candidate(headers, 3)
+
+    response = client.get("/changes/", params={"since": 1}, headers=headers)
+
+    assert response.status_code == status.HTTP_410_GONE
+
+
+def test_stream_sends_changes_as_events(headers):
+    """
+    Test that the event stream sends every change with its sequence number
+    as event id.
+    """
+    candidate_id = create_candidate(headers, 0)
+    events = change_services._change_events(since=0, limit=10)
+
+    event = asyncio.run(anext(events))
+
+    assert event.startswith("id: 1\nevent: change\n")
+    assert json.loads(event.split("data: ")[1])["entity_id"] == candidate_id
+    asyncio.run(events.aclose())
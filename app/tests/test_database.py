@@ -0,0 +1,110 @@
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+
+from app.db import database
+from app.utils.authentication import create_access_token
+from app.utils.ids import uuid7
+
+
+def make_request(method: str, cookie: str = "", token: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+@contextmanager
+def request_session(request: Request, response: Optional[Response] = None):
+    # Closing the dependency runs its cleanup, which closes the session.
+    dependency = database.get_db(request, response or Response())
+    try:
+        yield next(dependency)
+    finally:
+        dependency.close()
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(database, "get_replica_engines", lambda: (engine,))
+    monkeypatch.setattr(database, "_replica_cycle", lambda: iter([engine]))
+    yield engine
+    engine.dispose()
+
+
+def test_reads_go_to_replica(replica):
+    """
+    Test that read requests use a replica and write requests use the primary.
+    """
+    with request_session(make_request("GET")) as read_session:
+        assert read_session.get_bind() is replica
+    with request_session(make_request("POST")) as write_session:
+        assert write_session.get_bind() is database.get_engine()
+
+
+def test_read_your_writes(replica):
+    """
+    Test that a client reads from the primary shortly after committing a write.
+    """
+    response = Response()
+    with request_session(make_request("POST"), response) as write_session:
+        write_session.commit()
+    cookie = response.headers["set-cookie"].split(";")[0]
+
+    assert cookie.startswith(database.LAST_WRITE_COOKIE)
+    with request_session(make_request("GET", cookie)) as read_session:
+        assert read_session.get_bind() is database.get_engine()
+
+    expired = f"{database.LAST_WRITE_COOKIE}={time.time() - 60}"
+    with request_session(make_request("GET", expired)) as read_session:
+        assert read_session.get_bind() is replica
+
+
+def test_read_your_writes_per_user(replica, monkeypatch):
+    """
+    Test that a write sends the reads of the same user to the primary even
+    without the cookie, and leaves other users on the replica.
+    """
+    monkeypatch.setattr(database, "_last_write_by_user", {})
+    writer = create_access_token({"email": "writer@example.com"})
+    other = create_access_token({"email": "other@example.com"})
+
+    with request_session(make_request("POST", token=writer)) as write_session:
+        write_session.commit()
+
+    with request_session(make_request("GET", token=writer)) as read_session:
+        assert read_session.get_bind() is database.get_engine()
+    with request_session(make_request("GET", token=other)) as read_session:
+        assert read_session.get_bind() is replica
+    with request_session(make_request("GET", token="invalid")) as read_session:
+        assert read_session.get_bind() is replica
+
+
+def test_ids_are_time_ordered():
+    """
+    Test that generated primary keys are version 7 UUIDs sorting by creation time.
+    """
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+
+    assert first.version == 7
+    assert str(first) < str(second)
+
+
+def test_read_session_scope_returns_connection(replica):
+    """
+    Test that a task session is rolled back and closed even when the work fails.
+    """
+    with pytest.raises(RuntimeError):
+        with database.read_session_scope() as db:
+            db.execute(text("SELECT 1"))
+            assert replica.pool.checkedout() == 1
+            raise RuntimeError("task failed")
+
+    assert replica.pool.checkedout() == 0
@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+
+from app.celery import dispatch
+from app.celery.tasks import app as celery_app
+from app.tests.conftest import client, authenticate, task_state_dir, test_db
+
+
+@pytest.fixture
+def dispatcher(monkeypatch):
+    monkeypatch.setattr(dispatch, "_dispatcher", dispatch._Dispatcher())
+    monkeypatch.setattr(dispatch, "TASK_BROKER_RETRY_SECONDS", 60)
+
+
+def test_tasks_are_spooled_while_broker_is_down(dispatcher, monkeypatch):
+    """
+    Test that failed publishes are spooled and later published in order.
+    """
+    published = []
+
+    def broker_down(*task):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(dispatch, "_publish", broker_down)
+    first = dispatch.publish_task("report", args=(1,))
+    second = dispatch.publish_task("report", args=(2,))
+
+    assert first != second
+    assert dispatch.spooled_tasks() == 2
+
+    monkeypatch.setattr(dispatch, "_publish", lambda *task: published.append(task))
+
+    assert dispatch.flush_spool() == 2
+    assert [task_id for _, task_id, _, _ in published] == [first, second]
+    assert dispatch.spooled_tasks() == 0
+
+
+def test_generate_report_does_not_wait_for_broker(
+    test_db, task_state_dir, dispatcher, monkeypatch
+):
+    """
+    Test that the report endpoint answers at once while the broker is down and
+    returns 503 once the spool is full.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(dispatch, "TASK_SPOOL_SIZE", 1)
+
+    def slow_broker(*task):
+        time.sleep(0.05)
+        raise TimeoutError("broker timed out")
+
+    monkeypatch.setattr(dispatch, "_publish", slow_broker)
+
+    started = time.perf_counter()
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["task_id"]
+
+    # The broker is skipped after the failure, the spool is full.
+    payload = {"name": "name", "email": "candidate@example.com", "phone": "phone"}
+    client.post("/candidates", json=payload, headers=headers)
+    response = client.get(url="/candidates/generate-report/", headers=headers)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert time.perf_counter() - started < 1
+
+
+class FakeConnection:
+    collected = False
+
+    def collect(self):
+        self.collected = True
+
+
+class FakeProducers:
+    def __init__(self):
+        self.acquired = []
+
+    @contextmanager
+    def acquire(self, block, timeout):
+        producer = SimpleNamespace(connection=FakeConnection())
+        self.acquired.append(producer)
+        yield producer
+
+
+def test_failed_publish_only_discards_its_own_connection(dispatcher, monkeypatch):
+    """
+    Test that a failed publish drops the connection it used, leaves those of
+    concurrent publishes open and only replaces the pool it published on.
+    """
+    producers = FakeProducers()
+    dispatch._dispatcher.producers = producers
+
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(celery_app, "send_task", broker_down)
+    with producers.acquire(block=True, timeout=1) as concurrent:
+        with pytest.raises(ConnectionError):
+            dispatch._publish("report", "id", (), {})
+
+    failed = producers.acquired[-1]
+    assert failed.connection.collected
+    assert not concurrent.connection.collected
+    assert dispatch._dispatcher.producers is None
+
+    replacement = FakeProducers()
+    dispatch._dispatcher.producers = replacement
+    dispatch._discard_producers(producers)
+
+    assert dispatch._dispatcher.producers is replacement
@@ -0,0 +1,65 @@
+import csv
+
+from app.celery import duplicates, tasks
+from app.models import Candidate
+from app.tests.conftest import TestingSessionLocal, test_db
+
+
+def test_duplicates_report_clusters_near_duplicates(test_db, tmp_path, monkeypatch):
+    """
+    Test that candidates differing in email formatting, phone formatting or
+    a typo in the name are reported as one cluster across shards and
+    partitions, and distinct people with a common name are not.
+    """
+    monkeypatch.setattr(duplicates, "read_session_scope", TestingSessionLocal)
+    monkeypatch.setattr(duplicates, "REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(duplicates, "DUPLICATES_SHARD_SIZE", 2)
+    monkeypatch.setattr(duplicates, "DUPLICATES_PARTITIONS", 3)
+    people = [
+        ("Jonathan Smith", "jon.smith@gmail.com", "+1 (555) 010-2030"),
+        ("Jonathon Smith", "JonSmith+jobs@gmail.com", "555-010-2031"),
+        ("Smith, Jonathan", "j.smith@example.com", "15550102030"),
+        ("Maria Garcia", "maria@example.com", "555 777 1000"),
+        ("Maria Garcia", "mgarcia@other.org", "555 888 2000"),
+    ]
+    for name, email, phone in people:
+        test_db.add(Candidate(name=name, email=email, phone=phone))
+    test_db.commit()
+
+    report_path = duplicates.find_duplicate_candidates()
+
+    with open(report_path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert {row["cluster"] for row in rows} == {"1"}
+    assert {row["email"] for row in rows} | {
+        row["duplicate_email"] for row in rows
+    } == {"jon.smith@gmail.com", "JonSmith+jobs@gmail.com", "j.smith@example.com"}
+    assert not list(tmp_path.glob("duplicates__*/"))
+
+
+def test_normalized_keys():
+    """
+    Test that formatting differences do not change the normalized keys.
+    """
+    assert duplicates.normalize_name("Zoë  O'Brien") == "brien o zoe"
+    assert duplicates.normalize_name("o'brien, ZOE") == "brien o zoe"
+    assert duplicates.normalize_email(" J.Doe+cv@GoogleMail.com") == "jdoe@gmail.com"
+    assert duplicates.normalize_phone("+44 (0)20 7946 0018") == "079460018"
+
+
+def test_failed_runs_are_discarded(tmp_path, monkeypatch):
+    """
+    Test that every task of the Celery workflow removes the run directory
+    when it fails.
+    """
+    monkeypatch.setattr(duplicates, "REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(duplicates, "get_shards", lambda: [("0", None)])
+    monkeypatch.setattr(tasks.find_duplicate_candidates, "replace", lambda sig: sig)
+
+    workflow = tasks.find_duplicate_candidates()
+
+    (run_dir,) = tmp_path.glob("duplicates__*/")
+    (errback,) = workflow.options["link_error"]
+    assert errback.task == tasks.discard_duplicates_run.name
+    errback.apply()
+    assert not run_dir.exists()
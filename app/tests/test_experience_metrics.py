@@ -0,0 +1,134 @@
+from datetime import date
+
+from fastapi import status
+
+from app.db_queries.candidate_queries import refresh_open_experience_metrics
+from app.models.candidate import Candidate
+from app.models.change_log import ChangeLog
+from app.models.experience import Experience, summarize_experience
+from app.tests.conftest import client, authenticate, test_db
+
+
+def create_candidate(headers, index):
+    payload = {
+        "name": f"candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "phone": f"phone {index}",
+    }
+    return client.post("/candidates", json=payload, headers=headers).json()["id"]
+
+
+def test_overlapping_positions_are_merged():
+    """
+    Test that parallel and adjacent positions are counted once, and that the
+    current company comes from the latest open position.
+    """
+    rows = [
+        Experience(
+            job_title="engineer",
+            company="a",
+            start_date=date(2020, 1, 1),
+            end_date=date(2020, 12, 31),
+        ),
+        Experience(
+            job_title="consultant",
+            company="b",
+            start_date=date(2020, 6, 1),
+            end_date=date(2021, 5, 31),
+        ),
+        Experience(
+            job_title="lead", company="c", start_date=date(2021, 6, 1), end_date=None
+        ),
+    ]
+
+    metrics = summarize_experience(rows, today=date(2022, 5, 31))
+
+    assert metrics == {
+        "experience_months": 29,
+        "current_company": "c",
+        "latest_job_title": "lead",
+    }
+
+
+def test_experience_writes_update_candidate_columns(test_db):
+    """
+    Test that adding, changing and removing experience keeps the derived
+    columns current, and that they can be filtered on.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    senior, junior = create_candidate(headers, 0), create_candidate(headers, 1)
+    test_db.add_all(
+        [
+            Experience(
+                candidate_id=senior,
+                job_title="engineer",
+                company="acme",
+                start_date=date(2015, 1, 1),
+            ),
+            Experience(
+                candidate_id=junior,
+                job_title="intern",
+                company="acme",
+                start_date=date(2023, 1, 1),
+                end_date=date(2023, 6, 30),
+            ),
+        ]
+    )
+    test_db.commit()
+
+    response = client.request(
+        "GET",
+        "/candidates/all/",
+        json={
+            "params": {},
+            "candidate_filter": {
+                "experience_months__gte": 60,
+                "current_company": "acme",
+            },
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [senior]
+
+    internship = test_db.query(Experience).filter_by(candidate_id=junior).one()
+    internship.end_date = None
+    test_db.commit()
+    candidate = test_db.get(Candidate, junior)
+    assert candidate.current_company == "acme"
+    assert candidate.latest_job_title == "intern"
+
+    test_db.delete(internship)
+    test_db.commit()
+    test_db.refresh(candidate)
+    assert candidate.experience_months == 0
+    assert candidate.current_company is None
+
+
+def test_open_positions_are_recounted(test_db):
+    """
+    Test that the periodic refresh grows the months of open positions.
+    """
+    token = authenticate()
+    candidate_id = create_candidate({"Authorization": f"Bearer {token}"}, 0)
+    test_db.add(
+        Experience(
+            candidate_id=candidate_id,
+            job_title="engineer",
+            company="acme",
+            start_date=date.today().replace(day=1),
+        )
+    )
+    test_db.commit()
+
+    next_year = date.today().replace(day=1, year=date.today().year + 1)
+    assert refresh_open_experience_metrics(test_db, today=next_year) == 1
+    assert test_db.get(Candidate, candidate_id).experience_months == 12
+    change = test_db.query(ChangeLog).order_by(ChangeLog.seq.desc()).first()
+    assert (change.entity, change.op, change.candidate_id) == (
+        "candidate",
+        "update",
+        candidate_id,
+    )
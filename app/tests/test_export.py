@@ -0,0 +1,106 @@
+import csv
+import json
+import logging
+
+from fastapi import status
+
+from app.middleware import profiling
+from app.services import export
+from app.tests.conftest import TestingSessionLocal, client, authenticate, test_db
+
+
+def create_candidates(headers, count):
+    for index in range(count):
+        payload = {
+            "name": "exported" if index % 2 else "skipped",
+            "email": f"candidate{index}@example.com",
+            "phone": f"phone {index}",
+        }
+        client.post("/candidates", json=payload, headers=headers)
+
+
+def test_export_streams_filtered_candidates(test_db, monkeypatch):
+    """
+    Test that the export streams every matching candidate across chunks, as
+    NDJSON and as CSV.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    create_candidates(headers, 7)
+    monkeypatch.setattr(export, "read_session_scope", TestingSessionLocal)
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+
+    with client.stream(
+        "GET", "/candidates/export/", params={"name": "exported"}, headers=headers
+    ) as response:
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.iter_lines()]
+
+    assert len(rows) == 3
+    assert {row["name"] for row in rows} == {"exported"}
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+    response = client.get(
+        "/candidates/export/", params={"format": "csv"}, headers=headers
+    )
+
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert len(rows) == 7
+    assert rows[0]["experience_months"] == "0"
+
+
+def test_export_concurrency_is_limited(test_db, monkeypatch):
+    """
+    Test that exports beyond the concurrency limit are refused at once.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    slots = []
+    while export._export_slots.acquire(blocking=False):
+        slots.append(None)
+
+    try:
+        response = client.get("/candidates/export/", headers=headers)
+    finally:
+        for _ in slots:
+            export._export_slots.release()
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_export_chunks_are_held_to_their_query_budget(test_db, monkeypatch, caplog):
+    """
+    Test that the streamed chunks are checked against their query budget and
+    that the export slot is released once the stream has ended.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    create_candidates(headers, 1)
+    monkeypatch.setattr(export, "read_session_scope", TestingSessionLocal)
+    monkeypatch.setattr(export, "EXPORT_CHUNK_QUERIES", 2)
+    monkeypatch.setattr(profiling, "QUERY_BUDGET_STRICT", False)
+
+    with caplog.at_level(logging.WARNING, logger=profiling.__name__):
+        response = client.get("/candidates/export/", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    reports = [
+        json.loads(record.message)
+        for record in caplog.records
+        if record.name == profiling.logger.name
+    ]
+    assert [
+        report["route"]
+        for report in reports
+        if report.get("event") == "query_budget_exceeded"
+    ] == ["/candidates/export/ chunk"]
+
+    slots = [
+        export._export_slots.acquire(blocking=False)
+        for _ in range(export.EXPORT_MAX_CONCURRENCY)
+    ]
+    for _ in filter(None, slots):
+        export._export_slots.release()
+    assert all(slots)
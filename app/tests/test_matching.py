@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import delete, func, select, update
+
+from app.models.change_log import ChangeLog
+from app.models.skills import Skill
+from app.services import matching
+from app.tests.conftest import client, create_candidate, headers, test_db
+from app.utils.skill_matrix import SkillMatrix
+
+
+@pytest.fixture(autouse=True)
+def clear_matching_state():
+    matching._get_state.cache_clear()
+    yield
+    matching._get_state.cache_clear()
+
+
+def match(headers, **body):
+    response = client.post("/candidates/match/", json=body, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()["matches"]
+
+
+def test_match_ranks_by_weighted_skills(headers):
+    """
+    Test that only candidates with every required skill are returned, ranked
+    by the share of the skill weight they cover.
+    """
+    full = create_candidate(headers, 0, ["Python", "SQL", "Docker"])
+    partial = create_candidate(headers, 1, ["python", "sql"])
+    create_candidate(headers, 2, ["SQL", "Docker"])
+
+    matches = match(
+        headers, required={"python": 2}, preferred={"sql": 1, "docker": 1}, top_k=5
+    )
+
+    assert [item["candidate_id"] for item in matches] == [full, partial]
+    assert matches[0]["score"] == pytest.approx(1)
+    assert matches[1]["score"] == pytest.approx(0.75)
+    assert matches[1]["matched_skills"] == ["python", "sql"]
+
+
+def test_match_follows_skill_writes(headers):
+    """
+    Test that skills written and candidates deleted after the matrix was
+    built are reflected by the next match.
+    """
+    first = create_candidate(headers, 0, ["rust"])
+    assert [item["candidate_id"] for item in match(headers, required={"rust": 1})] == [
+        first
+    ]
+
+    second = create_candidate(headers, 1, ["rust"])
+    client.delete(f"/candidates/{first}", headers=headers)
+
+    assert [item["candidate_id"] for item in match(headers, required={"rust": 1})] == [
+        second
+    ]
+
+
+def test_changes_committed_late_are_applied_after_a_load(headers, test_db):
+    """
+    Test that a change numbered below the latest one and committed after the
+    matrix was loaded is still applied.
+    """
+    first = create_candidate(headers, 0, ["rust"])
+    test_db.execute(
+        update(ChangeLog).values(changed_at=datetime.now() - timedelta(hours=1))
+    )
+    settled = test_db.scalar(select(func.max(ChangeLog.seq)))
+    test_db.commit()
+    second = create_candidate(headers, 1)
+    create_candidate(headers, 2)
+    # The change of a transaction that is still running when the matrix loads.
+    pending = settled + 1
+    test_db.execute(delete(ChangeLog).where(ChangeLog.seq == pending))
+    test_db.commit()
+
+    assert [item["candidate_id"] for item in match(headers, required={"rust": 1})] == [
+        first
+    ]
+    assert matching._get_state().synced_seq == settled
+
+    test_db.add(Skill(name="rust", candidate_id=second))
+    test_db.commit()
+    latest = test_db.scalar(select(func.max(ChangeLog.seq)))
+    test_db.execute(
+        update(ChangeLog).where(ChangeLog.seq == latest).values(seq=pending)
+    )
+    test_db.commit()
+
+    matches = match(headers, required={"rust": 1})
+    assert {item["candidate_id"] for item in matches} == {first, second}
+
+
+def test_match_requires_a_skill(headers):
+    """
+    Test that a match request without skills is rejected.
+    """
+    response = client.post("/candidates/match/", json={}, headers=headers)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_blocks_and_overlay_score_alike():
+    """
+    Test that candidates scored from several parallel blocks and from the
+    overlay of changed candidates, before and after compaction, rank alike.
+    """
+    matrix = SkillMatrix(block_rows=2, workers=2, compact_after=2)
+    matrix.load([(str(index), "go") for index in range(5)] + [("4", "k8s")])
+    matrix.update({"0": ["go", "k8s"], "1": None})
+    before = matrix.match({"go": 1}, {"k8s": 1}, top_k=10)
+    matrix.update({"2": ["java"]})
+    after = matrix.match({"go": 1}, {"k8s": 1}, top_k=10)
+    matrix.shutdown()
+
+    assert {m.candidate_id for m in before[:2]} == {"0", "4"}
+    assert {m.candidate_id for m in before} == {"0", "3", "4", "2"}
+    assert {m.candidate_id for m in after} == {"0", "3", "4"}
+    assert [m.score for m in after] == [1, 1, 0.5]
@@ -0,0 +1,19 @@
+from fastapi import status
+
+from app.tests.conftest import client, authenticate, test_db
+
+
+def test_metrics_endpoint(test_db):
+    """
+    Test that route latency, in-flight requests and pool stats are exposed.
+    """
+    token = authenticate()
+    client.get("/candidates", headers={"Authorization": f"Bearer {token}"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'route="/candidates/"' in response.text
+    assert "http_requests_in_flight" in response.text
+    assert 'db_pool_checked_out{engine="primary"}' in response.text
+    assert "cache_requests_total" in response.text
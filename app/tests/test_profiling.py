@@ -0,0 +1,86 @@
+import json
+import logging
+
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.middleware import profiling
+from app.tests.conftest import client, authenticate, test_db
+
+
+def test_server_timing_header(test_db):
+    """
+    Test that responses report SQL, auth and serialization timings.
+    """
+    token = authenticate()
+
+    response = client.get("/candidates", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    server_timing = response.headers["Server-Timing"]
+    for metric in ("db;", "auth;", "app;", "serialize;", "total;"):
+        assert metric in server_timing
+    assert "queries" in server_timing
+
+
+def test_slow_request_logs_statements(test_db, monkeypatch, caplog):
+    """
+    Test that requests above the slow threshold are logged with their SQL.
+    """
+    token = authenticate()
+    monkeypatch.setattr(profiling, "SLOW_REQUEST_THRESHOLD_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger=profiling.__name__):
+        client.get("/candidates", headers={"Authorization": f"Bearer {token}"})
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "/candidates/"
+    assert record["query_count"] == len(record["statements"])
+    assert any("FROM users" in item["sql"] for item in record["statements"])
+
+
+def test_candidate_list_stays_within_query_budget(test_db):
+    """
+    Test that listing candidates does not issue a query per candidate.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    for index in range(5):
+        payload = {
+            "name": "candidate name",
+            "email": f"candidate{index}@example.com",
+            "phone": f"phone {index}",
+        }
+        response = client.post("/candidates", json=payload, headers=headers)
+        skill_payload = {"name": "skill name", "candidate_id": response.json()["id"]}
+        client.post("/skills", json=skill_payload, headers=headers)
+
+    response = client.get("/candidates", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'desc="4 queries"' in response.headers["Server-Timing"]
+
+
+def test_query_budget_exceeded(test_db, monkeypatch, caplog):
+    """
+    Test that exceeding a query budget raises in strict mode and logs otherwise.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    route = next(
+        route
+        for route in app.routes
+        if route.path == "/candidates/" and "GET" in route.methods
+    )
+    monkeypatch.setattr(route, "query_budget", 1)
+
+    with pytest.raises(profiling.QueryBudgetExceeded):
+        client.get("/candidates", headers=headers)
+
+    monkeypatch.setattr(profiling, "QUERY_BUDGET_STRICT", False)
+    with caplog.at_level(logging.WARNING, logger=profiling.__name__):
+        response = client.get("/candidates", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "query_budget_exceeded" in caplog.text
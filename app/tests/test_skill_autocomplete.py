@@ -0,0 +1,93 @@
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import database
+from app.db.database import Base
+from app.services import skill as skill_service
+from app.tests.conftest import (
+    client,
+    create_candidate,
+    create_skill,
+    headers,
+    test_db,
+)
+from app.utils.skill_index import SkillIndex
+
+
+@pytest.fixture(autouse=True)
+def clear_autocomplete_state():
+    skill_service._get_autocomplete_state.cache_clear()
+    yield
+    skill_service._get_autocomplete_state.cache_clear()
+
+
+def complete(headers, prefix, limit=10):
+    response = client.get(
+        "/skills/autocomplete",
+        params={"prefix": prefix, "limit": limit},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return [(item["name"], item["candidates"]) for item in response.json()]
+
+
+def test_autocomplete_ranks_by_candidates(headers):
+    """
+    Test that completions are the distinct normalized names with the prefix,
+    held by the most candidates first.
+    """
+    create_candidate(headers, 0, ["Python", "PyTorch"])
+    create_candidate(headers, 1, ["python ", "Pandas"])
+    create_candidate(headers, 2, ["pytest", "Python"])
+
+    assert complete(headers, "Py") == [("python", 3), ("pytest", 1), ("pytorch", 1)]
+    assert complete(headers, "p", limit=2) == [("python", 3), ("pandas", 1)]
+    assert complete(headers, "rust") == []
+
+
+def test_autocomplete_follows_skill_writes(headers):
+    """
+    Test that created, renamed and deleted skills are reflected by the next
+    completion.
+    """
+    candidate_id = create_candidate(headers, 0)
+    skill_id = create_skill(headers, candidate_id, "go")
+    other_id = create_skill(headers, candidate_id, "golang")
+    assert complete(headers, "go") == [("go", 1), ("golang", 1)]
+
+    client.put(f"/skills/{skill_id}/update", json={"name": "gin"}, headers=headers)
+    client.delete(f"/skills/{other_id}/delete/", headers=headers)
+    create_candidate(headers, 1, ["gin"])
+
+    assert complete(headers, "g") == [("gin", 2)]
+
+
+def test_rebuild_after_writes_reads_the_primary(headers, tmp_path, monkeypatch):
+    """
+    Test that the index rebuilt after a skill write of this process is read
+    from the primary, not from a replica that may lag behind.
+    """
+    create_candidate(headers, 0, ["go"])
+    assert complete(headers, "go") == [("go", 1)]
+    lagging = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=lagging)
+    monkeypatch.setattr(database, "create_read_session", lambda: Session(lagging))
+
+    create_candidate(headers, 1, ["golang"])
+
+    assert complete(headers, "go") == [("go", 1), ("golang", 1)]
+    lagging.dispose()
+
+
+def test_prefix_range_excludes_neighbours():
+    """
+    Test that a prefix matches exactly the names starting with it.
+    """
+    index = SkillIndex(
+        [("java", 5), ("javascript", 9), ("jav", 1), ("jb", 2)], max_limit=10
+    )
+
+    assert index.complete("java", 10) == [("javascript", 9), ("java", 5)]
+    assert index.complete("jz", 10) == []
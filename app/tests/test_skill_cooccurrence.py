@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import delete, func, select, update
+
+from app.celery import cooccurrence
+from app.models.change_log import ChangeLog
+from app.models.skill_cooccurrence import (
+    SkillCooccurrenceState,
+    SkillNeighbor,
+    SkillPair,
+)
+from app.models.skills import Skill
+from app.tests.conftest import client, create_candidate, headers, test_db
+
+
+def related(headers, name):
+    response = client.get("/skills/related", params={"name": name}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return [(item["neighbor"], item["candidates"]) for item in response.json()]
+
+
+def stored(test_db):
+    test_db.expire_all()
+    pairs = {(row.skill, row.other, row.candidates) for row in test_db.query(SkillPair)}
+    neighbors = {
+        (row.skill, row.rank, row.neighbor, row.candidates)
+        for row in test_db.query(SkillNeighbor)
+    }
+    return pairs, neighbors
+
+
+def test_related_skills_rank_by_co_occurrence(headers, test_db, monkeypatch):
+    """
+    Test that the full computation, split into several chunks, counts the
+    candidates sharing skills and ranks the related skills by them.
+    """
+    monkeypatch.setattr(cooccurrence, "COOCCURRENCE_CHUNK_SIZE", 2)
+    create_candidate(headers, 0, ["Django", "Postgres", "Redis"])
+    create_candidate(headers, 1, ["django", "postgres"])
+    create_candidate(headers, 2, ["Django", "Docker"])
+    create_candidate(headers, 3, ["Postgres"])
+
+    cooccurrence.update_cooccurrence(test_db)
+    test_db.commit()
+
+    assert related(headers, "DJANGO") == [("postgres", 2), ("docker", 1), ("redis", 1)]
+    response = client.get("/skills/related", params={"name": "django"}, headers=headers)
+    assert response.json()[0]["share"] == pytest.approx(2 / 3)
+    assert related(headers, "cobol") == []
+
+
+def test_updates_match_a_full_computation(headers, test_db):
+    """
+    Test that applying skill writes and candidate deletes incrementally
+    gives the same counts and neighbors as computing them from scratch.
+    """
+    first = create_candidate(headers, 0, ["go", "rust"])
+    create_candidate(headers, 1, ["go", "k8s"])
+    cooccurrence.update_cooccurrence(test_db)
+    test_db.commit()
+
+    skill_id = client.post(
+        "/skills/", json={"name": "k8s", "candidate_id": first}, headers=headers
+    ).json()["id"]
+    client.put(f"/skills/{skill_id}/update", json={"name": "Docker"}, headers=headers)
+    create_candidate(headers, 2, ["rust", "docker"])
+    client.delete(f"/candidates/{first}", headers=headers)
+    cooccurrence.update_cooccurrence(test_db)
+    test_db.commit()
+    incremental = stored(test_db)
+
+    cooccurrence.rebuild_cooccurrence(test_db)
+    test_db.commit()
+
+    assert incremental == stored(test_db)
+    assert related(headers, "rust") == [("docker", 1)]
+
+
+def test_chunks_without_named_skills_are_skipped(headers, test_db, monkeypatch):
+    """
+    Test that a full chunk whose candidates only have blank skill names does
+    not break the computation.
+    """
+    monkeypatch.setattr(cooccurrence, "COOCCURRENCE_CHUNK_SIZE", 1)
+    blank = create_candidate(headers, 0)
+    test_db.add(Skill(name="  ", candidate_id=blank))
+    test_db.commit()
+    create_candidate(headers, 1, ["go", "rust"])
+
+    assert cooccurrence.rebuild_cooccurrence(test_db) == 2
+    test_db.commit()
+
+    assert related(headers, "go") == [("rust", 1)]
+
+
+def test_changes_committed_late_are_applied_after_a_rebuild(headers, test_db):
+    """
+    Test that a change numbered below the latest one and committed after a
+    full computation is still applied by the next update.
+    """
+    first = create_candidate(headers, 0, ["go", "rust"])
+    test_db.execute(
+        update(ChangeLog).values(changed_at=datetime.now() - timedelta(hours=1))
+    )
+    settled = test_db.scalar(select(func.max(ChangeLog.seq)))
+    test_db.commit()
+    second = create_candidate(headers, 1, ["go"])
+    # The change of a transaction that is still running during the rebuild.
+    pending = settled + 1
+    test_db.execute(delete(ChangeLog).where(ChangeLog.seq == pending))
+    test_db.commit()
+
+    cooccurrence.rebuild_cooccurrence(test_db)
+    test_db.commit()
+    assert test_db.get(SkillCooccurrenceState, cooccurrence.STATE_ID).synced_seq == (
+        settled
+    )
+
+    test_db.add(Skill(name="rust", candidate_id=second))
+    test_db.commit()
+    latest = test_db.scalar(select(func.max(ChangeLog.seq)))
+    test_db.execute(
+        update(ChangeLog).where(ChangeLog.seq == latest).values(seq=pending)
+    )
+    test_db.commit()
+
+    cooccurrence.update_cooccurrence(test_db)
+    test_db.commit()
+
+    assert related(headers, "go") == [("rust", 2)]
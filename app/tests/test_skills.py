@@ -81,3 +81,45 @@ def test_delete_skill(test_db):
     response = client.delete(f"/skills/{skill_id}/delete", headers=headers)
 
     assert response.status_code == status.HTTP_200_OK
+
+
+def test_update_skill(test_db):
+    """
+    Test updating a skill and handling of unknown skill IDs.
+    """
+    token = authenticate()
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {
+        "name": "candidate name",
+        "email": "candidate@example.com",
+        "phone": "phone number",
+    }
+    # create candidate
+    response = client.post("/candidates", json=payload, headers=headers)
+    candidate_id = response.json().get("id")
+
+    skill_payload = {"name": "skill name", "candidate_id": candidate_id}
+
+    # create skill
+    response = client.post("/skills", json=skill_payload, headers=headers)
+    skill_id = response.json().get("id")
+
+    response = client.put(
+        f"/skills/{skill_id}/update", json={"name": "new name"}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "id": skill_id,
+        "name": "new name",
+        "candidate_id": candidate_id,
+    }
+
+    # test with unknown id
+    response = client.put("/skills/0/update", json={"name": "x"}, headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.delete("/skills/0/delete", headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
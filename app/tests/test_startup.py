@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Subsystems that must only be loaded when first used. The SQLite dialect is
+# not among them: the change log table's `sqlite_autoincrement` option loads
+# it with the models.
+LAZY_MODULES = (
+    "sqlalchemy.dialects.postgresql",
+    "psycopg2",
+    "app.celery.tasks",
+    "celery",
+    "kombu",
+    "redis",
+    "numpy",
+    "scipy",
+)
+# Cumulative import time allowed for `import app.main`, in milliseconds. It
+# depends on the machine, so the check only runs when a budget is set.
+IMPORT_TIME_BUDGET_MS = os.getenv("IMPORT_TIME_BUDGET_MS")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def run_import(*options: str) -> subprocess.CompletedProcess:
+    """
+    Import the application in a fresh interpreter that prints the names of
+    the loaded modules.
+    """
+    return subprocess.run(
+        [
+            sys.executable,
+            *options,
+            "-c",
+            "import json, sys; import app.main; print(json.dumps(list(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PROJECT_ROOT,
+    )
+
+
+def test_heavy_modules_are_loaded_lazily():
+    """
+    Test that importing the application does not load the Celery app, the
+    broker client, the PostgreSQL dialect and driver, NumPy or SciPy.
+    """
+    modules = json.loads(run_import().stdout)
+
+    assert not [
+        module
+        for module in modules
+        if any(module == lazy or module.startswith(f"{lazy}.") for lazy in LAZY_MODULES)
+    ]
+
+
+@pytest.mark.skipif(
+    IMPORT_TIME_BUDGET_MS is None, reason="IMPORT_TIME_BUDGET_MS is not set"
+)
+def test_import_time_budget():
+    """
+    Test that importing the application stays within its startup budget.
+    """
+    times = {}
+    for line in run_import("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+
+    assert times["app.main"] / 1000 <= float(IMPORT_TIME_BUDGET_MS)
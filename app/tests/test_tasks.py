@@ -1,6 +1,9 @@
 import pytest
 
+from app.celery import reports
 from app.celery.tasks import generate_candidates_csv_file
+from app.db import database
+from app.tests.conftest import TestingSessionLocal, task_state_dir, test_db
 
 
 @pytest.fixture(scope="module")
@@ -11,10 +14,14 @@ def celery_app():
     return test_celery_app
 
 
-def test_generate_candidates_csv_file(celery_app):
+def test_generate_candidates_csv_file(
+    celery_app, test_db, task_state_dir, tmp_path, monkeypatch
+):
     """
     Test generation of a CSV file for candidates.
     """
+    monkeypatch.setattr(database, "create_read_session", TestingSessionLocal)
+    monkeypatch.setattr(reports, "REPORTS_DIR", str(tmp_path))
     file_path = generate_candidates_csv_file()
 
     assert "candidates__" in file_path
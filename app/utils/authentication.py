@@ -11,8 +11,9 @@ from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import get_db, read_session_scope
 from app.db_queries.user_queries import get_user_by_email
+from app.middleware.profiling import profile_section
 from app.models.user import User
 from app.schemas.user import TokenData, Token
 from app.utils import constants
@@ -173,20 +174,41 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("email")
-        if not email:
+    with profile_section("auth"):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("email")
+            if not email:
+                raise credentials_exception
+            token_data = TokenData(email=email)
+        except InvalidTokenError:
+            raise credentials_exception
+        user = get_user_by_email(value=token_data.email, db=db)
+        if not user:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except InvalidTokenError:
-        raise credentials_exception
-    user = get_user_by_email(value=token_data.email, db=db)
-    if not user:
-        raise credentials_exception
     return user
 
 
+def get_current_user_detached(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
+    """
+    Retrieve the current user with a session that is closed before the route
+    runs, for routes that keep the response open such as long polls and
+    event streams. A session of `get_db` would only be closed once the
+    response has been sent.
+
+    Args:
+        token (str): The JWT token used for authentication, provided by the OAuth2 scheme.
+
+    Raises:
+        HTTPException: Raises an HTTP 401 Unauthorized error if the token is invalid or the user cannot be found.
+
+    Returns:
+        User: The authenticated User object, detached from its session.
+    """
+    with read_session_scope() as db:
+        return get_current_user(token=token, db=db)
+
+
 def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db),
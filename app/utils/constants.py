@@ -9,3 +9,36 @@ EMAIL_ALREADY_INUSE_MESSAGE = (
 PHONE_NUMBER_ALREAY_INUSE_MESSAGE = (
     "The provided phone number is already in use. Please use a different phone number."
 )
+BULK_DELETE_CRITERIA_REQUIRED_MESSAGE = (
+    "Provide candidate ids or at least one filter to delete candidates."
+)
+# Upper bound of candidates removed by one bulk delete request.
+MAX_BULK_DELETE = 10_000
+# Upper bound of candidates fetched by one batch get request.
+MAX_BATCH_GET = 500
+# Upper bound of required and of preferred skills in one match request.
+MAX_MATCH_SKILLS = 100
+# Upper bound of candidates returned by one match request.
+MAX_MATCH_TOP_K = 1000
+MATCH_SKILLS_REQUIRED_MESSAGE = "Provide at least one required or preferred skill."
+# Upper bound of completions returned by one skill autocomplete request.
+MAX_SKILL_COMPLETIONS = 50
+# Upper bound of related skills returned by one request.
+MAX_RELATED_SKILLS = 20
+# Upper bound of operations in one batch request.
+MAX_BATCH_OPERATIONS = 100
+BATCH_OPERATION_SKIPPED_MESSAGE = "Not executed because an earlier operation failed."
+BATCH_UNRESOLVED_REFERENCE_MESSAGE = (
+    "Reference {reference} does not name a field of an earlier successful operation."
+)
+REPORT_DISPATCH_UNAVAILABLE_MESSAGE = (
+    "Report generation is temporarily unavailable. Please try again later."
+)
+REPORT_ALREADY_FINISHED_MESSAGE = "The report task has already finished."
+SERVER_OVERLOADED_MESSAGE = "The server is overloaded. Please retry later."
+MAX_CHANGES_PER_PAGE = 1000
+MAX_CHANGES_WAIT_SECONDS = 30
+CHANGE_FEED_EXPIRED_MESSAGE = (
+    "Changes after this sequence number are no longer retained. "
+    "Resynchronize and continue from GET /changes/latest."
+)
@@ -0,0 +1,41 @@
+import os
+import time
+from uuid import UUID
+
+
+def uuid7() -> UUID:
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562).
+
+    The first 48 bits hold the Unix time in milliseconds and the rest is
+    random, so ids created later sort after earlier ones. New rows are then
+    appended to the end of the primary key index instead of landing on random
+    pages.
+
+    Returns:
+        UUID: The generated UUID.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    # Version 7 in bits 76-79 and the RFC 4122 variant in bits 62-63.
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return UUID(int=value)
+
+
+def is_valid_uuid(value: str) -> bool:
+    """
+    Check whether a string is a well formed UUID.
+
+    Args:
+        value (str): The string to check, e.g. an id taken from the URL.
+
+    Returns:
+        bool: True if the value can be stored in a UUID column.
+    """
+    try:
+        UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return False
+    return True
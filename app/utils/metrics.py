@@ -0,0 +1,234 @@
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+logger = logging.getLogger(__name__)
+
+# Prometheus content type, re-exported for the /metrics route.
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+REPORT_QUEUE = "celery"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+CELERY_TASKS_PUBLISHED = Counter(
+    "celery_tasks_published_total",
+    "Celery tasks published to the broker.",
+    ["task"],
+)
+CELERY_TASKS = Counter(
+    "celery_tasks_total",
+    "Celery tasks finished, by final state.",
+    ["task", "state"],
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time.",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+CELERY_DISPATCH_SPOOLED = Gauge(
+    "celery_dispatch_spooled_tasks",
+    "Tasks held in the local spool while the broker is unavailable.",
+    multiprocess_mode="livesum",
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive concurrency limit per route class.",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests shed with 503 because their route class was at its limit.",
+    ["route_class"],
+)
+
+_engine_providers: List[Callable[[], Dict[str, Engine]]] = []
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """
+    Count one lookup against a named cache.
+
+    Args:
+        cache (str): The cache name used as the metric label.
+        hit (bool): Whether the lookup was served from the cache.
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is CACHE_HIT:
+        record_cache_access("sqlalchemy_compiled", True)
+    elif cache_hit is CACHE_MISS:
+        record_cache_access("sqlalchemy_compiled", False)
+
+
+def instrument_engines(provider: Callable[[], Dict[str, Engine]]) -> None:
+    """
+    Export connection pool statistics of the engines returned by `provider`.
+
+    The provider is called when metrics are scraped, so engines can be created
+    lazily and serving requests pays nothing for the statistics.
+
+    Args:
+        provider (Callable[[], Dict[str, Engine]]): Returns engines keyed by the
+                                                    value of the `engine` label.
+    """
+    _engine_providers.append(provider)
+
+
+class DatabasePoolCollector(Collector):
+    """
+    Collects checkout counts, wait time and occupancy of instrumented pools.
+    """
+
+    def describe(self) -> Iterator:
+        # Registering a collector without describe() makes prometheus_client
+        # call collect(), which would create the engines at import time.
+        return iter(self._families())
+
+    def _families(self) -> tuple:
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently in use.", labels=["engine"]
+        )
+        size = GaugeMetricFamily(
+            "db_pool_size", "Configured pool size.", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow",
+            "Connections open beyond the pool size.",
+            labels=["engine"],
+        )
+        checkouts = CounterMetricFamily(
+            "db_pool_checkouts",
+            "Connections checked out of the pool.",
+            labels=["engine"],
+        )
+        wait = CounterMetricFamily(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting to check out a connection.",
+            labels=["engine"],
+        )
+        timeouts = CounterMetricFamily(
+            "db_pool_checkout_timeouts",
+            "Checkouts that gave up waiting for a connection.",
+            labels=["engine"],
+        )
+        return checked_out, size, overflow, checkouts, wait, timeouts
+
+    def collect(self) -> Iterator:
+        families = self._families()
+        checked_out, size, overflow, checkouts, wait, timeouts = families
+
+        engines = {
+            name: engine
+            for provider in _engine_providers
+            for name, engine in provider().items()
+        }
+        for name, engine in engines.items():
+            # Pools are told apart by the statistics they keep.
+            pool: Any = engine.pool
+            if hasattr(pool, "checkedout"):
+                checked_out.add_metric([name], pool.checkedout())
+                size.add_metric([name], pool.size())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+            if hasattr(pool, "checkout_count"):
+                checkouts.add_metric([name], pool.checkout_count)
+                wait.add_metric([name], pool.checkout_wait_seconds)
+                timeouts.add_metric([name], pool.checkout_timeouts)
+
+        yield from families
+
+
+class CeleryQueueCollector(Collector):
+    """
+    Collects the number of messages waiting in the report queue.
+
+    The broker is asked once per scrape; if it cannot be reached the metric
+    is left out instead of failing the whole scrape.
+    """
+
+    def describe(self) -> Iterator:
+        yield self._family()
+
+    def _family(self) -> GaugeMetricFamily:
+        return GaugeMetricFamily(
+            "celery_queue_length", "Messages waiting in the queue.", labels=["queue"]
+        )
+
+    def collect(self) -> Iterator:
+        length = self._family()
+        try:
+            length.add_metric([REPORT_QUEUE], _queue_length(REPORT_QUEUE))
+        except Exception as e:
+            logger.debug("could not read celery queue length: %s", e)
+        yield length
+
+
+def _queue_length(queue: str) -> int:
+    from app.celery.tasks import app as celery_app
+
+    with celery_app.connection_for_read() as connection:
+        connection.ensure_connection(max_retries=1, interval_start=0, timeout=1)
+        return connection.default_channel.queue_declare(
+            queue=queue, passive=True
+        ).message_count
+
+
+_process_collectors = (DatabasePoolCollector(), CeleryQueueCollector())
+for _collector in _process_collectors:
+    REGISTRY.register(_collector)
+
+
+def render_metrics() -> bytes:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    When `PROMETHEUS_MULTIPROC_DIR` is set, request and task metrics are
+    aggregated across every API and worker process sharing that directory.
+
+    Returns:
+        bytes: The exposition payload.
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    for collector in _process_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from heapq import nlargest
+from typing import Dict, Iterable, List, Tuple
+
+
+class SkillIndex:
+    """
+    Sorted array of distinct skill names answering prefix queries.
+
+    The names matching a prefix are a contiguous slice of the array, found by
+    two binary searches. They are ranked by their number of candidates, and
+    the best `max_limit` of every prefix are memoized. Single characters,
+    whose slices are the largest, are ranked when the index is built.
+    """
+
+    def __init__(
+        self,
+        counts: Iterable[Tuple[str, int]],
+        max_limit: int,
+        memo_size: int = 10_000,
+    ) -> None:
+        pairs = sorted(counts)
+        self.names: List[str] = [name for name, _ in pairs]
+        self.counts: List[int] = [count for _, count in pairs]
+        self.max_limit = max_limit
+        self.memo_size = memo_size
+        self._memo: Dict[str, List[Tuple[str, int]]] = {}
+        for first in {name[:1] for name in self.names if name}:
+            self.complete(first, max_limit)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def complete(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """
+        Return the most frequent names starting with a prefix.
+
+        Args:
+            prefix (str): The normalized prefix.
+            limit (int): The maximum number of names, at most `max_limit`.
+
+        Returns:
+            List[Tuple[str, int]]: Names and candidate counts, most frequent
+                                   first, ties in alphabetical order.
+        """
+        completions = self._memo.get(prefix)
+        if completions is not None:
+            return completions[:limit]
+
+        start = bisect_left(self.names, prefix)
+        # Every name with the prefix sorts before the prefix followed by the
+        # largest code point.
+        end = bisect_left(self.names, prefix + "\U0010ffff", lo=start)
+        completions = [
+            (self.names[index], self.counts[index])
+            for index in nlargest(
+                self.max_limit,
+                range(start, end),
+                key=lambda index: self.counts[index],
+            )
+        ]
+        if len(self._memo) >= self.memo_size:
+            self._memo = {
+                key: value for key, value in self._memo.items() if len(key) <= 1
+            }
+        self._memo[prefix] = completions
+        return completions[:limit]
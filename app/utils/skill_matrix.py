@@ -0,0 +1,229 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+def normalize_skill(name: str) -> str:
+    return name.strip().lower()
+
+
+@dataclass
+class Match:
+    candidate_id: str
+    score: float
+    matched_skills: List[str]
+
+
+class SkillMatrix:
+    """
+    Sparse candidate × skill matrix scored with vectorized operations.
+
+    The bulk of the candidates lives in an immutable CSR matrix (`base`),
+    split into row blocks that are scored in parallel threads; SciPy releases
+    the GIL for sparse products. Candidates changed since the base was built
+    are kept as an overlay of skill index arrays and scored separately, so
+    applying a change costs as much as the candidate's skills. The overlay is
+    folded into a new base once it grows past `compact_after` rows.
+    """
+
+    def __init__(
+        self,
+        block_rows: int = 250_000,
+        workers: int = 1,
+        compact_after: int = 1000,
+    ) -> None:
+        self.block_rows = block_rows
+        self.compact_after = compact_after
+        self.candidate_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.skills: List[str] = []
+        self.columns: Dict[str, int] = {}
+        self.blocks: List[sparse.csr_matrix] = []
+        self.base_rows = 0
+        self.base_columns = 0
+        self.overlay: Dict[int, np.ndarray] = {}
+        self.active = np.zeros(0, dtype=bool)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(workers) if workers > 1 else None
+
+    def _column(self, name: str) -> int:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = len(self.skills)
+            self.skills.append(name)
+        return column
+
+    def _row(self, candidate_id: str) -> int:
+        row = self.rows.get(candidate_id)
+        if row is None:
+            row = self.rows[candidate_id] = len(self.candidate_ids)
+            self.candidate_ids.append(candidate_id)
+        return row
+
+    def _columns_of(self, names: Iterable[str]) -> np.ndarray:
+        return np.unique(
+            np.array(
+                [self._column(normalize_skill(name)) for name in names], dtype=np.int32
+            )
+        )
+
+    def load(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """
+        Replace the matrix with (candidate id, skill name) pairs.
+        """
+        with self._lock:
+            self.candidate_ids, self.rows = [], {}
+            self.skills, self.columns = [], {}
+            row_indices, column_indices = [], []
+            for candidate_id, name in pairs:
+                row_indices.append(self._row(str(candidate_id)))
+                column_indices.append(self._column(normalize_skill(name)))
+            self.overlay = {}
+            self._build_base(
+                np.array(row_indices, dtype=np.int32),
+                np.array(column_indices, dtype=np.int32),
+            )
+
+    def _build_base(self, row_indices: np.ndarray, column_indices: np.ndarray) -> None:
+        shape = (len(self.candidate_ids), len(self.skills))
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(len(row_indices), dtype=np.float32),
+                (row_indices, column_indices),
+            ),
+            shape=shape,
+        )
+        # Duplicate skills of a candidate count once.
+        matrix.data[:] = 1
+        self.blocks = [
+            matrix[start : start + self.block_rows]
+            for start in range(0, shape[0], self.block_rows)
+        ]
+        self.base_rows, self.base_columns = shape
+        self.active = np.ones(shape[0], dtype=bool)
+
+    def update(self, candidate_skills: Dict[str, Optional[Sequence[str]]]) -> None:
+        """
+        Replace the skills of candidates; candidates mapped to None are removed.
+        """
+        with self._lock:
+            for candidate_id, names in candidate_skills.items():
+                if names is None and candidate_id not in self.rows:
+                    continue
+                row = self._row(candidate_id)
+                if row >= len(self.active):
+                    self.active = np.concatenate(
+                        [self.active, np.zeros(row + 1 - len(self.active), dtype=bool)]
+                    )
+                self.active[row] = names is not None
+                self.overlay[row] = self._columns_of(names or ())
+            if len(self.overlay) > self.compact_after:
+                self._compact()
+
+    def _compact(self) -> None:
+        row_indices, column_indices = [], []
+        for start, block in zip(range(0, self.base_rows, self.block_rows), self.blocks):
+            coo = block.tocoo()
+            keep = ~np.isin(coo.row + start, list(self.overlay))
+            row_indices.append(coo.row[keep] + start)
+            column_indices.append(coo.col[keep])
+        for row, columns in self.overlay.items():
+            row_indices.append(np.full(len(columns), row, dtype=np.int32))
+            column_indices.append(columns)
+        active = self.active
+        self.overlay = {}
+        self._build_base(
+            np.concatenate(row_indices).astype(np.int32),
+            np.concatenate(column_indices).astype(np.int32),
+        )
+        self.active = active.copy()
+
+    def _row_columns(self, row: int) -> np.ndarray:
+        if row in self.overlay:
+            return self.overlay[row]
+        block = self.blocks[row // self.block_rows]
+        local = row % self.block_rows
+        return block.indices[block.indptr[local] : block.indptr[local + 1]]
+
+    def match(
+        self,
+        required: Dict[str, float],
+        preferred: Dict[str, float],
+        top_k: int,
+    ) -> List[Match]:
+        """
+        Rank candidates by the weights of their matching skills.
+
+        Candidates must have every required skill. Their score is the weight
+        of the required and preferred skills they have, divided by the total
+        weight, so a candidate with every skill scores 1.
+
+        Args:
+            required (Dict[str, float]): Skills every result must have, with
+                                         their weights.
+            preferred (Dict[str, float]): Skills that raise the score.
+            top_k (int): The maximum number of results.
+
+        Returns:
+            List[Match]: The best candidates, highest score first.
+        """
+        weights = {normalize_skill(name): w for name, w in preferred.items()}
+        weights.update({normalize_skill(name): w for name, w in required.items()})
+        required_names = {normalize_skill(name) for name in required}
+        total_weight = sum(weights.values())
+
+        with self._lock:
+            if any(name not in self.columns for name in required_names):
+                return []
+            # One column of skill weights, one marking the required skills.
+            vectors = np.zeros((len(self.skills), 2), dtype=np.float32)
+            for name, weight in weights.items():
+                column = self.columns.get(name)
+                if column is not None:
+                    vectors[column, 0] = weight
+                    vectors[column, 1] = name in required_names
+
+            totals = np.zeros((len(self.candidate_ids), 2), dtype=np.float32)
+            base_vectors = vectors[: self.base_columns]
+            results: Iterable[np.ndarray]
+            if self._executor:
+                results = self._executor.map(
+                    lambda block: block @ base_vectors, self.blocks
+                )
+            else:
+                results = (block @ base_vectors for block in self.blocks)
+            for start, result in zip(
+                range(0, self.base_rows, self.block_rows), results
+            ):
+                totals[start : start + len(result)] = result
+            for row, columns in self.overlay.items():
+                totals[row] = vectors[columns].sum(axis=0)
+
+            eligible = self.active & (totals[:, 1] == len(required_names))
+            eligible &= totals[:, 0] > 0
+            scores = np.where(eligible, totals[:, 0], -np.inf)
+            count = min(top_k, int(eligible.sum()))
+            if count == 0:
+                return []
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [
+                Match(
+                    candidate_id=self.candidate_ids[row],
+                    score=float(scores[row] / total_weight),
+                    matched_skills=sorted(
+                        self.skills[column]
+                        for column in self._row_columns(row)
+                        if vectors[column, 0] > 0
+                    ),
+                )
+                for row in best
+            ]
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,14 @@
+import os
+
+
+def web_concurrency() -> int:
+    """
+    The number of API worker processes gunicorn starts.
+
+    Read from `WEB_CONCURRENCY`, one per CPU core by default. gunicorn.conf.py
+    and the per-worker pools sized from it share this default.
+
+    Returns:
+        int: The number of API worker processes, at least 1.
+    """
+    return max(1, int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
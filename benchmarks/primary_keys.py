@@ -0,0 +1,85 @@
+"""
+Compare random uuid4 string keys with time-ordered uuid7 keys.
+
+Inserts the same number of rows into two scratch tables, one keyed by a
+varchar uuid4 and one by a native uuid7, and reports insert throughput and
+primary key index size (index size is reported on PostgreSQL only).
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.primary_keys [rows]
+"""
+import os
+import sys
+import time
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, MetaData, String, Table, Uuid, create_engine, text
+
+from app.utils.ids import uuid7
+
+BATCH_SIZE = 1000
+
+metadata = MetaData()
+random_keys = Table(
+    "bench_random_keys",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("payload", String),
+)
+ordered_keys = Table(
+    "bench_ordered_keys",
+    metadata,
+    Column("id", Uuid(as_uuid=False), primary_key=True),
+    Column("payload", String),
+)
+
+
+def insert_rows(connection, table, make_id, rows: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = [
+            {"id": make_id(), "payload": "x" * 32}
+            for _ in range(min(BATCH_SIZE, rows - offset))
+        ]
+        connection.execute(table.insert(), batch)
+    return rows / (time.perf_counter() - started)
+
+
+def index_size(connection, table) -> str:
+    if connection.dialect.name != "postgresql":
+        return "n/a"
+    return connection.execute(
+        text("SELECT pg_size_pretty(pg_relation_size(:index))"),
+        {"index": f"{table.name}_pkey"},
+    ).scalar()
+
+
+def main(rows: int) -> None:
+    load_dotenv()
+    engine = create_engine(os.getenv("DATABASE_URL"))
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        with engine.begin() as connection:
+            random_rate = insert_rows(
+                connection, random_keys, lambda: str(uuid4()), rows
+            )
+            ordered_rate = insert_rows(
+                connection, ordered_keys, lambda: str(uuid7()), rows
+            )
+            print(f"{'keys':<18}{'rows/s':>12}{'pk index':>12}")
+            print(
+                f"{'uuid4 varchar':<18}{random_rate:>12.0f}"
+                f"{index_size(connection, random_keys):>12}"
+            )
+            print(
+                f"{'uuid7 native':<18}{ordered_rate:>12.0f}"
+                f"{index_size(connection, ordered_keys):>12}"
+            )
+    finally:
+        metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,73 @@
+"""
+Measure request throughput of a running API server.
+
+Registers (or logs in) a benchmark user and then lists candidates from
+`concurrency` client threads for `duration` seconds. Run it against the
+server started with different worker counts to see how throughput scales
+with cores:
+
+    WEB_CONCURRENCY=1 gunicorn app.main:app -c gunicorn.conf.py
+    python -m benchmarks.throughput http://127.0.0.1:8000 --concurrency 32
+
+    WEB_CONCURRENCY=4 gunicorn app.main:app -c gunicorn.conf.py
+    python -m benchmarks.throughput http://127.0.0.1:8000 --concurrency 32
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import httpx
+
+USER = {"email": "benchmark@example.com", "password": "benchmark"}
+
+
+def get_token(base_url: str) -> str:
+    response = httpx.post(f"{base_url}/users/register", json=USER)
+    if response.status_code != 201:
+        response = httpx.post(f"{base_url}/users/login", json=USER)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def run_client(url: str, headers: dict, deadline: float, latencies: list) -> None:
+    with httpx.Client(headers=headers) as client:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get(url).raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base_url")
+    parser.add_argument("--path", default="/candidates/")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {get_token(args.base_url)}"}
+    latencies: list = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(args.base_url + args.path, headers, deadline, latencies),
+        )
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    print(f"requests:   {len(latencies)}")
+    print(f"throughput: {len(latencies) / args.duration:.1f} req/s")
+    print(f"p50:        {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"p99:        {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
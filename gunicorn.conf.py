@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration for running the API with several worker processes.
+
+Usage:
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The application is imported once in the master process (`preload_app`) and
+forked into `WEB_CONCURRENCY` uvicorn workers, one per CPU core by default.
+Database engines and the Celery producer drop inherited connections after the
+fork, see `app.db.database.dispose_engines_after_fork`.
+"""
+
+import os
+
+from app.utils.workers import web_concurrency
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = web_concurrency()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def child_exit(server, worker):
+    # Remove metrics of the exited worker from the shared multiprocess directory.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
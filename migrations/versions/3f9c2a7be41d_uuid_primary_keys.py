@@ -0,0 +1,96 @@
+"""store candidate and user ids as native uuid
+
+Revision ID: 3f9c2a7be41d
+Revises: 7d53c6c8d2dd
+Create Date: 2026-10-19 09:12:31.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a7be41d"
+down_revision: Union[str, None] = "7d53c6c8d2dd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing ids are uuid4 strings, so they convert in place; only new rows get
+# time-ordered uuid7 values.
+UUID_COLUMNS = (
+    ("candidates", "id"),
+    ("users", "id"),
+    ("skills", "candidate_id"),
+    ("experience", "candidate_id"),
+)
+FOREIGN_KEYS = (
+    ("skills_candidate_id_fkey", "skills"),
+    ("experience_candidate_id_fkey", "experience"),
+)
+
+
+# SQLAlchemy stores Uuid columns on SQLite as 32 hex digits without dashes.
+# SQLite does not enforce the declared column types and recreating the
+# tables would cascade the implicit deletes of DROP TABLE to the children, so
+# there only the values are rewritten. Foreign keys are checked at commit.
+DASHED = (
+    "substr({0}, 1, 8) || '-' || substr({0}, 9, 4) || '-' || substr({0}, 13, 4)"
+    " || '-' || substr({0}, 17, 4) || '-' || substr({0}, 21)"
+)
+
+
+def _rewrite_sqlite_ids(expression: str) -> None:
+    op.execute("PRAGMA defer_foreign_keys = ON")
+    for table, column in UUID_COLUMNS:
+        op.execute(
+            f"UPDATE {table} SET {column} = {expression.format(column)}"
+            f" WHERE {column} IS NOT NULL"
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        _rewrite_sqlite_ids("replace({0}, '-', '')")
+        return
+
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.String(),
+            type_=sa.Uuid(),
+            postgresql_using=f"{column}::uuid",
+        )
+
+    for name, table in FOREIGN_KEYS:
+        op.create_foreign_key(
+            name, table, "candidates", ["candidate_id"], ["id"], ondelete="CASCADE"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        _rewrite_sqlite_ids(DASHED)
+        return
+
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.Uuid(),
+            type_=sa.String(),
+            postgresql_using=f"{column}::text",
+        )
+
+    for name, table in FOREIGN_KEYS:
+        op.create_foreign_key(
+            name, table, "candidates", ["candidate_id"], ["id"], ondelete="CASCADE"
+        )
@@ -0,0 +1,60 @@
+"""add skill co-occurrence counts and related skills
+
+Revision ID: 9a1f3c5e7b20
+Revises: c4d7e19a2b63
+Create Date: 2026-10-19 21:12:47.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a1f3c5e7b20"
+down_revision: Union[str, None] = "c4d7e19a2b63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The tables are filled by the first run of the update_skill_cooccurrence
+# task.
+def upgrade() -> None:
+    op.create_table(
+        "skill_pairs",
+        sa.Column("skill", sa.String(), nullable=False),
+        sa.Column("other", sa.String(), nullable=False),
+        sa.Column("candidates", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("skill", "other"),
+    )
+    op.create_table(
+        "skill_neighbors",
+        sa.Column("skill", sa.String(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("neighbor", sa.String(), nullable=False),
+        sa.Column("candidates", sa.Integer(), nullable=False),
+        sa.Column("share", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("skill", "rank"),
+    )
+    op.create_table(
+        "skill_cooccurrence_candidates",
+        sa.Column("candidate_id", sa.Uuid(), nullable=False),
+        sa.Column("skills", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("candidate_id"),
+    )
+    op.create_table(
+        "skill_cooccurrence_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("synced_seq", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("skill_cooccurrence_state")
+    op.drop_table("skill_cooccurrence_candidates")
+    op.drop_table("skill_neighbors")
+    op.drop_table("skill_pairs")
@@ -0,0 +1,138 @@
+"""add derived experience columns to candidates
+
+Revision ID: b81e4d0c7a95
+Revises: 3f9c2a7be41d
+Create Date: 2026-10-19 14:02:47.318260
+
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81e4d0c7a95"
+down_revision: Union[str, None] = "3f9c2a7be41d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 1000
+INDEXED_COLUMNS = ("experience_months", "current_company", "latest_job_title")
+
+# The tables as of this revision; the backfill must not follow later changes
+# of the models.
+experience = sa.table(
+    "experience",
+    sa.column("candidate_id", sa.Uuid()),
+    sa.column("job_title", sa.String()),
+    sa.column("company", sa.String()),
+    sa.column("start_date", sa.Date()),
+    sa.column("end_date", sa.Date()),
+)
+candidates = sa.table(
+    "candidates",
+    sa.column("id", sa.Uuid()),
+    sa.column("experience_months", sa.Integer()),
+    sa.column("current_company", sa.String()),
+    sa.column("latest_job_title", sa.String()),
+)
+
+
+def _months_between(start: date, end: date) -> int:
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day:
+        months -= 1
+    return max(months, 0)
+
+
+def _summarize_experience(rows, today: date) -> dict:
+    # A copy of app.models.experience.summarize_experience at this revision.
+    rows = [row for row in rows if row.start_date <= today]
+    intervals = sorted(
+        (row.start_date, min(row.end_date or today, today)) for row in rows
+    )
+    months = 0
+    merged_start = merged_end = None
+    for start, end in intervals:
+        if merged_end is not None and start <= merged_end + timedelta(days=1):
+            merged_end = max(merged_end, end)
+            continue
+        if merged_end is not None:
+            months += _months_between(merged_start, merged_end + timedelta(days=1))
+        merged_start, merged_end = start, end
+    if merged_end is not None:
+        months += _months_between(merged_start, merged_end + timedelta(days=1))
+
+    def recency(row):
+        return (row.end_date or date.max, row.start_date)
+
+    latest = max(rows, key=recency, default=None)
+    current = max(
+        (row for row in rows if row.end_date is None or row.end_date >= today),
+        key=recency,
+        default=None,
+    )
+    return {
+        "new_experience_months": months,
+        "new_current_company": current.company if current else None,
+        "new_latest_job_title": latest.job_title if latest else None,
+    }
+
+
+def _backfill(connection, candidate_ids, today: date) -> None:
+    rows = defaultdict(list)
+    for row in connection.execute(
+        sa.select(experience).where(experience.c.candidate_id.in_(candidate_ids))
+    ):
+        rows[row.candidate_id].append(row)
+    connection.execute(
+        candidates.update()
+        .where(candidates.c.id == sa.bindparam("candidate_id"))
+        .values({name: sa.bindparam(f"new_{name}") for name in INDEXED_COLUMNS}),
+        [
+            {
+                "candidate_id": candidate_id,
+                **_summarize_experience(rows[candidate_id], today),
+            }
+            for candidate_id in candidate_ids
+        ],
+    )
+
+
+def upgrade() -> None:
+    op.add_column(
+        "candidates",
+        sa.Column(
+            "experience_months", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        "candidates", sa.Column("current_company", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "candidates", sa.Column("latest_job_title", sa.String(), nullable=True)
+    )
+
+    # Backfill candidates that have experience, in chunks of one statement each.
+    connection = op.get_bind()
+    candidate_ids = connection.scalars(
+        sa.select(experience.c.candidate_id)
+        .where(experience.c.candidate_id.is_not(None))
+        .distinct()
+    ).all()
+    today = date.today()
+    for start in range(0, len(candidate_ids), BACKFILL_CHUNK_SIZE):
+        _backfill(connection, candidate_ids[start : start + BACKFILL_CHUNK_SIZE], today)
+
+    for column in INDEXED_COLUMNS:
+        op.create_index(f"ix_candidates_{column}", "candidates", [column])
+
+
+def downgrade() -> None:
+    for column in INDEXED_COLUMNS:
+        op.drop_index(f"ix_candidates_{column}", table_name="candidates")
+        op.drop_column("candidates", column)
@@ -0,0 +1,38 @@
+"""add precomputed candidate read documents
+
+Revision ID: c4d7e19a2b63
+Revises: 5e2a9c41f0b7
+Create Date: 2026-10-19 18:40:12.093561
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d7e19a2b63"
+down_revision: Union[str, None] = "5e2a9c41f0b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Documents are built by the rebuild_candidate_documents task once
+# CANDIDATE_DOCUMENTS is enabled.
+def upgrade() -> None:
+    op.create_table(
+        "candidate_documents",
+        sa.Column("candidate_id", sa.Uuid(), nullable=False),
+        sa.Column("document", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["candidate_id"], ["candidates.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("candidate_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("candidate_documents")